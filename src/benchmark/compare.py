@@ -0,0 +1,280 @@
+import argparse
+import json
+import math
+from typing import Any
+
+import numpy as np
+
+from benchmark.config import STORE_FILE
+from benchmark.store import ResultStore
+
+
+ALPHA: float = 0.05
+
+LATENCIES: list[str] = ["query_time", "database_time", "generation_time", "total_time"]
+TOKENS: list[str] = [
+    "query_prompt_tokens",
+    "query_completion_tokens",
+    "generation_prompt_tokens",
+    "generation_completion_tokens",
+]
+RETRIEVAL: list[str] = ["nodes", "edges"]
+
+
+def load_runs(
+    store: ResultStore, key: str, runs: list[str]
+) -> dict[str, dict[str, np.ndarray]]:
+    """Load the numeric columns of each run, keyed by run ID or config hash"""
+    fields: list[str] = LATENCIES + TOKENS + RETRIEVAL + ["error"]
+    columns: dict[str, list[Any]] = store.columns([key, "mode"] + fields)
+    ids: np.ndarray = np.asarray(
+        ["" if v is None else v for v in columns[key]], dtype=str
+    )
+    modes: np.ndarray = np.asarray(
+        ["" if v is None else v for v in columns["mode"]], dtype=str
+    )
+
+    loaded: dict[str, dict[str, np.ndarray]] = {}
+    for run in runs:
+        mask: np.ndarray = ids == run
+        if not mask.any():
+            raise ValueError(f"No rows found for {key} '{run}'")
+        data: dict[str, np.ndarray] = {"mode": modes[mask]}
+        for field in fields:
+            data[field] = np.asarray(
+                [np.nan if v is None else v for v in columns[field]], dtype=float
+            )[mask]
+        loaded[run] = data
+    return loaded
+
+
+def mann_whitney(x: np.ndarray, y: np.ndarray) -> float:
+    """
+    Two-sided p-value of the Mann-Whitney U test (normal approximation with
+    tie correction).
+    """
+    n1, n2 = x.size, y.size
+    if n1 == 0 or n2 == 0:
+        return 1.0
+
+    values: np.ndarray = np.concatenate([x, y])
+    _, inverse, counts = np.unique(values, return_inverse=True, return_counts=True)
+    # Average rank of each distinct value, ties sharing their mean rank.
+    ranks: np.ndarray = (np.cumsum(counts) - (counts - 1) / 2.0)[inverse]
+
+    u: float = float(ranks[:n1].sum() - n1 * (n1 + 1) / 2.0)
+    n: int = n1 + n2
+    ties: float = float((counts**3 - counts).sum()) / (n * (n - 1))
+    sigma: float = math.sqrt(n1 * n2 / 12.0 * ((n + 1) - ties))
+    if sigma == 0.0:
+        return 1.0
+    z: float = (u - n1 * n2 / 2.0) / sigma
+    return math.erfc(abs(z) / math.sqrt(2.0))
+
+
+def two_proportions(k1: int, n1: int, k2: int, n2: int) -> float:
+    """Two-sided p-value of the pooled two-proportion z-test"""
+    if n1 == 0 or n2 == 0:
+        return 1.0
+    pooled: float = (k1 + k2) / (n1 + n2)
+    sigma: float = math.sqrt(pooled * (1.0 - pooled) * (1.0 / n1 + 1.0 / n2))
+    if sigma == 0.0:
+        return 1.0
+    z: float = (k2 / n2 - k1 / n1) / sigma
+    return math.erfc(abs(z) / math.sqrt(2.0))
+
+
+def distribution(values: np.ndarray) -> dict[str, float]:
+    """Count, mean and percentiles of the non-missing values"""
+    values = values[~np.isnan(values)]
+    if not values.size:
+        return {"n": 0}
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return {
+        "n": int(values.size),
+        "mean": float(values.mean()),
+        "p50": float(p50),
+        "p95": float(p95),
+        "p99": float(p99),
+    }
+
+
+def compare_metric(
+    base: np.ndarray, other: np.ndarray, statistic: str, threshold: float, worse: int
+) -> dict[str, Any]:
+    """
+    Compares one metric of two runs.
+
+    A change is flagged as a regression when it goes in the `worse` direction
+    (+1 for higher is worse, -1 for lower is worse) by more than the relative
+    threshold and is significant at ALPHA.
+    """
+    before: dict[str, float] = distribution(base)
+    after: dict[str, float] = distribution(other)
+    result: dict[str, Any] = {"base": before, "other": after}
+    if not before["n"] or not after["n"]:
+        return result
+
+    p_value: float = mann_whitney(base[~np.isnan(base)], other[~np.isnan(other)])
+    change: float = (
+        after[statistic] / before[statistic] - 1.0 if before[statistic] else 0.0
+    )
+    result |= {
+        "statistic": statistic,
+        "change": change,
+        "p_value": p_value,
+        "regression": bool(worse * change > threshold and p_value < ALPHA),
+    }
+    return result
+
+
+def compare_runs(
+    base: dict[str, np.ndarray],
+    other: dict[str, np.ndarray],
+    thresholds: dict[str, float],
+) -> dict[str, Any]:
+    """Compares latency, tokens, error rate and retrieval size of two runs"""
+    metrics: dict[str, Any] = {}
+
+    for mode in ("native", "rag"):
+        b: np.ndarray = base["mode"] == mode
+        o: np.ndarray = other["mode"] == mode
+        for field in LATENCIES:
+            metrics[f"{mode}.{field}"] = compare_metric(
+                base[field][b], other[field][o], "p50", thresholds["latency"], +1
+            )
+        for field in TOKENS:
+            metrics[f"{mode}.{field}"] = compare_metric(
+                base[field][b], other[field][o], "mean", thresholds["tokens"], +1
+            )
+
+    b = base["mode"] == "rag"
+    o = other["mode"] == "rag"
+    for field in RETRIEVAL:
+        metrics[f"rag.{field}"] = compare_metric(
+            base[field][b], other[field][o], "mean", thresholds["retrieval"], -1
+        )
+
+    # The error rate is compared in absolute points, not relatively.
+    k1, n1 = int(np.nansum(base["error"][b])), int(b.sum())
+    k2, n2 = int(np.nansum(other["error"][o])), int(o.sum())
+    rate1: float = k1 / n1 if n1 else 0.0
+    rate2: float = k2 / n2 if n2 else 0.0
+    p_value: float = two_proportions(k1, n1, k2, n2)
+    metrics["rag.error_rate"] = {
+        "base": {"n": n1, "rate": rate1},
+        "other": {"n": n2, "rate": rate2},
+        "statistic": "rate",
+        "change": rate2 - rate1,
+        "p_value": p_value,
+        "regression": bool(rate2 - rate1 > thresholds["error"] and p_value < ALPHA),
+    }
+
+    # Drop metrics missing from both runs.
+    return {
+        name: metric
+        for name, metric in metrics.items()
+        if metric["base"]["n"] or metric["other"]["n"]
+    }
+
+
+def report(base: str, other: str, metrics: dict[str, Any]) -> None:
+    print("=" * 96)
+    print(f"📊 {other} vs {base}")
+    print("=" * 96)
+    print(f"{'metric':<40}{'base':>12}{'other':>12}{'change':>10}{'p':>10}")
+    print("-" * 96)
+    for name, metric in metrics.items():
+        statistic: str | None = metric.get("statistic")
+        if statistic is None:
+            print(f"{name:<40}{'(missing on one side)':>44}")
+            continue
+        if statistic == "rate":
+            change: str = f"{metric['change'] * 100:+.2f}pt"
+        else:
+            change = f"{metric['change'] * 100:+.1f}%"
+        flag: str = "  ❌" if metric["regression"] else ""
+        print(
+            f"{name + ' (' + statistic + ')':<40}"
+            f"{metric['base'][statistic]:>12.4g}{metric['other'][statistic]:>12.4g}"
+            f"{change:>10}{metric['p_value']:>10.4f}{flag}"
+        )
+    print("=" * 96)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Compare benchmark runs; the first run is the baseline"
+    )
+    parser.add_argument("runs", nargs="+", help="run IDs (or config hashes)")
+    parser.add_argument(
+        "--by", choices=["run", "config"], default="run", help="what the IDs are"
+    )
+    parser.add_argument("--store", default=STORE_FILE)
+    parser.add_argument("--json", metavar="PATH", help="write the comparison as JSON")
+    parser.add_argument(
+        "--latency", type=float, default=0.1, help="tolerated relative p50 increase"
+    )
+    parser.add_argument(
+        "--tokens", type=float, default=0.1, help="tolerated relative mean increase"
+    )
+    parser.add_argument(
+        "--retrieval",
+        type=float,
+        default=0.2,
+        help="tolerated relative decrease of retrieved nodes/edges",
+    )
+    parser.add_argument(
+        "--error", type=float, default=0.02, help="tolerated error rate increase"
+    )
+    args = parser.parse_args()
+
+    if len(args.runs) < 2:
+        parser.error("at least two runs are required")
+
+    thresholds: dict[str, float] = {
+        "latency": args.latency,
+        "tokens": args.tokens,
+        "retrieval": args.retrieval,
+        "error": args.error,
+    }
+
+    runs = load_runs(ResultStore(args.store), args.by, args.runs)
+    base: str = args.runs[0]
+
+    comparisons: dict[str, Any] = {}
+    for other in args.runs[1:]:
+        metrics = compare_runs(runs[base], runs[other], thresholds)
+        comparisons[other] = metrics
+        report(base, other, metrics)
+
+    regressions: list[str] = [
+        f"{other}: {name}"
+        for other, metrics in comparisons.items()
+        for name, metric in metrics.items()
+        if metric.get("regression")
+    ]
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "base": base,
+                    "by": args.by,
+                    "thresholds": thresholds,
+                    "alpha": ALPHA,
+                    "comparisons": comparisons,
+                    "regressions": regressions,
+                },
+                f,
+                indent=4,
+            )
+
+    if regressions:
+        print(f"❌ {len(regressions)} regression(s)")
+        exit(1)
+    print("✅ No regression")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+This module defines the configuration of the benchmark pipeline and the hash
+identifying it in the result store.
+"""
+
+import hashlib
+import json
+import os
+from typing import Any
+
+from util import TemplateRegistry
+
+
+CURRENT_DIR: str = os.path.dirname(os.path.abspath(__file__))
+
+MODEL: str = "qwen/qwen3-235b-a22b:free"
+MODEL_PARAMS: dict[str, Any] = {"temperature": 0}
+
+# Whether the generator answers with a constrained choice of the option keys
+# (see LLM.choose) instead of free text.
+CONSTRAINED: bool = os.getenv("BENCHMARK_CONSTRAINED", "0") not in ("", "0")
+
+# The parameters of the constrained choices: the model thinks by default, and
+# the choice is read from the log probabilities of its first token.
+CHOICE_PARAMS: dict[str, Any] = {"extra_body": {"reasoning": {"enabled": False}}}
+
+PROMPTS: dict[str, str] = {
+    "user": os.path.join(CURRENT_DIR, "resources/prompt/user.md"),
+    "native": os.path.join(CURRENT_DIR, "resources/prompt/generator_system_native.md"),
+    "rag": os.path.join(CURRENT_DIR, "resources/prompt/generator_system_rag.md"),
+    "retrieval": os.path.join(CURRENT_DIR, "resources/prompt/retrieval_system.md"),
+}
+
+# The placeholders each prompt must contain, checked when loading it.
+PROMPT_SLOTS: dict[str, frozenset[str]] = {
+    "user": frozenset({"INTENT", "REQUEST", "CHOICES"}),
+    "native": frozenset({"CHOICES"}),
+    "rag": frozenset({"CHOICES", "RETRIEVAL"}),
+    "retrieval": frozenset(),
+}
+
+STORE_FILE: str = os.path.join(CURRENT_DIR, "results/results.jsonl")
+
+
+def config_hash() -> str:
+    """Hashes the model, its parameters and the prompt templates"""
+    prompts: dict[str, str] = {}
+    for name, path in PROMPTS.items():
+        with open(path, "r", encoding="utf-8") as f:
+            prompts[name] = f.read()
+
+    config: dict[str, Any] = {
+        "model": MODEL,
+        "model_params": MODEL_PARAMS,
+        "prompts": prompts,
+    }
+    if CONSTRAINED:
+        # Only added when set, so the hash of free-text runs is unchanged.
+        config["constrained"] = True
+        config["choice_params"] = CHOICE_PARAMS
+    payload: bytes = json.dumps(config, sort_keys=True).encode("utf-8")
+    return hashlib.sha256(payload).hexdigest()[:16]
+
+
+def load_prompts(reload: bool = False) -> TemplateRegistry:
+    """Loads and validates the prompt templates"""
+    registry: TemplateRegistry = TemplateRegistry(reload=reload)
+    for name, path in PROMPTS.items():
+        registry.register(name, path, PROMPT_SLOTS[name])
+    return registry
@@ -1,14 +1,37 @@
 import time
-from typing import Any, Tuple, cast
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Optional, cast
 from dotenv import load_dotenv
-from benchmark.generation.basic_generator import BasicGeneratorExtra
+from tqdm import tqdm
+from benchmark.config import (
+    CHOICE_PARAMS,
+    CONSTRAINED,
+    MODEL,
+    MODEL_PARAMS,
+    STORE_FILE,
+    config_hash,
+    load_prompts,
+)
 from benchmark.util import system_prompt, user_prompt
-from benchmark.retrieval import GraphExtra
 from benchmark.retrieval.database import Neo4jExtra
-from graphygie.llm import LLM, OpenAI, Message
+from benchmark.store import ResultStore
+from graphygie.cassette import (
+    Cassette,
+    CassetteDatabase,
+    CassetteLLM,
+    CassetteMissError,
+)
+from graphygie.generation import BasicGenerator
+from graphygie.llm import LLM, Message, Chat, OpenAI
+from graphygie.result import Result
+from graphygie.retrieval import Graph
 from graphygie.retrieval.database import Database
+from graphygie.retrieval.database.neo4j import format_graph_data
+from graphygie.retrieval.database.profiler import QueryProfiler
 from util import (
-    read_to_string,
+    Template,
+    TemplateRegistry,
     unwrap,
     strip_code_fences,
     strip_after_double_newline,
@@ -29,167 +52,261 @@ NEO4J_DATABASE = unwrap(os.getenv("NEO4J_DATABASE"))
 OPENROUTER_URI = unwrap(os.getenv("OPENROUTER_URI"))
 OPENROUTER_TOKEN = unwrap(os.getenv("OPENROUTER_TOKEN"))
 
+# Number of concurrent tasks; the workers share one set of clients.
+WORKERS: int = int(os.getenv("BENCHMARK_WORKERS", "8"))
+# Seconds to wait before retrying a failed LLM call.
+RETRY_DELAY: float = float(os.getenv("BENCHMARK_RETRY_DELAY", "30"))
+# Fraction of the recorded latencies waited for when replaying a cassette.
+REPLAY_LATENCY: float = float(os.getenv("BENCHMARK_REPLAY_LATENCY", "0"))
+# Fraction of the generated queries run with PROFILE (0: none).
+PROFILE_RATE: float = float(os.getenv("BENCHMARK_PROFILE_RATE", "0"))
+
 CURRENT_DIR: str = os.path.dirname(os.path.abspath(__file__))
 
+MODES: tuple[str, ...] = ("native", "rag")
+
+RUN_ID: str = uuid.uuid4().hex[:12]
+CONFIG_HASH: str = config_hash()
+
+# Shared by the database of every worker.
+PROFILER: Optional[QueryProfiler] = (
+    QueryProfiler(PROFILE_RATE) if PROFILE_RATE > 0 else None
+)
+
 
 def benchmark(
-    base: str, generator: LLM, question: str, choices: dict[str, str]
-) -> str | Tuple[str, dict[str, int]]:
-    result: str = generator.chat(
-        chat=[
-            Message(
-                role="user",
-                content=user_prompt(
-                    base,
-                    intent="Answer to a multiple-choice question",
-                    request=question,
-                    choices=choices,
-                ),
-            )
-        ]
-    )
+    base: Template,
+    generator: LLM,
+    question: str,
+    choices: dict[str, str],
+    system: Chat = list(),
+) -> Result:
+    chat: Chat = system + [
+        Message(
+            role="user",
+            content=user_prompt(
+                base,
+                intent="Answer to a multiple-choice question",
+                request=question,
+                choices=choices,
+            ),
+        )
+    ]
+    return generator.respond(chat, list(choices) if CONSTRAINED else None)
 
-    if isinstance(generator, BasicGeneratorExtra):
-        return (result, unwrap(generator.info))
-    return result
 
+def base_grahygie(
+    templates: TemplateRegistry,
+    cassette: Optional[Cassette] = None,
+) -> tuple[Graph, LLM]:
+    """
+    Builds the retriever and the generator LLM, shared by every worker: their
+    statistics are returned with each result.
+    """
+    if cassette is not None and cassette.mode == "replay":
+        # Offline run: every interaction is served from the cassette.
+        replayed: Graph = Graph(
+            llm=CassetteLLM(
+                cassette, "retrieval", latency=REPLAY_LATENCY, identity=CONFIG_HASH
+            ),
+            # Formatted as Neo4jExtra does: every relationship, in order.
+            database=CassetteDatabase(
+                cassette, "neo4j", latency=REPLAY_LATENCY, formatter=format_graph_data
+            ),
+        )
+        return (
+            replayed,
+            CassetteLLM(
+                cassette, "generator", latency=REPLAY_LATENCY, identity=CONFIG_HASH
+            ),
+        )
 
-def base_grahygie() -> tuple[GraphExtra, LLM]:
-    database: Database = Neo4jExtra(
+    neo4j: Neo4jExtra = Neo4jExtra(
         uri=NEO4J_URI,
         username=NEO4J_USERNAME,
         password=NEO4J_PASSWORD,
         database=NEO4J_DATABASE,
+        profiler=PROFILER,
     )
+    database: Database = neo4j
 
     retrieval_llm: LLM = OpenAI(
         host=OPENROUTER_URI,
         api_key=OPENROUTER_TOKEN,
-        model="qwen/qwen3-235b-a22b:free",
-        model_params={"temperature": 0},
+        model=MODEL,
+        model_params=MODEL_PARAMS,
         chat=[
             Message(
                 role="system",
-                content=read_to_string(
-                    os.path.join(CURRENT_DIR, "resources/prompt/retrieval_system.md")
-                ),
+                content=templates.get("retrieval").text,
             )
         ],
         cleaner=compose(strip_code_fences, strip_after_double_newline),
         timeout=None,
     )
 
-    retrieval: GraphExtra = GraphExtra(llm=retrieval_llm, database=database)
-
     generator_llm: LLM = OpenAI(
         host=OPENROUTER_URI,
         api_key=OPENROUTER_TOKEN,
-        model="qwen/qwen3-235b-a22b:free",
-        model_params={"temperature": 0},
+        model=MODEL,
+        model_params=MODEL_PARAMS,
+        choice_params=CHOICE_PARAMS,
     )
 
+    if cassette is not None:
+        # The result graphs are recorded, and formatted again on replay.
+        database = CassetteDatabase(cassette, "neo4j", neo4j, formatter=neo4j.format)
+        # The configuration hash covers the prompts, the model and its
+        # parameters, which the recorded chats depend on.
+        retrieval_llm = CassetteLLM(
+            cassette, "retrieval", retrieval_llm, identity=CONFIG_HASH
+        )
+        generator_llm = CassetteLLM(
+            cassette, "generator", generator_llm, identity=CONFIG_HASH
+        )
+
+    retrieval: Graph = Graph(llm=retrieval_llm, database=database)
+
     return (retrieval, generator_llm)
 
 
 def graphygie(
-    retrieval: GraphExtra, generator_llm: LLM, choices: list[str]
-) -> BasicGeneratorExtra:
-    return BasicGeneratorExtra(
+    retrieval: Graph,
+    generator_llm: LLM,
+    choices: list[str],
+    template: Template,
+) -> BasicGenerator:
+    return BasicGenerator(
         retriever=retrieval,
         generator=generator_llm,
         chat=[
             Message(
                 role="system",
-                content=system_prompt(
-                    base=read_to_string(
-                        os.path.join(
-                            CURRENT_DIR, "resources/prompt/generator_system_native.md"
-                        )
-                    ),
-                    choices=choices,
-                ),
+                content=system_prompt(base=template, choices=choices),
             )
         ],
         maker=generator_system_prompt,
     )
 
 
-def native(choices: list[str]) -> LLM:
-    return OpenAI(
-        host=OPENROUTER_URI,
-        api_key=OPENROUTER_TOKEN,
-        model="qwen/qwen3-235b-a22b:free",
-        model_params={"temperature": 0},
-        chat=[
-            Message(
-                role="system",
-                content=system_prompt(
-                    base=read_to_string(
-                        os.path.join(
-                            CURRENT_DIR, "resources/prompt/generator_system_native.md"
-                        )
-                    ),
-                    choices=choices,
-                ),
-            )
-        ],
+def native(choices: list[str], template: Template) -> Chat:
+    return [
+        Message(
+            role="system",
+            content=system_prompt(base=template, choices=choices),
+        )
+    ]
+
+
+def run(
+    store: ResultStore,
+    clients: tuple[Graph, LLM],
+    templates: TemplateRegistry,
+    dataset: str,
+    question: str,
+    mode: str,
+    item: dict[str, Any],
+) -> None:
+    (retrieval, generator_llm) = clients
+    choices: list[str] = list(item["options"].keys())
+    user: Template = templates.get("user")
+    # The RAG prompt keeps its {{RETRIEVAL}} slot for the retrieved context.
+    system: Template = templates.get(mode)
+
+    while True:
+        try:
+            start: float = time.perf_counter()
+            if mode == "native":
+                result: Result = benchmark(
+                    user,
+                    generator_llm,
+                    item["question"],
+                    item["options"],
+                    system=native(choices, system),
+                )
+                stats: dict[str, Any] = {
+                    f"generation_{k}": v for k, v in result.stats.items()
+                }
+            else:
+                g = graphygie(retrieval, generator_llm, choices, system)
+                result = benchmark(user, g, item["question"], item["options"])
+                stats = dict(result.stats)
+            response: str = result.text
+            total_time: float = time.perf_counter() - start
+            break
+        except CassetteMissError:
+            raise
+        except Exception as e:
+            print(str(e))
+            print("Retry")
+            time.sleep(RETRY_DELAY)
+
+    store.append(
+        {
+            "run": RUN_ID,
+            "config": CONFIG_HASH,
+            "dataset": dataset,
+            "question": question,
+            "mode": mode,
+            "response": response,
+            **stats,
+            "total_time": total_time,
+            "timestamp": time.time(),
+        }
     )
 
 
 def main() -> None:
     bench: Any = json.load(open(os.path.join(CURRENT_DIR, "benchmark.json")))
-    base: str = read_to_string(os.path.join(CURRENT_DIR, "resources/prompt/user.md"))
-
-    (retrieval, generator_llm) = base_grahygie()
-
-    os.makedirs(os.path.join(CURRENT_DIR, "results"), exist_ok=True)
-
-    for dataset, val in bench.items():
-        print("Start dataset:", dataset)
-        os.makedirs(os.path.join(CURRENT_DIR, f"results/{dataset}"), exist_ok=True)
-        for question, val in val.items():
-            print("Start question:", question)
-            n = native(val["options"].keys())
-            g = graphygie(retrieval, generator_llm, val["options"].keys())
-
-            with open(
-                os.path.join(CURRENT_DIR, f"results/{dataset}/native_{question}.json"),
-                "w",
-                encoding="utf-8",
-            ) as f:
-                while True:
-                    try:
-                        data = {
-                            "response": cast(
-                                str,
-                                benchmark(base, n, val["question"], val["options"]),
-                            )
-                        }
-                        break  
-                    except Exception as e:
-                        print(str(e))
-                        print("Retry")
-                        time.sleep(30)
-                json.dump(data, f, indent=4, ensure_ascii=False)
-
-            with open(
-                os.path.join(CURRENT_DIR, f"results/{dataset}/rag_{question}.json"),
-                "w",
-                encoding="utf-8",
-            ) as f:
-                while True:
-                    try:
-                        (response, data) = cast(
-                            Tuple[str, dict[str, int | str]],
-                            benchmark(base, g, val["question"], val["options"]),
-                        )
-                        data["response"] = response
-                        break  
-                    except Exception as e:
-                        print(str(e))
-                        print("Retry")
-                        time.sleep(30)
-                json.dump(data, f, indent=4, ensure_ascii=False)
+    templates: TemplateRegistry = load_prompts()
+
+    store: ResultStore = ResultStore(os.getenv("BENCHMARK_STORE", STORE_FILE))
+    cassette: Optional[Cassette] = None
+    if os.getenv("BENCHMARK_CASSETTE"):
+        cassette = Cassette(
+            os.environ["BENCHMARK_CASSETTE"],
+            mode=cast(Any, os.getenv("BENCHMARK_CASSETTE_MODE", "replay")),
+        )
+    done: set[tuple[str, str, str]] = store.keys(CONFIG_HASH)
+
+    tasks: list[tuple[str, str, str, dict[str, Any]]] = [
+        (dataset, question, mode, item)
+        for dataset, questions in bench.items()
+        for question, item in questions.items()
+        for mode in MODES
+        if (dataset, question, mode) not in done
+    ]
+
+    print(f"Run {RUN_ID} with configuration {CONFIG_HASH}")
+    print(f"Skipping {len(done)} existing results")
+    print(f"Running {len(tasks)} tasks with {WORKERS} workers")
+
+    try:
+        # One set of clients serves every worker.
+        clients: tuple[Graph, LLM] = base_grahygie(templates, cassette)
+
+        with ThreadPoolExecutor(max_workers=WORKERS) as executor:
+            futures = [
+                executor.submit(run, store, clients, templates, *task)
+                for task in tasks
+            ]
+            for future in tqdm(as_completed(futures), total=len(futures)):
+                try:
+                    future.result()
+                except Exception as e:
+                    print(f"Failed task: {e}")
+    finally:
+        if cassette is not None:
+            cassette.close()
+
+    if PROFILER is not None:
+        print(f"Profiled queries: {PROFILER.info}")
+        for profile in PROFILER.slowest("db_hits"):
+            print(
+                f"{profile['db_hits']:>12,} db hits "
+                f"{profile['available_after'] + profile['consumed_after']:>8,} ms  "
+                f"{' '.join(profile['query'].split())}"
+            )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,71 @@
+import json
+import os
+from pathlib import Path
+from typing import Any
+
+from benchmark.config import STORE_FILE, config_hash
+from benchmark.store import ResultStore
+
+
+CURRENT_DIR: str = os.path.dirname(os.path.abspath(__file__))
+RESULTS_DIR: str = os.path.join(CURRENT_DIR, "results")
+
+# Run identifier given to rows imported from per-file results.
+LEGACY_RUN: str = "legacy"
+
+
+def migrate(results_dir: str, store: ResultStore, config: str) -> int:
+    """
+    Imports the per-file results (`<dataset>/<mode>_<question>.json`) into the
+    store, skipping those already present for the configuration.
+
+    Returns the number of imported rows.
+    """
+    done: set[tuple[str, str, str]] = store.keys(config)
+    imported: int = 0
+
+    for dataset_dir in sorted(Path(results_dir).iterdir()):
+        if not dataset_dir.is_dir():
+            continue
+
+        for result_file in sorted(dataset_dir.glob("*.json")):
+            mode, _, question = result_file.stem.partition("_")
+            if mode not in ("native", "rag") or not question:
+                continue
+            if (dataset_dir.name, question, mode) in done:
+                continue
+
+            with open(result_file, "r", encoding="utf-8") as f:
+                data: Any = json.load(f)
+
+            store.append(
+                {
+                    "run": LEGACY_RUN,
+                    "config": config,
+                    "dataset": dataset_dir.name,
+                    "question": question,
+                    "mode": mode,
+                    **data,
+                    "timestamp": result_file.stat().st_mtime,
+                }
+            )
+            imported += 1
+
+    return imported
+
+
+def main() -> None:
+    if not os.path.exists(RESULTS_DIR):
+        print(f"❌ Error: Directory '{RESULTS_DIR}' does not exist")
+        exit(1)
+
+    # Per-file results were produced by the current pipeline configuration,
+    # so they are attributed to it and not re-run by the benchmark.
+    store: ResultStore = ResultStore(STORE_FILE)
+    imported: int = migrate(RESULTS_DIR, store, config_hash())
+
+    print(f"✅ Imported {imported} results into '{store.path}'")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Entry point of the approximate nearest neighbour benchmark.
+
+Builds an IVF-PQ index over an embedding store (or synthetic clustered
+vectors) and reports, for each nprobe, the recall@k against exact search and
+the queries per second, with and without exact rescoring, to size the index
+for production.
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from benchmark.perf.measure import measure
+from benchmark.perf.vectors import recall_at_k, synthetic
+from graphygie.embedding import EmbeddingStore, IVFPQIndex
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="ANN index benchmark")
+    parser.add_argument("--source", metavar="PATH", help="store to index")
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--dim", type=int, default=768)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("-k", type=int, default=10)
+    parser.add_argument("--nlist", type=int, help="inverted lists (4 * sqrt(n))")
+    parser.add_argument("-m", type=int, default=32, help="bytes per vector")
+    parser.add_argument("--nprobe", default="1,2,4,8,16,32,64")
+    parser.add_argument("--rescore", type=int, default=4)
+    parser.add_argument("--iterations", type=int, default=3)
+    parser.add_argument("--save", metavar="PATH", help="save the index")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        if args.source:
+            store: EmbeddingStore = EmbeddingStore(args.source)
+        else:
+            vectors: np.ndarray = synthetic(args.rows, args.dim)
+            store = EmbeddingStore.build(
+                os.path.join(directory, "store"),
+                [str(row) for row in range(len(vectors))],
+                vectors,
+                "float32",
+            )
+
+        # Queries are perturbed stored vectors, like paraphrased entity names.
+        rng: np.random.Generator = np.random.default_rng(1)
+        picked: np.ndarray = rng.choice(len(store), args.queries, replace=False)
+        queries: np.ndarray = store.vectors(np.sort(picked)) + 0.25 * (
+            rng.standard_normal((args.queries, store.dim), dtype=np.float32)
+        )
+        rows, _ = store.search(queries, args.k)
+        truth: np.ndarray = store.ids[rows]
+        exact: dict[str, float] = measure(
+            lambda: store.search(queries, args.k), args.iterations, warmup=1
+        )
+
+        start: float = time.perf_counter()
+        index: IVFPQIndex = IVFPQIndex.from_store(store, nlist=args.nlist, m=args.m)
+        built: float = time.perf_counter() - start
+        if args.save:
+            index.save(args.save)
+
+        print(
+            f"📦 {len(index):,} vectors, index {index.nbytes / 2**20:.1f} MiB "
+            f"(store {store.nbytes / 2**20:.1f} MiB), built in {built:.1f}s"
+        )
+        print(
+            f"🎯 Exact search: {exact['ops_per_s'] * args.queries:.1f} queries/s"
+        )
+        print("=" * 70)
+        print(
+            f"{'nprobe':>8}{f'recall@{args.k}':>12}{'queries/s':>12}"
+            f"{f'rescored x{args.rescore}':>20}{'queries/s':>12}"
+        )
+        print("-" * 70)
+        for nprobe in (int(value) for value in args.nprobe.split(",")):
+            found, _ = index.search(queries, args.k, nprobe)
+            rescored, _ = index.search(
+                queries, args.k, nprobe, store=store, rescore=args.rescore
+            )
+            fast: dict[str, float] = measure(
+                lambda: index.search(queries, args.k, nprobe),
+                args.iterations,
+                warmup=0,
+            )
+            slow: dict[str, float] = measure(
+                lambda: index.search(
+                    queries, args.k, nprobe, store=store, rescore=args.rescore
+                ),
+                args.iterations,
+                warmup=0,
+            )
+            print(
+                f"{nprobe:>8}{recall_at_k(found, truth):>12.4f}"
+                f"{fast['ops_per_s'] * args.queries:>12.1f}"
+                f"{recall_at_k(rescored, truth):>20.4f}"
+                f"{slow['ops_per_s'] * args.queries:>12.1f}"
+            )
+        print("=" * 70)
+
+
+if __name__ == "__main__":
+    main()
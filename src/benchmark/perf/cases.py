@@ -0,0 +1,133 @@
+"""
+This module defines the cases of the performance suite: each case is a
+zero-argument function exercising one component on representative input.
+"""
+
+import os
+from typing import Any, Callable, cast
+
+from benchmark.perf.fakes import FakeDatabase, FakeLLM, fake_graph
+from benchmark.util import system_prompt, user_prompt as benchmark_user_prompt
+from graphygie.generation import BasicGenerator
+from graphygie.llm import Message
+from graphygie.retrieval import Graph
+from graphygie.retrieval.database import Neo4j
+from graphygie.retrieval.database.centrality import CENTRALITY
+from graphygie.retrieval.database.neo4j import format_graph
+from util import (
+    Cleaner,
+    Template,
+    compose,
+    generator_system_prompt,
+    read_to_string,
+    strip_after_double_newline,
+    strip_code_fences,
+    strip_think_tags,
+    user_prompt,
+)
+
+
+CURRENT_DIR: str = os.path.dirname(os.path.abspath(__file__))
+PROMPT_DIR: str = os.path.join(os.path.dirname(CURRENT_DIR), "resources/prompt")
+
+CYPHER: str = (
+    'MATCH (c1:CUI)-[r1:PAR|CHD]->(c2:CUI)\nWHERE c1.name CONTAINS "Aspirin"\n'
+    "RETURN c1, c2, r1\nLIMIT 250"
+)
+# A model answer with reasoning around the fenced query.
+FENCED: str = (
+    "Here is the query:\n\n```cypher\n" + CYPHER + "\n```\n\nIt returns a subgraph."
+)
+# A long answer without a closing fence, the worst case of the fence cleaner.
+UNFENCED: str = "```cypher\n" + "MATCH (c:CUI) RETURN c\n" * 400
+# A reasoning model answer (e.g. qwen3).
+THINKING: str = (
+    "<think>\n" + "The user asks about Aspirin.\n" * 40 + "</think>\n\n" + FENCED
+)
+
+CHOICES: dict[str, str] = {
+    "A": "Aspirin",
+    "B": "Ibuprofen",
+    "C": "Paracetamol",
+    "D": "Naproxen",
+}
+
+
+def stream(cleaner: Cleaner, text: str) -> str:
+    """Cleans a text fed as 4-character tokens"""
+    state = cleaner.stream()
+    cleaned: list[str] = [state.feed(text[i : i + 4]) for i in range(0, len(text), 4)]
+    return "".join(cleaned) + state.flush()
+
+
+def offline_cases() -> dict[str, Callable[[], Any]]:
+    """Builds the cases running without any external service"""
+    graph: Any = fake_graph()
+    retrieval: str = format_graph(graph)
+
+    user_template: str = read_to_string(os.path.join(PROMPT_DIR, "user.md"))
+    native_template: str = read_to_string(
+        os.path.join(PROMPT_DIR, "generator_system_native.md")
+    )
+    rag_template: str = read_to_string(
+        os.path.join(PROMPT_DIR, "generator_system_rag.md")
+    )
+    system = [Message(role="system", content=rag_template)]
+    user_template_compiled: Template = Template(user_template, "user")
+    cleaner = compose(strip_code_fences, strip_after_double_newline)
+    thinking_cleaner = compose(
+        strip_think_tags, strip_code_fences, strip_after_double_newline
+    )
+
+    generator = BasicGenerator(
+        retriever=Graph(llm=FakeLLM(CYPHER), database=FakeDatabase(retrieval)),
+        generator=FakeLLM("A"),
+        chat=system,
+        maker=generator_system_prompt,
+    )
+    request = [Message(role="user", content="Which drug inhibits COX-1?")]
+
+    return {
+        "neo4j.format_graph": lambda: format_graph(graph),
+        "neo4j.format_graph_ranked": lambda: format_graph(graph, CENTRALITY, 100),
+        "cleaner.strip_code_fences": lambda: strip_code_fences(FENCED),
+        "cleaner.strip_code_fences_unclosed": lambda: strip_code_fences(UNFENCED),
+        "cleaner.strip_after_double_newline": lambda: strip_after_double_newline(
+            FENCED
+        ),
+        "cleaner.strip_think_tags": lambda: strip_think_tags(THINKING),
+        "cleaner.compose": lambda: cleaner(FENCED),
+        "cleaner.compose_thinking": lambda: thinking_cleaner(THINKING),
+        "cleaner.compose_stream": lambda: stream(cast(Cleaner, cleaner), FENCED),
+        "prompt.generator_system_prompt": lambda: generator_system_prompt(
+            system, retrieval
+        ),
+        "prompt.user_prompt": lambda: user_prompt(
+            user_template, "Information request", "Which drug inhibits COX-1?"
+        ),
+        "prompt.benchmark_user_prompt": lambda: benchmark_user_prompt(
+            user_template, "Answer to a multiple-choice question", "Which?", CHOICES
+        ),
+        "prompt.benchmark_system_prompt": lambda: system_prompt(
+            native_template, list(CHOICES)
+        ),
+        "prompt.template_render": lambda: user_template_compiled.render(
+            strict=False, INTENT="Information request", REQUEST="Which?"
+        ),
+        "generator.basic": lambda: generator.chat(request),
+    }
+
+
+def database_cases(
+    uri: str, username: str, password: str, database: str
+) -> dict[str, Callable[[], Any]]:
+    """Builds the cases querying a running Neo4j instance"""
+    neo4j: Neo4j = Neo4j(
+        uri=uri, username=username, password=password, database=database
+    )
+
+    return {
+        "database.neo4j": lambda: neo4j.query(
+            "MATCH (c1:CUI)-[r:PAR|CHD]->(c2:CUI) RETURN c1, c2, r LIMIT 250"
+        ),
+    }
@@ -0,0 +1,117 @@
+"""
+This module defines offline stand-ins for the external services, so the
+pipeline's own code can be timed without a model or a database:
+
+- FakeLLM: An LLM answering with a fixed response.
+- FakeDatabase: A Database answering with a fixed result.
+- fake_graph: Builds a Neo4j-like result graph for the formatter.
+"""
+
+import time
+from typing import Any, Optional
+
+from graphygie.llm import LLM
+from graphygie.llm.chat import Chat
+from graphygie.retrieval.database import Database
+
+
+class FakeLLM(LLM):
+    """
+    An LLM returning a fixed response, optionally after a fixed delay.
+    """
+
+    def __init__(self, response: str, delay: float = 0.0) -> None:
+        """
+        Initializes the fake LLM.
+
+        Parameters:
+        - response (str): The response returned by every call.
+        - delay (float, optional): Seconds slept before answering. Defaults
+            to 0.
+        """
+        self._response: str = response
+        self._delay: float = delay
+
+    def chat(self, chat: Chat = list()) -> str:
+        if self._delay:
+            time.sleep(self._delay)
+        return self._response
+
+
+class FakeDatabase(Database):
+    """
+    A Database returning a fixed result for every query.
+    """
+
+    def __init__(self, result: str) -> None:
+        """
+        Initializes the fake database.
+
+        Parameters:
+        - result (str): The result returned by every query.
+        """
+        self._result: str = result
+
+    def query(self, query: str) -> str:
+        return self._result
+
+
+class _Node:
+    """A node exposing the `id` and `get` members used by the formatter."""
+
+    def __init__(self, id: int, properties: dict[str, Any]) -> None:
+        self.id: int = id
+        self._properties: dict[str, Any] = properties
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self._properties.get(key, default)
+
+
+class _Relationship:
+    """A relationship exposing the members used by the formatter."""
+
+    def __init__(
+        self, start_node: Optional[_Node], end_node: Optional[_Node], type: str
+    ) -> None:
+        self.start_node: Optional[_Node] = start_node
+        self.end_node: Optional[_Node] = end_node
+        self.type: str = type
+
+
+class _Graph:
+    """A result graph exposing `nodes` and `relationships`."""
+
+    def __init__(self, nodes: list[_Node], relationships: list[_Relationship]) -> None:
+        self.nodes: list[_Node] = nodes
+        self.relationships: list[_Relationship] = relationships
+
+
+def fake_graph(nodes: int = 140, edges: int = 250) -> Any:
+    """
+    Builds a result graph shaped like a typical `LIMIT 250` retrieval.
+
+    Parameters:
+    - nodes (int, optional): The number of CUI nodes. Defaults to 140.
+    - edges (int, optional): The number of relationships. Defaults to 250.
+
+    Returns:
+    - Any: A graph accepted by `format_graph`.
+    """
+    types: tuple[str, ...] = ("PAR", "CHD", "SY", "RO")
+    graph_nodes: list[_Node] = [
+        _Node(
+            i,
+            {
+                "name": f"Concept {i} of the unified medical language system",
+                "centrality": (i * 37 % 101) / 101,
+            },
+        )
+        for i in range(nodes)
+    ]
+    graph_rels: list[_Relationship] = [
+        _Relationship(
+            graph_nodes[i % nodes], graph_nodes[(i * 7 + 1) % nodes], types[i % 4]
+        )
+        for i in range(edges)
+    ]
+    return _Graph(graph_nodes, graph_rels)
@@ -0,0 +1,107 @@
+"""
+Entry point of the import-time benchmark.
+
+Imports each module in a fresh interpreter with `python -X importtime`, and
+prints the median cumulative import time and the slowest dependencies,
+exiting with a non-zero status when a module exceeds the time budget.
+"""
+
+import argparse
+import subprocess
+import sys
+from collections import defaultdict
+
+import numpy as np
+
+
+MODULES: tuple[str, ...] = (
+    "graphygie.llm",
+    "graphygie.retrieval",
+    "graphygie.generation",
+    "graphygie.cassette",
+    "graphygie.llm.openai",
+    "graphygie.llm.ollama",
+    "graphygie.retrieval.database.neo4j",
+)
+
+
+def import_times(module: str) -> dict[str, tuple[int, int]]:
+    """
+    Imports a module in a fresh interpreter.
+
+    Parameters:
+    - module (str): The module to import.
+
+    Returns:
+    - dict[str, tuple[int, int]]: The self and cumulative import time, in
+        microseconds, of every module imported.
+
+    Raises:
+    - RuntimeError: If the import fails.
+    """
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+    )
+    if process.returncode != 0:
+        raise RuntimeError(process.stderr.strip().splitlines()[-1])
+
+    times: dict[str, tuple[int, int]] = {}
+    for line in process.stderr.splitlines():
+        # "import time:   self [us] |  cumulative | imported package"
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        own, cumulative, name = line[len("import time:") :].split("|")
+        times[name.strip()] = (int(own), int(cumulative))
+    return times
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Import-time benchmark")
+    parser.add_argument("modules", nargs="*", default=MODULES)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=5, help="slowest imports shown")
+    parser.add_argument("--budget", type=float, help="maximum milliseconds")
+    args = parser.parse_args()
+
+    over: list[str] = []
+    for module in args.modules:
+        try:
+            runs: list[dict[str, tuple[int, int]]] = [
+                import_times(module) for _ in range(args.repeat)
+            ]
+        except RuntimeError as e:
+            print(f"❌ {module}: {e}")
+            over.append(module)
+            continue
+
+        total: float = float(np.median([run[module][1] for run in runs])) / 1000
+        own: dict[str, list[int]] = defaultdict(list)
+        for run in runs:
+            for name, (self_us, _) in run.items():
+                own[name.split(".")[0]].append(self_us)
+        # Per top-level package, the mean over runs of its summed self time.
+        packages: list[tuple[float, str]] = sorted(
+            (
+                (sum(times) / len(runs) / 1000, name)
+                for name, times in own.items()
+                if name != module.split(".")[0]
+            ),
+            reverse=True,
+        )
+
+        print(f"{module:<40}{total:>10.1f} ms")
+        for duration, name in packages[: args.top]:
+            print(f"    {name:<36}{duration:>10.1f} ms")
+
+        if args.budget is not None and total > args.budget:
+            over.append(module)
+
+    if over:
+        print(f"❌ Failed or over budget: {', '.join(over)}")
+        exit(1)
+
+
+if __name__ == "__main__":
+    main()
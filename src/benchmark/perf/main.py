@@ -0,0 +1,91 @@
+"""
+Entry point of the performance suite.
+
+Times every offline case (and the Neo4j cases when `NEO4J_URI` is set),
+prints p50/p95/p99 latency, throughput and peak memory, and optionally saves
+the measurements as a baseline or compares them against one, exiting with a
+non-zero status on regression.
+"""
+
+import argparse
+import json
+import os
+from typing import Any, Callable
+
+from dotenv import load_dotenv
+
+from benchmark.perf.cases import database_cases, offline_cases
+from benchmark.perf.measure import measure, regressions
+
+
+def report(results: dict[str, dict[str, float]]) -> None:
+    print("=" * 96)
+    print(
+        f"{'case':<40}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"
+        f"{'ops/s':>14}{'peak KiB':>12}"
+    )
+    print("-" * 96)
+    for name, m in results.items():
+        print(
+            f"{name:<40}{m['p50_ms']:>10.4f}{m['p95_ms']:>10.4f}{m['p99_ms']:>10.4f}"
+            f"{m['ops_per_s']:>14.1f}{m['peak_kib']:>12.1f}"
+        )
+    print("=" * 96)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Graphygie performance suite")
+    parser.add_argument("--iterations", type=int, default=1000)
+    parser.add_argument("--save", metavar="PATH", help="save results as baseline")
+    parser.add_argument("--compare", metavar="PATH", help="baseline to compare to")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.2,
+        help="tolerated relative p50 slowdown (default: 0.2)",
+    )
+    args = parser.parse_args()
+
+    load_dotenv()
+
+    cases: dict[str, Callable[[], Any]] = offline_cases()
+    if os.getenv("NEO4J_URI"):
+        cases |= database_cases(
+            uri=os.environ["NEO4J_URI"],
+            username=os.getenv("NEO4J_USERNAME", "neo4j"),
+            password=os.getenv("NEO4J_PASSWORD", ""),
+            database=os.getenv("NEO4J_DATABASE", "neo4j"),
+        )
+
+    results: dict[str, dict[str, float]] = {}
+    for name, case in cases.items():
+        # Database round trips are orders of magnitude slower than the rest.
+        iterations: int = (
+            max(1, args.iterations // 20)
+            if name.startswith("database.")
+            else args.iterations
+        )
+        results[name] = measure(case, iterations=iterations)
+
+    report(results)
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=4)
+        print(f"💾 Baseline saved to '{args.save}'")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline: dict[str, dict[str, float]] = json.load(f)
+
+        found: list[str] = regressions(baseline, results, args.threshold)
+        if found:
+            print("❌ Regressions:")
+            for line in found:
+                print(f"  {line}")
+            exit(1)
+        print("✅ No regression")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+This module defines the helpers timing a component: latency percentiles,
+throughput and peak memory of repeated calls.
+"""
+
+import time
+import tracemalloc
+from typing import Any, Callable
+
+import numpy as np
+
+
+def measure(
+    func: Callable[[], Any], iterations: int = 1000, warmup: int = 10
+) -> dict[str, float]:
+    """
+    Times repeated calls of a function.
+
+    Latencies are measured without memory tracing; the peak memory is taken
+    from one extra traced call so tracing does not skew the timings.
+
+    Parameters:
+    - func (Callable[[], Any]): The function to call.
+    - iterations (int, optional): The number of timed calls. Defaults to 1000.
+    - warmup (int, optional): The number of untimed calls made first.
+        Defaults to 10.
+
+    Returns:
+    - dict[str, float]: The p50/p95/p99 latencies (milliseconds), the
+        throughput (calls per second) and the peak memory (KiB).
+    """
+    for _ in range(warmup):
+        func()
+
+    samples: np.ndarray = np.empty(iterations)
+    for i in range(iterations):
+        start: float = time.perf_counter()
+        func()
+        samples[i] = time.perf_counter() - start
+
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    p50, p95, p99 = np.percentile(samples * 1000.0, [50, 95, 99])
+    return {
+        "p50_ms": float(p50),
+        "p95_ms": float(p95),
+        "p99_ms": float(p99),
+        "ops_per_s": float(iterations / samples.sum()),
+        "peak_kib": peak / 1024.0,
+    }
+
+
+def regressions(
+    baseline: dict[str, dict[str, float]],
+    current: dict[str, dict[str, float]],
+    threshold: float,
+) -> list[str]:
+    """
+    Lists the cases whose median latency grew by more than the threshold.
+
+    Parameters:
+    - baseline (dict[str, dict[str, float]]): The saved measurements.
+    - current (dict[str, dict[str, float]]): The new measurements.
+    - threshold (float): The tolerated relative slowdown (e.g. 0.2 for 20%).
+
+    Returns:
+    - list[str]: A description of each regression; cases missing from either
+        side are ignored.
+    """
+    found: list[str] = []
+    for name, before in baseline.items():
+        after = current.get(name)
+        if after is None:
+            continue
+        ratio: float = after["p50_ms"] / before["p50_ms"] if before["p50_ms"] else 1.0
+        if ratio > 1.0 + threshold:
+            found.append(
+                f"{name}: p50 {before['p50_ms']:.4f} ms -> {after['p50_ms']:.4f} ms "
+                f"(+{(ratio - 1.0) * 100:.1f}%)"
+            )
+    return found
@@ -0,0 +1,115 @@
+"""
+Entry point of the UMLS import benchmark.
+
+Generates a synthetic UMLS release (MRCONSO, MRREL and MRSTY files with the
+RRF layout, sorted on their CUI, with duplicated rows) and converts it to
+`neo4j-admin database import` CSV files, reporting the rows per second of
+each file and the nodes and relationships written.
+"""
+
+import argparse
+import os
+import random
+import tempfile
+
+from graphygie.ingestion.umls import export_rrf
+
+
+def synthetic_rrf(
+    directory: str,
+    concepts: int,
+    atoms: int = 4,
+    relationships: int = 6,
+    duplicates: float = 0.1,
+    seed: int = 0,
+) -> dict[str, int]:
+    """
+    Writes a synthetic UMLS release.
+
+    Parameters:
+    - directory (str): The directory of the RRF files.
+    - concepts (int): The number of concepts.
+    - atoms (int, optional): The mean number of atoms per concept. Defaults
+        to 4.
+    - relationships (int, optional): The mean number of relationships per
+        concept. Defaults to 6.
+    - duplicates (float, optional): The fraction of relationship and semantic
+        type rows written twice (as from two sources). Defaults to 0.1.
+    - seed (int, optional): The random seed. Defaults to 0.
+
+    Returns:
+    - dict[str, int]: The number of rows of each file.
+    """
+    rng: random.Random = random.Random(seed)
+    languages: tuple[str, ...] = ("ENG", "ENG", "ENG", "FRE")
+    types: tuple[str, ...] = ("PAR", "CHD", "SY", "RO", "RB", "RN", "RQ", "SIB")
+    rows: dict[str, int] = {"MRCONSO": 0, "MRREL": 0, "MRSTY": 0}
+    aui: int = 0
+
+    with (
+        open(os.path.join(directory, "MRCONSO.RRF"), "w", encoding="utf-8") as conso,
+        open(os.path.join(directory, "MRREL.RRF"), "w", encoding="utf-8") as rel,
+        open(os.path.join(directory, "MRSTY.RRF"), "w", encoding="utf-8") as sty,
+    ):
+        for i in range(concepts):
+            cui: str = f"C{i:07d}"
+            first: int = aui
+            for j in range(rng.randint(1, 2 * atoms - 1)):
+                ts, stt, ispref = ("P", "PF", "Y") if j == 0 else ("S", "VO", "N")
+                conso.write(
+                    f"{cui}|{rng.choice(languages)}|{ts}|L{aui:07d}|{stt}|"
+                    f"S{aui:07d}|{ispref}|A{aui:08d}|||||PT||"
+                    f"Concept {i} term {j}|0|N||\n"
+                )
+                aui += 1
+            rows["MRCONSO"] += aui - first
+
+            for _ in range(rng.randint(0, 2 * relationships)):
+                other: int = rng.randrange(concepts)
+                row: str = (
+                    f"{cui}|A{rng.randrange(first, aui):08d}|AUI|"
+                    f"{rng.choice(types)}|C{other:07d}|A{other * atoms:08d}|AUI|"
+                    "||R0000000||SRC|SRC|||N||\n"
+                )
+                copies: int = 2 if rng.random() < duplicates else 1
+                rel.write(row * copies)
+                rows["MRREL"] += copies
+
+            tui: int = rng.randrange(127)
+            copies = 2 if rng.random() < duplicates else 1
+            sty.write(f"{cui}|T{tui:03d}|A1.{tui}|Type {tui}|AT{i:08d}||\n" * copies)
+            rows["MRSTY"] += copies
+
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="UMLS import benchmark")
+    parser.add_argument("--concepts", type=int, default=200000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        source: str = os.path.join(directory, "META")
+        output: str = os.path.join(directory, "import")
+        os.makedirs(source)
+        rows: dict[str, int] = synthetic_rrf(source, args.concepts)
+        print(f"Synthetic release: {rows}")
+
+        stats = export_rrf(source, output, workers=args.workers)
+
+    print(f"{'file':<12}{'rows':>12}{'rows/s':>14}{'dropped':>10}  written")
+    for name, counts in stats.items():
+        written: str = ", ".join(
+            f"{key} {int(value):,}"
+            for key, value in counts.items()
+            if key not in ("rows", "duplicates", "seconds", "rows_per_s")
+        )
+        print(
+            f"{name:<12}{int(counts['rows']):>12,}{counts['rows_per_s']:>14,.0f}"
+            f"{int(counts['duplicates']):>10,}  {written}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""
+Entry point of the embedding store benchmark.
+
+Builds float16 and int8 stores from the same embeddings (an existing store, or
+synthetic clustered vectors) and reports, against the float32 baseline, the
+memory of each store, its recall@k and its query latency and throughput.
+"""
+
+import argparse
+import os
+import tempfile
+from typing import Callable
+
+import numpy as np
+
+from benchmark.perf.measure import measure
+from graphygie.embedding import EmbeddingStore
+
+
+def synthetic(rows: int, dim: int, clusters: int = 256, seed: int = 0) -> np.ndarray:
+    """
+    Generates clustered vectors, closer to real embeddings than uniform noise.
+
+    Parameters:
+    - rows (int): The number of vectors.
+    - dim (int): Their dimension.
+    - clusters (int, optional): The number of cluster centers. Defaults to 256.
+    - seed (int, optional): The random seed. Defaults to 0.
+
+    Returns:
+    - np.ndarray: The (rows, dim) float32 vectors.
+    """
+    rng: np.random.Generator = np.random.default_rng(seed)
+    centers: np.ndarray = rng.standard_normal((clusters, dim), dtype=np.float32)
+    labels: np.ndarray = rng.integers(0, clusters, rows)
+    noise: np.ndarray = rng.standard_normal((rows, dim), dtype=np.float32)
+    return centers[labels] + 0.75 * noise
+
+
+def recall_at_k(found: np.ndarray, truth: np.ndarray) -> float:
+    """
+    Computes the mean fraction of the true top-k found by a search.
+
+    Parameters:
+    - found (np.ndarray): The (q, k) rows returned by the search.
+    - truth (np.ndarray): The (q, k) exact rows.
+
+    Returns:
+    - float: The recall@k, in [0, 1].
+    """
+    hits: int = sum(
+        np.intersect1d(a, b, assume_unique=True).size for a, b in zip(found, truth)
+    )
+    return hits / truth.size if truth.size else 1.0
+
+
+def report(
+    name: str,
+    nbytes: int,
+    baseline_nbytes: int,
+    recall: float,
+    search: Callable[[], object],
+    queries: int,
+    iterations: int,
+) -> None:
+    timing: dict[str, float] = measure(search, iterations=iterations, warmup=1)
+    print(
+        f"{name:<24}{nbytes / 2**20:>10.1f}{nbytes / baseline_nbytes:>9.2f}"
+        f"{recall:>11.4f}{timing['p50_ms'] / queries:>12.4f}"
+        f"{timing['ops_per_s'] * queries:>12.1f}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Embedding store benchmark")
+    parser.add_argument("--source", metavar="PATH", help="store to benchmark")
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--dim", type=int, default=768)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("-k", type=int, default=10)
+    parser.add_argument("--rescore", type=int, default=4)
+    parser.add_argument("--iterations", type=int, default=5)
+    args = parser.parse_args()
+
+    if args.source:
+        source: EmbeddingStore = EmbeddingStore(args.source)
+        ids: list[str] = source.ids.tolist()
+        vectors: np.ndarray = source.vectors(slice(None))
+    else:
+        vectors = synthetic(args.rows, args.dim)
+        ids = [str(row) for row in range(len(vectors))]
+
+    # Queries are perturbed stored vectors, like paraphrased entity names.
+    rng: np.random.Generator = np.random.default_rng(1)
+    picked: np.ndarray = rng.choice(len(vectors), args.queries, replace=False)
+    queries: np.ndarray = vectors[picked] + 0.25 * rng.standard_normal(
+        (args.queries, vectors.shape[1]), dtype=np.float32
+    )
+
+    with tempfile.TemporaryDirectory() as directory:
+        baseline: EmbeddingStore = EmbeddingStore.build(
+            os.path.join(directory, "float32"), ids, vectors, "float32"
+        )
+        truth, _ = baseline.search(queries, args.k)
+
+        print("=" * 78)
+        print(
+            f"{'store':<24}{'MiB':>10}{'ratio':>9}{f'recall@{args.k}':>11}"
+            f"{'ms/query':>12}{'queries/s':>12}"
+        )
+        print("-" * 78)
+        report(
+            "float32",
+            baseline.nbytes,
+            baseline.nbytes,
+            1.0,
+            lambda: baseline.search(queries, args.k),
+            args.queries,
+            args.iterations,
+        )
+        for precision, rescore in (("float16", 1), ("int8", 1), ("int8", args.rescore)):
+            store: EmbeddingStore = EmbeddingStore.build(
+                os.path.join(directory, f"{precision}-{rescore}"),
+                ids,
+                vectors,
+                precision,
+                keep_float32=rescore > 1,
+            )
+            found, _ = store.search(queries, args.k, rescore)
+            report(
+                precision + (f" + rescore x{rescore}" if rescore > 1 else ""),
+                store.nbytes,
+                baseline.nbytes,
+                recall_at_k(found, truth),
+                lambda: store.search(queries, args.k, rescore),
+                args.queries,
+                args.iterations,
+            )
+        print("=" * 78)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,6 @@
 """
-This module exposes the public interface for the graph-based retriever
-component.
+This module exposes the retrieval components of the benchmark; the database
+layer is in `benchmark.retrieval.database`.
 """
 
-from .graph import GraphExtra
-
-__all__: list[str] = ["GraphExtra"]
+__all__: list[str] = []
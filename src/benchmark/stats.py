@@ -1,155 +1,324 @@
 import json
+import math
 import os
-from pathlib import Path
-from statistics import mean, median
 from typing import Any
 
+import numpy as np
+
+from benchmark.config import STORE_FILE
+from benchmark.store import ResultStore
+
 
 CURRENT_DIR: str = os.path.dirname(os.path.abspath(__file__))
-RESULTS_DIR: str = os.path.join(CURRENT_DIR, "results")
 BENCHMARK_FILE: str = os.path.join(CURRENT_DIR, "benchmark.json")
 
+BOOTSTRAP_RESAMPLES: int = 10_000
+CONFIDENCE: float = 0.95
+SEED: int = 0
+
+FIELDS: list[str] = [
+    "config",
+    "dataset",
+    "question",
+    "mode",
+    "response",
+    "error",
+    "nodes",
+    "edges",
+]
+TIMINGS: list[str] = ["query_time", "database_time", "generation_time", "total_time"]
+
+
 def load_benchmark(benchmark_path: str) -> Any:
     """Load the benchmark.json file"""
     with open(benchmark_path, 'r', encoding='utf-8') as f:
         return json.load(f)
 
 
-def analyze_results(results_dir: str, benchmark_path: str) -> dict[str, Any]:
-    """Analyze native and RAG results"""
-    
+def load_columns(store: ResultStore) -> dict[str, np.ndarray]:
+    """Load the store as arrays, keeping the latest row of each evaluation"""
+    columns: dict[str, list[Any]] = store.columns(FIELDS + TIMINGS)
+
+    latest: dict[tuple[Any, ...], int] = {
+        key: i
+        for i, key in enumerate(
+            zip(
+                columns["config"],
+                columns["dataset"],
+                columns["question"],
+                columns["mode"],
+            )
+        )
+    }
+    index: np.ndarray = np.fromiter(latest.values(), dtype=np.int64, count=len(latest))
+
+    # The short key fields are stored as fixed-width unicode so comparisons
+    # stay vectorized; the responses as objects, as one long response would
+    # widen every row.
+    arrays: dict[str, np.ndarray] = {}
+    for field in FIELDS[:5]:
+        arrays[field] = np.asarray(
+            ["" if v is None else v for v in columns[field]],
+            dtype=object if field == "response" else str,
+        )[index]
+    for field in FIELDS[5:] + TIMINGS:
+        arrays[field] = np.asarray(
+            [np.nan if v is None else v for v in columns[field]], dtype=float
+        )[index]
+    return arrays
+
+
+def bootstrap_ci(correct: int, total: int, rng: np.random.Generator) -> list[float]:
+    """
+    Percentile bootstrap CI of an accuracy (%).
+
+    Resampling n Bernoulli outcomes with replacement is a Binomial(n, p)
+    draw, so all resamples are drawn at once without materializing them.
+    """
+    if total == 0:
+        return [0.0, 0.0]
+    samples: np.ndarray = rng.binomial(total, correct / total, BOOTSTRAP_RESAMPLES)
+    alpha: float = (1.0 - CONFIDENCE) / 2.0
+    low, high = np.quantile(samples / total * 100, [alpha, 1.0 - alpha])
+    return [float(low), float(high)]
+
+
+def paired_bootstrap_ci(
+    native_only: int, rag_only: int, total: int, rng: np.random.Generator
+) -> list[float]:
+    """
+    Percentile bootstrap CI of the paired accuracy difference RAG - native
+    (points), drawing the discordant counts of every resample at once.
+    """
+    if total == 0:
+        return [0.0, 0.0]
+    p: list[float] = [native_only / total, rag_only / total]
+    p.append(max(0.0, 1.0 - p[0] - p[1]))
+    counts: np.ndarray = rng.multinomial(total, p, BOOTSTRAP_RESAMPLES)
+    diffs: np.ndarray = (counts[:, 1] - counts[:, 0]) / total * 100
+    alpha: float = (1.0 - CONFIDENCE) / 2.0
+    low, high = np.quantile(diffs, [alpha, 1.0 - alpha])
+    return [float(low), float(high)]
+
+
+def mcnemar(native_only: int, rag_only: int) -> float:
+    """
+    Two-sided p-value of McNemar's test on the discordant pairs: exact
+    binomial test below 25 pairs, chi-square with continuity correction above.
+    """
+    n: int = native_only + rag_only
+    if n == 0:
+        return 1.0
+    if n < 25:
+        k: int = min(native_only, rag_only)
+        tail: float = sum(math.comb(n, i) for i in range(k + 1)) / 2**n
+        return min(1.0, 2.0 * tail)
+    statistic: float = (abs(native_only - rag_only) - 1) ** 2 / n
+    return math.erfc(math.sqrt(statistic / 2.0))
+
+
+def accuracy(correct: np.ndarray, rng: np.random.Generator) -> dict[str, Any]:
+    """Accuracy (%) of a boolean array with its bootstrap CI"""
+    total: int = int(correct.size)
+    hits: int = int(correct.sum())
+    return {
+        "correct": hits,
+        "total": total,
+        "accuracy": hits / total * 100 if total else 0.0,
+        "ci": bootstrap_ci(hits, total, rng),
+    }
+
+
+def paired(
+    data: dict[str, np.ndarray], correct: np.ndarray, rng: np.random.Generator
+) -> dict[str, Any]:
+    """Paired native-vs-RAG comparison on questions answered in both modes"""
+    native: np.ndarray = data["mode"] == "native"
+    keys: np.ndarray = np.char.add(np.char.add(data["dataset"], "/"), data["question"])
+
+    # Rows are unique per (dataset, question, mode) once deduplicated.
+    _, native_index, rag_index = np.intersect1d(
+        keys[native], keys[~native], assume_unique=True, return_indices=True
+    )
+    native_correct: np.ndarray = correct[native][native_index]
+    rag_correct: np.ndarray = correct[~native][rag_index]
+
+    total: int = int(rag_correct.size)
+    native_only: int = int((native_correct & ~rag_correct).sum())
+    rag_only: int = int((rag_correct & ~native_correct).sum())
+    return {
+        "pairs": total,
+        "native_only": native_only,
+        "rag_only": rag_only,
+        "difference": (rag_only - native_only) / total * 100 if total else 0.0,
+        "ci": paired_bootstrap_ci(native_only, rag_only, total, rng),
+        "p_value": mcnemar(native_only, rag_only),
+    }
+
+
+def summary(values: np.ndarray) -> dict[str, float]:
+    """Mean and median of the non-missing values"""
+    values = values[~np.isnan(values)]
+    if not values.size:
+        return {"mean": 0, "median": 0}
+    return {"mean": float(values.mean()), "median": float(np.median(values))}
+
+
+def percentiles(values: np.ndarray) -> dict[str, float] | None:
+    """Latency percentiles (seconds), or None without timing data"""
+    values = values[~np.isnan(values)]
+    if not values.size:
+        return None
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return {"p50": float(p50), "p95": float(p95), "p99": float(p99)}
+
+
+def analyze_group(
+    data: dict[str, np.ndarray], correct: np.ndarray, rng: np.random.Generator
+) -> dict[str, Any]:
+    """Accuracies and paired comparison of one group of rows"""
+    native: np.ndarray = data["mode"] == "native"
+    return {
+        "native": accuracy(correct[native], rng),
+        "rag": accuracy(correct[~native], rng),
+        "paired": paired(data, correct, rng),
+    }
+
+
+def analyze_config(
+    data: dict[str, np.ndarray], correct: np.ndarray, rng: np.random.Generator
+) -> dict[str, Any]:
+    """Per-dataset and overall statistics of one configuration"""
+    datasets: dict[str, Any] = {}
+    for dataset in np.unique(data["dataset"]):
+        mask: np.ndarray = data["dataset"] == dataset
+        datasets[dataset] = analyze_group(
+            {k: v[mask] for k, v in data.items()}, correct[mask], rng
+        )
+
+    rag: np.ndarray = data["mode"] == "rag"
+    latency: dict[str, Any] = {}
+    for mode in ("native", "rag"):
+        mask = data["mode"] == mode
+        for stage in TIMINGS:
+            stats = percentiles(data[stage][mask])
+            if stats is not None:
+                latency.setdefault(mode, {})[stage] = stats
+
+    return {
+        "all": analyze_group(data, correct, rng),
+        "datasets": datasets,
+        "metrics": {
+            "errors": summary(data["error"][rag]),
+            "nodes": summary(data["nodes"][rag]),
+            "edges": summary(data["edges"][rag]),
+        },
+        "latency": latency,
+    }
+
+
+def print_group(name: str, group: dict[str, Any]) -> None:
+    print(f"  📂 {name}")
+    for mode, icon in (("native", "🔵"), ("rag", "🟢")):
+        acc: dict[str, Any] = group[mode]
+        print(
+            f"    {icon} {mode.upper():<6} {acc['correct']}/{acc['total']}"
+            f" = {acc['accuracy']:.2f}%"
+            f" [{acc['ci'][0]:.2f}, {acc['ci'][1]:.2f}]"
+        )
+    pair: dict[str, Any] = group["paired"]
+    if pair["pairs"]:
+        print(
+            f"    ⚖️  RAG - NATIVE {pair['difference']:+.2f} pts"
+            f" [{pair['ci'][0]:+.2f}, {pair['ci'][1]:+.2f}]"
+            f" on {pair['pairs']} pairs"
+            f" (McNemar p={pair['p_value']:.4f},"
+            f" {pair['rag_only']} RAG-only / {pair['native_only']} native-only)"
+        )
+
+
+def analyze_results(store_path: str, benchmark_path: str) -> dict[str, Any]:
+    """Analyze native and RAG results, per configuration and dataset"""
+
     # Load benchmark
     benchmark: Any = load_benchmark(benchmark_path)
-    
-    # Statistics
-    native_correct: int = 0
-    native_total: int = 0
-    rag_correct: int = 0
-    rag_total: int = 0
-    
-    # For RAG metrics
-    rag_errors: list[int] = []
-    rag_nodes: list[int] = []
-    rag_edges: list[int] = []
-    
-    # Browse all datasets
-    results_path = Path(results_dir)
-    
-    for dataset_dir in results_path.iterdir():
-        if not dataset_dir.is_dir():
-            continue
-            
-        dataset_name: str = dataset_dir.name
-        
-        if dataset_name not in benchmark:
-            print(f"⚠️  Dataset '{dataset_name}' not found in benchmark.json")
-            continue
-        
-        # Browse result files
-        for result_file in dataset_dir.glob("*.json"):
-            filename: str = result_file.name
-            
-            # Identify type (native or rag) and question
-            if filename.startswith("native_"):
-                question_name: str = filename[7:-5]  # Remove "native_" and ".json"
-                result_type: str = "native"
-            elif filename.startswith("rag_"):
-                question_name: str = filename[4:-5]  # Remove "rag_" and ".json"
-                result_type: str = "rag"
-            else:
-                continue
-            
-            # Check if question exists in benchmark
-            if question_name not in benchmark[dataset_name]:
-                print(f"⚠️  Question '{question_name}' not found in benchmark[{dataset_name}]")
-                continue
-            
-            # Load result
-            with open(result_file, 'r', encoding='utf-8') as f:
-                result: Any = json.load(f)
-            
-            # Get correct answer
-            correct_answer: str = benchmark[dataset_name][question_name]["answer"]
-            user_response: str = result.get("response")
-            
-            # Count results
-            if result_type == "native":
-                native_total += 1
-                if user_response == correct_answer:
-                    native_correct += 1
-            else:  # rag
-                rag_total += 1
-                if user_response == correct_answer:
-                    rag_correct += 1
-                
-                # Collect RAG metrics
-                rag_errors.append(result.get("error", 0))
-                rag_nodes.append(result.get("nodes", 0))
-                rag_edges.append(result.get("edges", 0))
-    
-    # Calculate accuracy rates
-    native_accuracy: float = (native_correct / native_total * 100) if native_total > 0 else 0
-    rag_accuracy: float = (rag_correct / rag_total * 100) if rag_total > 0 else 0
-    
+    data: dict[str, np.ndarray] = load_columns(ResultStore(store_path))
+
+    # Join with the expected answers, dropping unknown questions
+    answers: dict[tuple[str, str], str] = {
+        (dataset, question): item["answer"]
+        for dataset, questions in benchmark.items()
+        for question, item in questions.items()
+    }
+    expected: list[str | None] = [
+        answers.get(key) for key in zip(data["dataset"], data["question"])
+    ]
+    known: np.ndarray = np.fromiter(
+        (answer is not None for answer in expected), dtype=bool, count=len(expected)
+    )
+    if not known.all():
+        print(f"⚠️  {int((~known).sum())} results not found in benchmark.json")
+    data = {k: v[known] for k, v in data.items()}
+    correct: np.ndarray = data["response"] == np.asarray(
+        [answer for answer in expected if answer is not None], dtype=object
+    )
+
+    rng: np.random.Generator = np.random.default_rng(SEED)
+    results: dict[str, Any] = {}
+    for config in np.unique(data["config"]):
+        mask: np.ndarray = data["config"] == config
+        results[config] = analyze_config(
+            {k: v[mask] for k, v in data.items()}, correct[mask], rng
+        )
+
     # Display results
     print("=" * 60)
     print("📊 ANALYSIS RESULTS")
+    print(f"   {CONFIDENCE:.0%} bootstrap CIs over {BOOTSTRAP_RESAMPLES} resamples")
     print("=" * 60)
+
+    for config, result in results.items():
+        print()
+        print(f"⚙️  CONFIG {config}")
+        print_group("all", result["all"])
+        if len(result["datasets"]) > 1:
+            for dataset, group in result["datasets"].items():
+                print_group(dataset, group)
+
+        metrics: dict[str, Any] = result["metrics"]
+        print("  📉 RAG METRICS")
+        for name in ("errors", "nodes", "edges"):
+            print(
+                f"    {name.capitalize():<10} - Mean: {metrics[name]['mean']:.2f}"
+                f" | Median: {metrics[name]['median']:.2f}"
+            )
+
+        for mode, stages in result["latency"].items():
+            print(f"  ⏱️  {mode.upper()} LATENCY (s)")
+            for stage, p in stages.items():
+                print(
+                    f"    {stage:<16} p50: {p['p50']:.3f} | p95: {p['p95']:.3f}"
+                    f" | p99: {p['p99']:.3f}"
+                )
     print()
-    
-    print("🔵 NATIVE")
-    print(f"  ✓ Correct answers: {native_correct}/{native_total}")
-    print(f"  📈 Accuracy rate: {native_accuracy:.2f}%")
-    print()
-    
-    print("🟢 RAG")
-    print(f"  ✓ Correct answers: {rag_correct}/{rag_total}")
-    print(f"  📈 Accuracy rate: {rag_accuracy:.2f}%")
-    print()
-    
-    if rag_errors:
-        print("📉 RAG METRICS")
-        print(f"  Errors     - Mean: {mean(rag_errors):.2f} | Median: {median(rag_errors):.2f}")
-        print(f"  Nodes      - Mean: {mean(rag_nodes):.2f} | Median: {median(rag_nodes):.2f}")
-        print(f"  Edges      - Mean: {mean(rag_edges):.2f} | Median: {median(rag_edges):.2f}")
-    print()
-    
+
     print("=" * 60)
-    
+
     # Return results for programmatic use
-    return {
-        "native": {
-            "correct": native_correct,
-            "total": native_total,
-            "accuracy": native_accuracy
-        },
-        "rag": {
-            "correct": rag_correct,
-            "total": rag_total,
-            "accuracy": rag_accuracy,
-            "metrics": {
-                "errors": {"mean": mean(rag_errors) if rag_errors else 0, 
-                          "median": median(rag_errors) if rag_errors else 0},
-                "nodes": {"mean": mean(rag_nodes) if rag_nodes else 0, 
-                         "median": median(rag_nodes) if rag_nodes else 0},
-                "edges": {"mean": mean(rag_edges) if rag_edges else 0, 
-                         "median": median(rag_edges) if rag_edges else 0}
-            }
-        }
-    }
+    return results
 
 def main() -> None:
     # Check if files exist
-    if not os.path.exists(RESULTS_DIR):
-        print(f"❌ Error: Directory '{RESULTS_DIR}' does not exist")
+    if not os.path.exists(STORE_FILE):
+        print(f"❌ Error: File '{STORE_FILE}' does not exist (run benchmark-migrate)")
         exit(1)
-    
+
     if not os.path.exists(BENCHMARK_FILE):
         print(f"❌ Error: File '{BENCHMARK_FILE}' does not exist")
         exit(1)
-    
+
     # Run analysis
-    results: dict[str, Any] = analyze_results(RESULTS_DIR, BENCHMARK_FILE)
+    results: dict[str, Any] = analyze_results(STORE_FILE, BENCHMARK_FILE)
 
 if __name__ == "__main__":
     main()
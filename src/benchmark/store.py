@@ -0,0 +1,105 @@
+"""
+This module defines the ResultStore class, an append-only JSON Lines file
+holding one row per (dataset, question, mode) evaluation of a benchmark run.
+"""
+
+import json
+import os
+import threading
+from typing import Any, Iterator, Optional
+
+
+class ResultStore:
+    """
+    An append-only store of benchmark results backed by a JSON Lines file.
+
+    Each row is written with a single `write` on a file opened in append mode,
+    so rows from concurrent threads or processes never interleave. Lines left
+    incomplete by an interrupted write are ignored when loading.
+
+    Attributes:
+    - _path (str): The path of the JSON Lines file.
+    - _lock (threading.Lock): Serializes appends from threads of this process.
+    """
+
+    def __init__(self, path: str) -> None:
+        """
+        Initializes the store, creating its parent directory if needed.
+
+        Parameters:
+        - path (str): The path of the JSON Lines file.
+        """
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._path: str = path
+        self._lock: threading.Lock = threading.Lock()
+
+    @property
+    def path(self) -> str:
+        """Gets the path of the JSON Lines file."""
+        return self._path
+
+    def append(self, row: dict[str, Any]) -> None:
+        """
+        Appends a row to the store and flushes it to disk.
+
+        Parameters:
+        - row (dict[str, Any]): The JSON-serializable row to append.
+        """
+        line: bytes = (json.dumps(row, ensure_ascii=False) + "\n").encode("utf-8")
+        with self._lock:
+            fd: int = os.open(self._path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(fd, line)
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+
+    def rows(self) -> Iterator[dict[str, Any]]:
+        """
+        Iterates over the rows of the store, in insertion order.
+
+        Returns:
+        - Iterator[dict[str, Any]]: The rows; an empty iterator if the file
+            does not exist yet.
+        """
+        if not os.path.exists(self._path):
+            return
+        with open(self._path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue
+
+    def columns(self, fields: Optional[list[str]] = None) -> dict[str, list[Any]]:
+        """
+        Loads the store as columns, missing values being None.
+
+        Parameters:
+        - fields (Optional[list[str]]): The columns to load. If None, every
+            field seen in the store is loaded.
+
+        Returns:
+        - dict[str, list[Any]]: One list per column, all of the same length.
+        """
+        rows: list[dict[str, Any]] = list(self.rows())
+        if fields is None:
+            fields = list(dict.fromkeys(key for row in rows for key in row))
+        return {field: [row.get(field) for row in rows] for field in fields}
+
+    def keys(self, config: str) -> set[tuple[str, str, str]]:
+        """
+        Returns the (dataset, question, mode) triples already stored for a
+        configuration.
+
+        Parameters:
+        - config (str): The configuration hash to match.
+
+        Returns:
+        - set[tuple[str, str, str]]: The evaluated triples.
+        """
+        return {
+            (row["dataset"], row["question"], row["mode"])
+            for row in self.rows()
+            if row.get("config") == config
+        }
@@ -1,12 +1,17 @@
-def system_prompt(base: str, choices: list[str]) -> str:
+from util import Template, compile_template
+
+
+def system_prompt(base: str | Template, choices: list[str]) -> str:
     """
     Replaces placeholders in the base string with the given choices.
 
     Parameters:
-    - base (str): The template string containing placeholders '{{CHOICES}}'.
+    - base (str | Template): The template containing placeholders
+        '{{CHOICES}}'; strings are parsed once and cached.
     - choices (list[str]): Possible choices for the answer
 
     Returns:
     - str: The formatted string with placeholders replaced.
     """
-    return base.replace("{{CHOICES}}", " or ".join(choices))
+    template: Template = base if isinstance(base, Template) else compile_template(base)
+    return template.render(strict=False, CHOICES=" or ".join(choices))
@@ -1,11 +1,17 @@
-def user_prompt(base: str, intent: str, request: str, choices: dict[str, str]) -> str:
+from util import Template, compile_template
+
+
+def user_prompt(
+    base: str | Template, intent: str, request: str, choices: dict[str, str]
+) -> str:
     """
     Replaces placeholders in the base string with the given intent and
     request.
 
     Parameters:
-    - base (str): The template string containing placeholders '{{INTENT}}',
-        '{{REQUEST}}' and '{{CHOICES}}'.
+    - base (str | Template): The template containing placeholders
+        '{{INTENT}}', '{{REQUEST}}' and '{{CHOICES}}'; strings are parsed once
+        and cached.
     - intent (str): The intent to insert into the template.
     - request (str): The specific request to insert into the template.
     - choices (dict[str, str]): Possible choices for the answer
@@ -13,11 +19,10 @@ def user_prompt(base: str, intent: str, request: str, choices: dict[str, str]) -
     Returns:
     - str: The formatted string with placeholders replaced.
     """
-    return (
-        base.replace("{{INTENT}}", intent)
-        .replace("{{REQUEST}}", request)
-        .replace(
-            "{{CHOICES}}",
-            "\n".join(f"{key}: {value}" for key, value in choices.items()),
-        )
+    template: Template = base if isinstance(base, Template) else compile_template(base)
+    return template.render(
+        strict=False,
+        INTENT=intent,
+        REQUEST=request,
+        CHOICES="\n".join(f"{key}: {value}" for key, value in choices.items()),
     )
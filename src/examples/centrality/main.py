@@ -0,0 +1,53 @@
+"""
+Writes the centrality of every concept of the Neo4j database, with the Graph
+Data Science plugin, so the Neo4j database formats the most central retrieved
+relationships first.
+"""
+
+import argparse
+import os
+import time
+
+from dotenv import load_dotenv
+from neo4j import GraphDatabase
+
+from graphygie.retrieval.database import compute_centrality
+from util import unwrap
+
+
+def main() -> None:
+    load_dotenv()
+
+    parser = argparse.ArgumentParser(description="Concept centrality")
+    parser.add_argument(
+        "--algorithm", choices=("pagerank", "degree"), default="pagerank"
+    )
+    parser.add_argument("--iterations", type=int, default=20)
+    args = parser.parse_args()
+
+    driver = GraphDatabase.driver(
+        unwrap(os.getenv("NEO4J_URI")),
+        auth=(
+            unwrap(os.getenv("NEO4J_USERNAME")),
+            unwrap(os.getenv("NEO4J_PASSWORD")),
+        ),
+    )
+
+    start: float = time.perf_counter()
+    try:
+        stats = compute_centrality(
+            driver,
+            unwrap(os.getenv("NEO4J_DATABASE")),
+            algorithm=args.algorithm,
+            iterations=args.iterations,
+        )
+    finally:
+        driver.close()
+
+    print(f"✅ Done in {time.perf_counter() - start:.1f}s")
+    for name, value in stats.items():
+        print(f"   - {name}: {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+Index and constraint advisor of the Neo4j database.
+
+Reads the generated queries of a log (benchmark cassettes, or text files with
+one query per blank-line separated block), proposes the indexes and
+uniqueness constraints serving their filters and, with `--create`, creates
+them, waits for them to come online, and reports the plan changes of every
+query and how often each index is used.
+"""
+
+import argparse
+import os
+from collections import Counter
+from typing import Any
+
+from dotenv import load_dotenv
+from neo4j import GraphDatabase
+
+from graphygie.cassette import Cassette
+from graphygie.retrieval.database.indexes import (
+    IndexAdvisor,
+    IndexSpec,
+    advise,
+    property_usage,
+    unindexable,
+)
+from util import unwrap
+
+
+def load_queries(cassettes: list[str], files: list[str]) -> list[str]:
+    """Reads the distinct queries of the cassettes and query files"""
+    queries: list[str] = []
+    for path in cassettes:
+        cassette = Cassette(path, "replay")
+        queries.extend(str(query) for query in cassette.requests("database"))
+        cassette.close()
+    for path in files:
+        with open(path, "r", encoding="utf-8") as file:
+            queries.extend(block.strip() for block in file.read().split("\n\n"))
+    return list(dict.fromkeys(query for query in queries if query))
+
+
+def describe(plan: dict[str, Any]) -> str:
+    """Describes a plan summary in one line"""
+    if "error" in plan:
+        return "not plannable"
+    indexes: str = ", ".join(
+        f"{kind} {label}({', '.join(properties)})"
+        for kind, label, properties in plan["indexes"]
+    )
+    return (
+        f"{plan['scans']} scans, ~{plan['rows']:,.0f} rows, "
+        f"indexes: {indexes or 'none'}"
+    )
+
+
+def main() -> None:
+    load_dotenv()
+
+    parser = argparse.ArgumentParser(description="Neo4j index advisor")
+    parser.add_argument("--cassette", action="append", default=[], metavar="PATH")
+    parser.add_argument("--queries", action="append", default=[], metavar="PATH")
+    parser.add_argument("--vector", action="store_true", help="index embeddings")
+    parser.add_argument("--create", action="store_true", help="create proposals")
+    parser.add_argument("--timeout", type=int, default=3600, help="seconds")
+    args = parser.parse_args()
+
+    queries: list[str] = load_queries(args.cassette, args.queries)
+    print(f"📜 {len(queries):,} distinct queries")
+
+    usage = property_usage(queries)
+    print("🔎 Filters:")
+    for (label, property, kind), count in usage.most_common():
+        print(f"   - {label}.{property} ({kind}): {count:,} queries")
+    for (label, property), count in unindexable(usage).most_common():
+        print(
+            f"⚠️ {label}.{property}: {count:,} queries filter on a function or "
+            "regex no index serves; rewrite them to call "
+            "db.index.fulltext.queryNodes on a full-text index"
+        )
+
+    driver = GraphDatabase.driver(
+        unwrap(os.getenv("NEO4J_URI")),
+        auth=(
+            unwrap(os.getenv("NEO4J_USERNAME")),
+            unwrap(os.getenv("NEO4J_PASSWORD")),
+        ),
+    )
+    try:
+        advisor = IndexAdvisor(driver, unwrap(os.getenv("NEO4J_DATABASE")))
+        existing: list[IndexSpec] = advisor.existing()
+        proposals: list[IndexSpec] = advise(usage, existing)
+        if args.vector:
+            vector = advisor.vector()
+            if vector is not None and not any(
+                index.covers("VECTOR", vector.label, vector.properties[0])
+                for index in existing
+            ):
+                proposals.append(vector)
+
+        print(f"🗂️ {len(existing)} existing indexes, {len(proposals)} proposed:")
+        for spec in proposals:
+            print(f"   - {spec.name} ({spec.reason}):\n     {spec.cypher()};")
+
+        if not args.create or not proposals:
+            return
+
+        before: list[dict[str, Any]] = [advisor.explain(query) for query in queries]
+        errors: list[str] = advisor.create(proposals, args.timeout)
+        for error in errors:
+            print(f"❌ {error}")
+        after: list[dict[str, Any]] = [advisor.explain(query) for query in queries]
+
+        changed: int = 0
+        for i, (old, new) in enumerate(zip(before, after)):
+            if describe(old) != describe(new):
+                changed += 1
+                print(f"📈 Query {i}:\n   before: {describe(old)}")
+                print(f"   after:  {describe(new)}")
+        print(f"✅ {changed:,} of {len(queries):,} query plans changed")
+
+        used: Counter[str] = Counter(
+            f"{kind} {label}({', '.join(properties)})"
+            for plan in after
+            for kind, label, properties in set(plan.get("indexes", []))
+        )
+        print("📊 Index use (queries planned on it):")
+        for index, count in used.most_common():
+            print(f"   - {index}: {count:,}")
+        print("📊 Index reads since the database started:")
+        for name, reads in sorted(advisor.read_counts().items()):
+            print(f"   - {name}: {reads:,}")
+    finally:
+        driver.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -2,14 +2,26 @@ from neo4j import GraphDatabase
 from neo4j_graphrag.retrievers import VectorRetriever
 from neo4j_graphrag.llm import OpenAILLM
 from neo4j_graphrag.generation import GraphRAG
-from neo4j_graphrag.embeddings import OllamaEmbeddings
+from neo4j_graphrag.embeddings import Embedder, OllamaEmbeddings
 from dotenv import load_dotenv
+from graphygie.embedding import CachingEmbedder
 from util import unwrap
 
 import logging
 import os
 
 
+class CachedEmbedder(Embedder):
+    """Serves repeated questions from the embedding cache"""
+
+    def __init__(self, cache: CachingEmbedder) -> None:
+        super().__init__()
+        self.cache = cache
+
+    def embed_query(self, text: str) -> list[float]:
+        return self.cache.embed_query(text)
+
+
 def main() -> None:
     load_dotenv()
     logging.basicConfig(
@@ -25,9 +37,16 @@ def main() -> None:
     # 2. Retriever
     # Create Embedder object, needed to convert the user question (text) to a
     # vector
-    embedder = OllamaEmbeddings(
+    ollama = OllamaEmbeddings(
         host=unwrap(os.getenv("OLLAMA_URI")), model="embeddinggemma:latest"
     )
+    embedder = CachedEmbedder(
+        CachingEmbedder(
+            lambda texts: [ollama.embed_query(text) for text in texts],
+            "embeddinggemma:latest",
+            path=os.getenv("EMBEDDING_CACHE"),
+        )
+    )
 
     # Initialize the retriever
     retriever = VectorRetriever(
@@ -15,9 +15,11 @@ queries. The process follows these steps:
 """
 
 from graphygie.retrieval import Graph
-from graphygie.retrieval.database import Neo4j, Database
+from graphygie.retrieval.summary import Summaries, SummaryStore
+from graphygie.retrieval.database import Neo4j, QueryProfiler
 from graphygie.llm import LLM, Ollama, Message
 from graphygie.generation import BasicGenerator
+from graphygie.warmup import warm_up
 import logging
 from util import (
     read_to_string,
@@ -41,13 +43,20 @@ def main() -> None:
 
     current_dir: str = os.path.dirname(os.path.abspath(__file__))
 
+    # Profile a fraction of the generated queries when configured
+    profile_rate: str | None = os.getenv("NEO4J_PROFILE_RATE")
+    profiler: QueryProfiler | None = (
+        QueryProfiler(float(profile_rate)) if profile_rate is not None else None
+    )
+
     # Initialize the Neo4j database with credentials and connection URI from
     # environment variables
-    database: Database = Neo4j(
+    database: Neo4j = Neo4j(
         uri=unwrap(os.getenv("NEO4J_URI")),
         username=unwrap(os.getenv("NEO4J_USERNAME")),
         password=unwrap(os.getenv("NEO4J_PASSWORD")),
         database=unwrap(os.getenv("NEO4J_DATABASE")),
+        profiler=profiler,
     )
 
     # Initialize the Ollama language model
@@ -58,6 +67,7 @@ def main() -> None:
     retrieval_llm: LLM = Ollama(
         host=unwrap(os.getenv("OLLAMA_URI")),
         model="mistral:7b",
+        keep_alive=os.getenv("OLLAMA_KEEP_ALIVE"),
         chat=[
             Message(
                 role="system",
@@ -72,12 +82,27 @@ def main() -> None:
     # Create a graph-based retriever using the LLM and database
     retrieval: LLM = Graph(llm=retrieval_llm, database=database)
 
+    # Serve the precomputed neighbourhood of the concepts named in the
+    # question when a summary store is configured (see graphygie-summaries),
+    # and query the graph only when none is found
+    summary_store: str | None = os.getenv("SUMMARY_STORE")
+    if summary_store is not None:
+        retrieval = Summaries(SummaryStore(summary_store), fallback=retrieval)
+
     # Initialize the Ollama language model
     # - Connects to Ollama API using the host from environment variables
     # - Uses the "mistral:7b" model
-    generator_llm: LLM = Ollama(
+    generator_llm: Ollama = Ollama(
         host=unwrap(os.getenv("OLLAMA_URI")),
         model="mistral:7b",
+        keep_alive=os.getenv("OLLAMA_KEEP_ALIVE"),
+    )
+
+    # Warm the Neo4j page cache and load the model (shared by both LLMs)
+    # concurrently, before the first request
+    readiness = warm_up({"neo4j": database, "ollama": generator_llm})
+    logging.getLogger(__name__).info(
+        f"Ready: {readiness['ready']} in {readiness['seconds']:.1f}s"
     )
 
     # Load the user prompt template from a file
@@ -118,6 +143,14 @@ def main() -> None:
 
     print("Result:\n", result)
 
+    if profiler is not None:
+        for profile in profiler.slowest("db_hits"):
+            logging.getLogger(__name__).info(
+                f"{profile['db_hits']:,} db hits, "
+                f"{profile['available_after'] + profile['consumed_after']:,} ms, "
+                f"operators: {' <- '.join(profile['operators'])}\n{profile['query']}"
+            )
+
 
 if __name__ == "__main__":
     main()
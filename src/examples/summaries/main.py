@@ -0,0 +1,87 @@
+"""
+Builds or refreshes the precomputed neighbourhood summaries of the concepts of
+the Neo4j database.
+
+- `build` renders every concept, or the `--top` most looked-up ones.
+- `refresh` re-renders the given changed concepts and the summaries reaching
+  them.
+"""
+
+import argparse
+import os
+import time
+
+from dotenv import load_dotenv
+from neo4j import GraphDatabase
+
+from graphygie.retrieval.summary import (
+    SummaryStore,
+    build_summaries,
+    refresh_summaries,
+)
+from util import unwrap
+
+
+def main() -> None:
+    load_dotenv()
+
+    parser = argparse.ArgumentParser(description="Concept neighbourhood summaries")
+    parser.add_argument(
+        "--store", default=os.getenv("SUMMARY_STORE", "summaries.sqlite")
+    )
+    parser.add_argument("--hops", type=int, choices=(1, 2), default=1)
+    parser.add_argument("--limit", type=int, default=50, help="relationships")
+    parser.add_argument(
+        "--second-limit", type=int, default=5, help="relationships per neighbour"
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+    build = commands.add_parser("build", help="render concepts")
+    build.add_argument("--top", type=int, help="only the most looked-up concepts")
+    refresh = commands.add_parser("refresh", help="re-render changed concepts")
+    refresh.add_argument("ids", nargs="+", help="ids of the changed concepts")
+    args = parser.parse_args()
+
+    driver = GraphDatabase.driver(
+        unwrap(os.getenv("NEO4J_URI")),
+        auth=(
+            unwrap(os.getenv("NEO4J_USERNAME")),
+            unwrap(os.getenv("NEO4J_PASSWORD")),
+        ),
+    )
+    database: str = unwrap(os.getenv("NEO4J_DATABASE"))
+    store = SummaryStore(args.store)
+
+    start: float = time.perf_counter()
+    try:
+        if args.command == "build":
+            ids = store.hot(args.top) if args.top is not None else None
+            written: int = build_summaries(
+                driver,
+                database,
+                store,
+                ids,
+                hops=args.hops,
+                limit=args.limit,
+                second_limit=args.second_limit,
+            )
+        else:
+            written = refresh_summaries(
+                driver,
+                database,
+                store,
+                args.ids,
+                hops=args.hops,
+                limit=args.limit,
+                second_limit=args.second_limit,
+            )
+        print(
+            f"✅ {written:,} summaries written in {time.perf_counter() - start:.1f}s, "
+            f"{len(store):,} in {args.store}"
+        )
+    finally:
+        driver.close()
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
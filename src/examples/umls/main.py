@@ -0,0 +1,59 @@
+"""
+Converts a UMLS release (MRCONSO, MRREL and MRSTY RRF files) into
+`neo4j-admin database import` CSV files, and writes the import command to
+`import.sh` in the output directory, run by the `neo4j-import` service of
+docker-compose.yml.
+"""
+
+import argparse
+import os
+import shlex
+
+from graphygie.ingestion import export_rrf, import_command
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="UMLS release to Neo4j import")
+    parser.add_argument("source", help="directory of the RRF files (META)")
+    parser.add_argument("--output", default="import", help="directory of the CSV")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--languages", nargs="+", default=["ENG"])
+    parser.add_argument("--srdef", help="SRDEF file of the Semantic Network")
+    parser.add_argument("--suppressed", action="store_true")
+    parser.add_argument("--database", default="neo4j")
+    parser.add_argument(
+        "--mount", default="/import", help="output directory seen by neo4j-admin"
+    )
+    args = parser.parse_args()
+
+    print(f"🚀 Converting {args.source} with {args.workers} workers...")
+    stats = export_rrf(
+        args.source,
+        args.output,
+        workers=args.workers,
+        languages=tuple(args.languages),
+        suppressed=args.suppressed,
+        srdef=args.srdef,
+    )
+
+    for name, counts in stats.items():
+        written: str = ", ".join(
+            f"{key} {int(value):,}"
+            for key, value in counts.items()
+            if key not in ("rows", "duplicates", "seconds", "rows_per_s")
+        )
+        print(
+            f"   - {name}: {int(counts['rows']):,} rows in {counts['seconds']:.1f}s "
+            f"({counts['rows_per_s']:,.0f} rows/s), "
+            f"{int(counts['duplicates']):,} duplicates dropped, {written}"
+        )
+
+    command: list[str] = import_command(args.output, args.database, args.mount)
+    script: str = os.path.join(args.output, "import.sh")
+    with open(script, "w", encoding="utf-8") as file:
+        file.write(f"#!/usr/bin/env bash\nset -euo pipefail\n{shlex.join(command)}\n")
+    print(f"✅ Import command written to {script}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+"""
+This module defines the `lazy_exports` helper, which lets a package expose
+names from submodules that are only imported on first access, so importing
+the package does not import every backend library.
+"""
+
+import importlib
+import sys
+from typing import Any, Callable
+
+
+def lazy_exports(
+    package: str, exports: dict[str, str]
+) -> tuple[Callable[[str], Any], Callable[[], list[str]]]:
+    """
+    Builds the module-level `__getattr__` and `__dir__` of a package exposing
+    lazily imported names.
+
+    Parameters:
+    - package (str): The name of the package (its `__name__`).
+    - exports (dict[str, str]): The relative module defining each lazy name
+        (e.g., {"OpenAI": ".openai"}).
+
+    Returns:
+    - tuple[Callable[[str], Any], Callable[[], list[str]]]: The `__getattr__`
+        and `__dir__` functions to assign in the package.
+    """
+
+    def __getattr__(name: str) -> Any:
+        module: str | None = exports.get(name)
+        if module is None:
+            raise AttributeError(f"module '{package}' has no attribute '{name}'")
+        value: Any = getattr(importlib.import_module(module, package), name)
+        # Later accesses find the attribute without calling __getattr__.
+        setattr(sys.modules[package], name, value)
+        return value
+
+    def __dir__() -> list[str]:
+        return sorted(set(vars(sys.modules[package])) | set(exports))
+
+    return __getattr__, __dir__
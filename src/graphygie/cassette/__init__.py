@@ -0,0 +1,21 @@
+"""
+This module exposes the public interface for the record/replay components,
+including:
+
+- Cassette: Indexed file of recorded interactions.
+- CassetteMissError: Raised when replaying a request that was never recorded.
+- CassetteLLM: LLM recording or replaying the chats of another LLM.
+- CassetteDatabase: Database recording or replaying the queries of another
+    Database.
+"""
+
+from .cassette import Cassette, CassetteMissError
+from .llm import CassetteLLM
+from .database import CassetteDatabase
+
+__all__: list[str] = [
+    "Cassette",
+    "CassetteMissError",
+    "CassetteLLM",
+    "CassetteDatabase",
+]
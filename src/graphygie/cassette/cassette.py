@@ -0,0 +1,188 @@
+"""
+This module defines the Cassette class, an indexed file of recorded
+interactions with external services (LLM chats, database queries), used to
+replay them offline.
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import zlib
+from typing import Any, Literal, Optional
+
+
+class CassetteMissError(LookupError):
+    """
+    Raised in replay mode when a request was never recorded.
+    """
+
+
+class Entry:
+    """
+    A recorded interaction.
+
+    Attributes:
+    - response (Any): The JSON-serializable response.
+    - info (Optional[dict[str, Any]]): The statistics reported by the
+        recorded object for this call, if any.
+    - latency (float): The duration of the recorded call, in seconds.
+    """
+
+    def __init__(
+        self, response: Any, info: Optional[dict[str, Any]], latency: float
+    ) -> None:
+        self.response: Any = response
+        self.info: Optional[dict[str, Any]] = info
+        self.latency: float = latency
+
+
+class Cassette:
+    """
+    A SQLite file of recorded interactions, indexed by a hash of the request.
+
+    In record mode every interaction is written (and committed) as soon as it
+    completes; in replay mode the whole cassette is loaded in memory once so
+    lookups cost a hash and a dictionary access.
+
+    Attributes:
+    - _mode (Literal["record", "replay"]): Whether interactions are recorded
+        or replayed.
+    """
+
+    def __init__(self, path: str, mode: Literal["record", "replay"]) -> None:
+        """
+        Opens (or creates) a cassette file.
+
+        Parameters:
+        - path (str): The path of the cassette file.
+        - mode (Literal["record", "replay"]): "record" to capture interactions
+            with the real services, "replay" to serve them from the file.
+
+        Raises:
+        - ValueError: If the mode is unknown.
+        """
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Unknown cassette mode '{mode}'.")
+
+        self._mode: Literal["record", "replay"] = mode
+        self._lock: threading.Lock = threading.Lock()
+        self._connection: sqlite3.Connection = sqlite3.connect(
+            path, check_same_thread=False
+        )
+        self._connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                payload BLOB NOT NULL,
+                latency REAL NOT NULL
+            )
+            """
+        )
+        self._connection.commit()
+
+        self._entries: dict[str, Entry] = {}
+        if mode == "replay":
+            for key, payload, latency in self._connection.execute(
+                "SELECT key, payload, latency FROM entries"
+            ):
+                data: dict[str, Any] = json.loads(zlib.decompress(payload))
+                self._entries[key] = Entry(data["response"], data["info"], latency)
+
+    @property
+    def mode(self) -> Literal["record", "replay"]:
+        """Gets whether interactions are recorded or replayed."""
+        return self._mode
+
+    @staticmethod
+    def key(kind: str, name: str, request: Any) -> str:
+        """
+        Computes the index key of a request.
+
+        Parameters:
+        - kind (str): The kind of interaction (e.g., "llm", "database").
+        - name (str): The name distinguishing services of the same kind.
+        - request (Any): The JSON-serializable request.
+
+        Returns:
+        - str: The hexadecimal SHA-256 of the canonical request.
+        """
+        canonical: str = json.dumps(
+            [kind, name, request], sort_keys=True, ensure_ascii=False
+        )
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Entry:
+        """
+        Gets a recorded interaction.
+
+        Parameters:
+        - key (str): The index key of the request.
+
+        Returns:
+        - Entry: The recorded interaction.
+
+        Raises:
+        - CassetteMissError: If the request was never recorded.
+        """
+        entry: Optional[Entry] = self._entries.get(key)
+        if entry is None:
+            raise CassetteMissError(f"No recorded interaction for key {key}.")
+        return entry
+
+    def put(
+        self,
+        key: str,
+        kind: str,
+        request: Any,
+        response: Any,
+        info: Optional[dict[str, Any]],
+        latency: float,
+    ) -> None:
+        """
+        Records an interaction, replacing any previous one for the same key.
+
+        Parameters:
+        - key (str): The index key of the request.
+        - kind (str): The kind of interaction.
+        - request (Any): The JSON-serializable request, kept for inspection.
+        - response (Any): The JSON-serializable response.
+        - info (Optional[dict[str, Any]]): The statistics of the call, if any.
+        - latency (float): The duration of the call, in seconds.
+        """
+        payload: bytes = zlib.compress(
+            json.dumps(
+                {"request": request, "response": response, "info": info},
+                ensure_ascii=False,
+            ).encode("utf-8")
+        )
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?)",
+                (key, kind, payload, latency),
+            )
+            self._connection.commit()
+        self._entries[key] = Entry(response, info, latency)
+
+    def requests(self, kind: str) -> list[Any]:
+        """
+        Lists the recorded requests of a kind (e.g., every generated query).
+
+        Parameters:
+        - kind (str): The kind of interaction.
+
+        Returns:
+        - list[Any]: The recorded requests.
+        """
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT payload FROM entries WHERE kind = ?", (kind,)
+            ).fetchall()
+        return [json.loads(zlib.decompress(payload))["request"] for (payload,) in rows]
+
+    def close(self) -> None:
+        """
+        Closes the cassette file.
+        """
+        self._connection.close()
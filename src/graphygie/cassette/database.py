@@ -0,0 +1,109 @@
+"""
+This module defines the CassetteDatabase class, a Database that records the
+queries of another Database into a cassette, or replays them from it without
+the database.
+"""
+
+import time
+from typing import Any, Callable, Optional, cast
+from graphygie.result import Result
+from graphygie.retrieval.database import Database
+from .cassette import Cassette, Entry
+
+
+class CassetteDatabase(Database):
+    """
+    A Database recording or replaying the queries of a wrapped Database,
+    depending on the mode of its cassette.
+
+    The statistics of each result of the wrapped database (see
+    `Database.run`, e.g., retrieved nodes and edges) are recorded with it and
+    replayed in its result.
+
+    With a formatter, the unformatted result graph of the database is
+    recorded instead of its text (see `Neo4j.fetch`), and formatted on every
+    replay, so formatting changes can be compared offline.
+    """
+
+    def __init__(
+        self,
+        cassette: Cassette,
+        name: str,
+        database: Optional[Database] = None,
+        latency: float = 0.0,
+        formatter: Optional[Callable[[dict[str, Any]], str]] = None,
+    ) -> None:
+        """
+        Initializes the recording or replaying database.
+
+        Parameters:
+        - cassette (Cassette): The cassette holding the interactions.
+        - name (str): The name distinguishing this database from the others
+            recorded in the same cassette.
+        - database (Optional[Database]): The database to record. Only required
+            in record mode.
+        - latency (float, optional): In replay mode, the fraction of the
+            recorded latency to wait before answering. Defaults to 0 (no
+            wait).
+        - formatter (Optional[Callable[[dict[str, Any]], str]]): Formats a
+            recorded result graph (e.g., `Neo4j.format`, or
+            `format_graph_data` with other settings). If given, the database
+            must have a `fetch` method like `Neo4j.fetch`. If None, the
+            formatted text is recorded.
+
+        Raises:
+        - ValueError: If no database is given in record mode, or it cannot
+            fetch unformatted results for the formatter.
+        """
+        if cassette.mode == "record" and database is None:
+            raise ValueError("CassetteDatabase expected a database to record.")
+        if (
+            cassette.mode == "record"
+            and formatter is not None
+            and not hasattr(database, "fetch")
+        ):
+            raise ValueError("CassetteDatabase expected a database with fetch.")
+
+        self._cassette: Cassette = cassette
+        self._name: str = name
+        self._database: Optional[Database] = database
+        self._latency: float = latency
+        self._formatter: Optional[Callable[[dict[str, Any]], str]] = formatter
+
+    def query(self, query: str) -> str:
+        return self.run(query).text
+
+    def run(self, query: str) -> Result:
+        # Graphs and texts are recorded under different keys, as they are
+        # replayed differently.
+        key: str = Cassette.key(
+            "database",
+            self._name,
+            query if self._formatter is None else [query, "graph"],
+        )
+
+        if self._database is None or self._cassette.mode == "replay":
+            entry: Entry = self._cassette.get(key)
+            if self._latency:
+                time.sleep(entry.latency * self._latency)
+            text: str = (
+                entry.response
+                if self._formatter is None
+                else self._formatter(entry.response)
+            )
+            return Result(text, query, entry.info)
+
+        if self._formatter is None:
+            start: float = time.perf_counter()
+            result: Result = self._database.run(query)
+            latency: float = time.perf_counter() - start
+            self._cassette.put(
+                key, "database", query, result.text, dict(result.stats), latency
+            )
+            return result
+
+        start = time.perf_counter()
+        data, stats = cast(Any, self._database).fetch(query)
+        latency = time.perf_counter() - start
+        self._cassette.put(key, "database", query, data, stats, latency)
+        return Result(self._formatter(data), query, stats)
@@ -0,0 +1,100 @@
+"""
+This module defines the CassetteLLM class, an LLM that records the chats of
+another LLM into a cassette, or replays them from it without the LLM.
+"""
+
+import time
+from typing import Any, Optional, Sequence
+from graphygie.llm import LLM
+from graphygie.llm.chat import Chat
+from graphygie.result import Result
+from .cassette import Cassette, Entry
+
+
+class CassetteLLM(LLM):
+    """
+    An LLM recording or replaying the chats of a wrapped LLM, depending on the
+    mode of its cassette.
+
+    The statistics of each response of the wrapped LLM (see `LLM.respond`,
+    e.g., token usage) are recorded with it and replayed in its result.
+
+    Constrained choices (see `LLM.choose`) are recorded apart from the chats,
+    with their probabilities.
+
+    A chat is keyed by its messages only: the system chat and the model of
+    the wrapped LLM are not part of it, so they must be given as the identity
+    for a change of either to miss instead of replaying stale responses.
+    """
+
+    def __init__(
+        self,
+        cassette: Cassette,
+        name: str,
+        llm: Optional[LLM] = None,
+        latency: float = 0.0,
+        identity: str = "",
+    ) -> None:
+        """
+        Initializes the recording or replaying LLM.
+
+        Parameters:
+        - cassette (Cassette): The cassette holding the interactions.
+        - name (str): The name distinguishing this LLM from the others
+            recorded in the same cassette (e.g., "retrieval", "generator").
+        - llm (Optional[LLM]): The LLM to record. Only required in record
+            mode.
+        - latency (float, optional): In replay mode, the fraction of the
+            recorded latency to wait before answering. Defaults to 0 (no
+            wait).
+        - identity (str, optional): What the responses depend on besides the
+            chat (e.g., a hash of the system chat, the model and its
+            parameters), added to the key of every request. Defaults to "".
+
+        Raises:
+        - ValueError: If no LLM is given in record mode.
+        """
+        if cassette.mode == "record" and llm is None:
+            raise ValueError("CassetteLLM expected an LLM to record.")
+
+        self._cassette: Cassette = cassette
+        self._name: str = name
+        self._llm: Optional[LLM] = llm
+        self._latency: float = latency
+        self._identity: str = identity
+
+    def chat(self, chat: Chat = list()) -> str:
+        return self.respond(chat).text
+
+    def choose(self, chat: Chat, choices: Sequence[str]) -> dict[str, float]:
+        return dict(self.respond(chat, choices).stats["probabilities"])
+
+    def respond(
+        self, chat: Chat = list(), choices: Optional[Sequence[str]] = None
+    ) -> Result:
+        messages: list[dict[str, str]] = [message.to_dict() for message in chat]
+        kind: str = "llm" if choices is None else "choice"
+        request: Any = (
+            messages
+            if choices is None
+            else {"messages": messages, "choices": list(choices)}
+        )
+        key: str = Cassette.key(
+            kind, self._name, [self._identity, request] if self._identity else request
+        )
+
+        if self._llm is None or self._cassette.mode == "replay":
+            entry: Entry = self._cassette.get(key)
+            if self._latency:
+                time.sleep(entry.latency * self._latency)
+            return Result(entry.response, stats=entry.info)
+
+        start: float = time.perf_counter()
+        result: Result = self._llm.respond(chat, choices)
+        latency: float = time.perf_counter() - start
+
+        self._cassette.put(
+            key, kind, request, result.text, dict(result.stats), latency
+        )
+
+        return result
@@ -0,0 +1,33 @@
+"""
+This module exposes the public interface for the local embedding components,
+including:
+
+- EmbeddingStore: Memory-mapped, optionally quantized embedding matrix with an
+    id-to-row index and top-k cosine search.
+- EmbeddingStoreWriter: Incremental writer of an EmbeddingStore.
+- Precision: The storage precisions of an EmbeddingStore.
+- IVFPQIndex: In-process approximate nearest neighbour index (IVF-PQ).
+- CachingEmbedder: Embedder wrapper with LRU and persistent caches.
+- export_embeddings: Copies the node embeddings of Neo4j into a store.
+"""
+
+from typing import TYPE_CHECKING
+
+from graphygie._lazy import lazy_exports
+from .store import EmbeddingStore, EmbeddingStoreWriter, Precision
+from .ivfpq import IVFPQIndex
+from .cache import CachingEmbedder
+
+if TYPE_CHECKING:
+    from .neo4j import export_embeddings
+
+__getattr__, __dir__ = lazy_exports(__name__, {"export_embeddings": ".neo4j"})
+
+__all__: list[str] = [
+    "EmbeddingStore",
+    "EmbeddingStoreWriter",
+    "Precision",
+    "IVFPQIndex",
+    "CachingEmbedder",
+    "export_embeddings",
+]
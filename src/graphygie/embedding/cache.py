@@ -0,0 +1,226 @@
+"""
+This module defines the CachingEmbedder class, which wraps an embedding
+backend with an in-memory LRU cache, an optional persistent SQLite cache and
+in-batch deduplication.
+"""
+
+import hashlib
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Callable, Optional, Sequence
+
+import numpy as np
+
+
+# Maximum number of keys per SQLite lookup (below the host parameter limit).
+_LOOKUP_CHUNK: int = 500
+
+
+class CachingEmbedder:
+    """
+    An embedder serving repeated texts from cache.
+
+    Texts are looked up in the in-memory LRU cache, then in the persistent
+    cache; the remaining texts are deduplicated and embedded with a single
+    backend call, then cached at both levels. Entries are keyed on a hash of
+    (model, text), so one persistent cache can serve several models.
+
+    It exposes the `embed_documents` / `embed_query` methods of the common
+    embedder interfaces, so it can replace the wrapped embedder.
+
+    Concurrent misses on the same text may both reach the backend; the result
+    is the same, only the work is duplicated. The persistent cache stores
+    float32 vectors.
+
+    Attributes:
+    - _embed (Callable[[list[str]], Sequence[Sequence[float]]]): The backend.
+    - _model (str): The name of the embedding model.
+    - _capacity (int): The maximum number of embeddings kept in memory.
+    """
+
+    def __init__(
+        self,
+        embed: Callable[[list[str]], Sequence[Sequence[float]]],
+        model: str,
+        capacity: int = 65536,
+        path: Optional[str] = None,
+    ) -> None:
+        """
+        Initializes the caches.
+
+        Parameters:
+        - embed (Callable[[list[str]], Sequence[Sequence[float]]]): The
+            backend, embedding a batch of texts (e.g., the `embed_documents`
+            method of an embedder).
+        - model (str): The name of the embedding model, part of the cache key.
+        - capacity (int, optional): The maximum number of embeddings kept in
+            memory. Defaults to 65536.
+        - path (Optional[str]): The path of the persistent cache file, created
+            if needed. If None, only the memory cache is used.
+        """
+        self._embed = embed
+        self._model: str = model
+        self._capacity: int = capacity
+        self._lock: threading.Lock = threading.Lock()
+        self._memory: OrderedDict[bytes, list[float]] = OrderedDict()
+
+        self._connection: Optional[sqlite3.Connection] = None
+        if path is not None:
+            self._connection = sqlite3.connect(path, check_same_thread=False)
+            self._connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS embeddings (
+                    key BLOB PRIMARY KEY,
+                    vector BLOB NOT NULL
+                )
+                """
+            )
+            self._connection.commit()
+
+        self._requested: int = 0
+        self._memory_hits: int = 0
+        self._disk_hits: int = 0
+        self._duplicates: int = 0
+        self._embedded: int = 0
+        self._calls: int = 0
+
+    @property
+    def info(self) -> dict[str, int | float]:
+        """
+        Gets the cache statistics: the texts requested, served from memory,
+        served from disk, deduplicated within a batch and sent to the backend,
+        the backend calls, and the hit rate (the fraction of texts not sent to
+        the backend).
+        """
+        with self._lock:
+            return {
+                "requested": self._requested,
+                "memory_hits": self._memory_hits,
+                "disk_hits": self._disk_hits,
+                "duplicates": self._duplicates,
+                "embedded": self._embedded,
+                "calls": self._calls,
+                "hit_rate": (
+                    1 - self._embedded / self._requested if self._requested else 0.0
+                ),
+            }
+
+    def key(self, text: str) -> bytes:
+        """
+        Computes the cache key of a text.
+
+        Parameters:
+        - text (str): The text.
+
+        Returns:
+        - bytes: The SHA-256 of the model and the text.
+        """
+        return hashlib.sha256(f"{self._model}\0{text}".encode("utf-8")).digest()
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        """
+        Embeds a batch of texts, calling the backend only for the distinct
+        texts found in neither cache.
+
+        Parameters:
+        - texts (list[str]): The texts.
+
+        Returns:
+        - list[list[float]]: One embedding per text, in order.
+        """
+        keys: list[bytes] = [self.key(text) for text in texts]
+        found: dict[bytes, list[float]] = {}
+
+        with self._lock:
+            self._requested += len(texts)
+            for key in keys:
+                vector: Optional[list[float]] = self._memory.get(key)
+                if vector is not None:
+                    self._memory.move_to_end(key)
+                    found[key] = vector
+                    self._memory_hits += 1
+
+        missing: dict[bytes, str] = {
+            key: text for key, text in zip(keys, texts) if key not in found
+        }
+        if missing and self._connection is not None:
+            stored: dict[bytes, list[float]] = self._load(list(missing))
+            with self._lock:
+                self._disk_hits += sum(1 for key in keys if key in stored)
+                for key, vector in stored.items():
+                    self._remember(key, vector)
+            found |= stored
+            missing = {key: text for key, text in missing.items() if key not in stored}
+
+        if missing:
+            embedded: Sequence[Sequence[float]] = self._embed(list(missing.values()))
+            vectors: dict[bytes, list[float]] = {
+                key: list(vector) for key, vector in zip(missing, embedded)
+            }
+            if self._connection is not None:
+                self._store(vectors)
+            with self._lock:
+                self._calls += 1
+                self._embedded += len(missing)
+                self._duplicates += (
+                    sum(1 for key in keys if key in missing) - len(missing)
+                )
+                for key, vector in vectors.items():
+                    self._remember(key, vector)
+            found |= vectors
+
+        return [list(found[key]) for key in keys]
+
+    def embed_query(self, text: str) -> list[float]:
+        """
+        Embeds a single text.
+
+        Parameters:
+        - text (str): The text.
+
+        Returns:
+        - list[float]: Its embedding.
+        """
+        return self.embed_documents([text])[0]
+
+    def close(self) -> None:
+        """
+        Closes the persistent cache, if any.
+        """
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def _remember(self, key: bytes, vector: list[float]) -> None:
+        # Called with the lock held.
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self._capacity:
+            self._memory.popitem(last=False)
+
+    def _load(self, keys: list[bytes]) -> dict[bytes, list[float]]:
+        assert self._connection is not None
+        stored: dict[bytes, list[float]] = {}
+        with self._lock:
+            for start in range(0, len(keys), _LOOKUP_CHUNK):
+                chunk: list[bytes] = keys[start : start + _LOOKUP_CHUNK]
+                for key, vector in self._connection.execute(
+                    "SELECT key, vector FROM embeddings WHERE key IN "
+                    f"({', '.join('?' * len(chunk))})",
+                    chunk,
+                ):
+                    stored[key] = np.frombuffer(vector, dtype=np.float32).tolist()
+        return stored
+
+    def _store(self, vectors: dict[bytes, list[float]]) -> None:
+        assert self._connection is not None
+        with self._lock:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO embeddings VALUES (?, ?)",
+                [
+                    (key, np.asarray(vector, dtype=np.float32).tobytes())
+                    for key, vector in vectors.items()
+                ],
+            )
+            self._connection.commit()
@@ -0,0 +1,458 @@
+"""
+This module defines the IVFPQIndex class, an in-process approximate nearest
+neighbour index (inverted file with product quantization) over unit
+embeddings, searched by cosine similarity.
+"""
+
+import json
+import os
+from typing import Optional, Sequence
+
+import numpy as np
+
+from .store import EmbeddingStore, normalize, top_k
+
+
+# Rows assigned at once when clustering or encoding; bounds temporary memory.
+CHUNK_ROWS: int = 8192
+
+_META: str = "meta.json"
+_ARRAYS: tuple[str, ...] = ("centroids", "codebooks", "codes", "offsets", "ids")
+
+
+def kmeans(
+    vectors: np.ndarray,
+    clusters: int,
+    iterations: int = 10,
+    seed: int = 0,
+) -> np.ndarray:
+    """
+    Clusters vectors with Lloyd's algorithm (Euclidean distance).
+
+    Parameters:
+    - vectors (np.ndarray): The (n, dim) float32 vectors.
+    - clusters (int): The number of clusters; at most n.
+    - iterations (int, optional): The number of iterations. Defaults to 10.
+    - seed (int, optional): The random seed. Defaults to 0.
+
+    Returns:
+    - np.ndarray: The (clusters, dim) centroids.
+    """
+    rng: np.random.Generator = np.random.default_rng(seed)
+    centroids: np.ndarray = vectors[
+        rng.choice(len(vectors), clusters, replace=False)
+    ].copy()
+
+    for _ in range(iterations):
+        labels: np.ndarray = assign(vectors, centroids)
+        counts: np.ndarray = np.bincount(labels, minlength=clusters)
+        empty: np.ndarray = counts == 0
+        # Sums each cluster over its contiguous run of the sorted vectors.
+        order: np.ndarray = np.argsort(labels, kind="stable")
+        starts: np.ndarray = np.concatenate([[0], np.cumsum(counts)[:-1]])
+        sums: np.ndarray = np.add.reduceat(vectors[order], starts[~empty], axis=0)
+        centroids[~empty] = sums / counts[~empty, None]
+        # Empty clusters restart from random points instead of dying.
+        centroids[empty] = vectors[rng.choice(len(vectors), int(empty.sum()))]
+
+    return centroids
+
+
+def assign(vectors: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    """
+    Finds the nearest centroid (Euclidean distance) of each vector.
+
+    Parameters:
+    - vectors (np.ndarray): The (n, dim) vectors.
+    - centroids (np.ndarray): The (k, dim) centroids.
+
+    Returns:
+    - np.ndarray: The (n,) centroid indices.
+    """
+    norms: np.ndarray = (centroids**2).sum(axis=1)
+    labels: np.ndarray = np.empty(len(vectors), dtype=np.int64)
+    for start in range(0, len(vectors), CHUNK_ROWS):
+        chunk: np.ndarray = vectors[start : start + CHUNK_ROWS]
+        labels[start : start + CHUNK_ROWS] = np.argmin(
+            norms - 2 * chunk @ centroids.T, axis=1
+        )
+    return labels
+
+
+class IVFPQIndex:
+    """
+    An IVF-PQ index.
+
+    Vectors are assigned to the nearest of `nlist` coarse centroids, and the
+    residual to that centroid is compressed into `m` one-byte codes (product
+    quantization), so each vector costs `m` bytes. A search scores only the
+    vectors of the `nprobe` lists closest to the query, from per-query lookup
+    tables, then optionally rescores the best candidates exactly against an
+    EmbeddingStore.
+
+    Inserted vectors go to an unsorted tail, scanned by every search, which is
+    merged into the lists once it grows past a fraction of the index.
+
+    Attributes:
+    - _dim (int): The dimension of the vectors.
+    - _nlist (int): The number of inverted lists.
+    - _m (int): The number of sub-quantizers (bytes per vector).
+    - nprobe (int): The number of lists searched by default.
+    """
+
+    def __init__(
+        self, dim: int, nlist: int = 1024, m: int = 32, nprobe: int = 16
+    ) -> None:
+        """
+        Initializes an empty, untrained index.
+
+        Parameters:
+        - dim (int): The dimension of the vectors; a multiple of m.
+        - nlist (int, optional): The number of inverted lists; about
+            sqrt(n) to 4 * sqrt(n) for n vectors. Defaults to 1024.
+        - m (int, optional): The number of sub-quantizers; more is more
+            accurate and larger. Defaults to 32.
+        - nprobe (int, optional): The number of lists searched by default;
+            more is more accurate and slower. Defaults to 16.
+
+        Raises:
+        - ValueError: If dim is not a multiple of m.
+        """
+        if dim % m != 0:
+            raise ValueError(f"The dimension ({dim}) must be a multiple of m ({m})")
+        self._dim: int = dim
+        self._nlist: int = nlist
+        self._m: int = m
+        self.nprobe: int = nprobe
+
+        self._centroids: Optional[np.ndarray] = None
+        self._codebooks: Optional[np.ndarray] = None
+        self._codes: np.ndarray = np.empty((0, m), dtype=np.uint8)
+        self._offsets: np.ndarray = np.zeros(nlist + 1, dtype=np.int64)
+        self._ids: np.ndarray = np.empty(0, dtype=str)
+
+        self._tail_codes: list[np.ndarray] = []
+        self._tail_lists: list[np.ndarray] = []
+        self._tail_ids: list[np.ndarray] = []
+
+    @staticmethod
+    def build(
+        ids: Sequence[str],
+        vectors: Sequence[Sequence[float]] | np.ndarray,
+        nlist: Optional[int] = None,
+        m: int = 32,
+        nprobe: int = 16,
+        sample: int = 65536,
+        seed: int = 0,
+    ) -> "IVFPQIndex":
+        """
+        Trains an index on a sample of vectors, then adds all of them.
+
+        Parameters:
+        - ids (Sequence[str]): The ids of the vectors.
+        - vectors (Sequence[Sequence[float]] | np.ndarray): The vectors.
+        - nlist (Optional[int]): The number of inverted lists. Defaults to
+            4 * sqrt(n), capped by the sample size.
+        - m (int, optional): The number of sub-quantizers. Defaults to 32.
+        - nprobe (int, optional): The number of lists searched by default.
+            Defaults to 16.
+        - sample (int, optional): The number of vectors trained on. Defaults
+            to 65536.
+        - seed (int, optional): The random seed. Defaults to 0.
+
+        Returns:
+        - IVFPQIndex: The index.
+        """
+        matrix: np.ndarray = np.asarray(vectors, dtype=np.float32)
+        rng: np.random.Generator = np.random.default_rng(seed)
+        training: np.ndarray = matrix[
+            rng.choice(len(matrix), min(sample, len(matrix)), replace=False)
+        ]
+        lists: int = nlist or int(4 * np.sqrt(len(matrix)))
+        index: IVFPQIndex = IVFPQIndex(
+            matrix.shape[1], max(1, min(lists, len(training) // 32)), m, nprobe
+        )
+        index.train(training, seed)
+        for start in range(0, len(matrix), 65536):
+            index.add(ids[start : start + 65536], matrix[start : start + 65536])
+        index.compact()
+        return index
+
+    @staticmethod
+    def from_store(store: EmbeddingStore, **kwargs) -> "IVFPQIndex":
+        """
+        Builds an index over the vectors of an embedding store.
+
+        Parameters:
+        - store (EmbeddingStore): The store.
+        - **kwargs: The options of `build`.
+
+        Returns:
+        - IVFPQIndex: The index.
+        """
+        return IVFPQIndex.build(store.ids, store.vectors(slice(None)), **kwargs)
+
+    @property
+    def trained(self) -> bool:
+        """Gets whether the quantizers are trained"""
+        return self._centroids is not None
+
+    @property
+    def nbytes(self) -> int:
+        """Gets the memory of the codes, ids and quantizers"""
+        arrays: list[np.ndarray] = [
+            self._codes,
+            self._ids,
+            *self._tail_codes,
+            *self._tail_ids,
+        ]
+        if self._centroids is not None and self._codebooks is not None:
+            arrays += [self._centroids, self._codebooks]
+        return sum(array.nbytes for array in arrays)
+
+    def __len__(self) -> int:
+        return len(self._ids) + sum(len(ids) for ids in self._tail_ids)
+
+    def train(
+        self, vectors: Sequence[Sequence[float]] | np.ndarray, seed: int = 0
+    ) -> None:
+        """
+        Trains the coarse centroids and the product quantizer.
+
+        Parameters:
+        - vectors (Sequence[Sequence[float]] | np.ndarray): Representative
+            vectors; at least 256 and nlist of them.
+        - seed (int, optional): The random seed. Defaults to 0.
+
+        Raises:
+        - ValueError: If there are too few vectors.
+        """
+        unit: np.ndarray = normalize(np.asarray(vectors))
+        if len(unit) < max(256, self._nlist):
+            raise ValueError(
+                f"Training needs at least {max(256, self._nlist)} vectors, "
+                f"got {len(unit)}"
+            )
+
+        centroids: np.ndarray = kmeans(unit, self._nlist, seed=seed)
+        # 64 points per code are plenty for the 256-code sub-quantizers.
+        sample: np.ndarray = unit[: 256 * 64]
+        residuals: np.ndarray = sample - centroids[assign(sample, centroids)]
+        sub: np.ndarray = residuals.reshape(len(sample), self._m, -1)
+        self._codebooks = np.stack(
+            [kmeans(sub[:, j], 256, seed=seed + j) for j in range(self._m)]
+        )
+        self._centroids = centroids
+
+    def add(
+        self, ids: Sequence[str], vectors: Sequence[Sequence[float]] | np.ndarray
+    ) -> None:
+        """
+        Inserts vectors into the trained index.
+
+        Parameters:
+        - ids (Sequence[str]): The ids of the vectors.
+        - vectors (Sequence[Sequence[float]] | np.ndarray): The vectors.
+
+        Raises:
+        - RuntimeError: If the index is not trained.
+        """
+        if self._centroids is None or self._codebooks is None:
+            raise RuntimeError("The index must be trained before adding vectors")
+        if len(ids) == 0:
+            return
+
+        unit: np.ndarray = normalize(np.asarray(vectors))
+        lists: np.ndarray = assign(unit, self._centroids)
+        sub: np.ndarray = (unit - self._centroids[lists]).reshape(
+            len(unit), self._m, -1
+        )
+        codes: np.ndarray = np.stack(
+            [assign(sub[:, j], self._codebooks[j]) for j in range(self._m)], axis=1
+        ).astype(np.uint8)
+
+        self._tail_codes.append(codes)
+        self._tail_lists.append(lists)
+        self._tail_ids.append(np.asarray(ids, dtype=str))
+
+        # The tail is scanned in full by every search; keep it small.
+        if sum(map(len, self._tail_ids)) > max(4096, len(self._ids) // 8):
+            self.compact()
+
+    def compact(self) -> None:
+        """
+        Merges the inserted vectors into the inverted lists.
+        """
+        if not self._tail_ids:
+            return
+
+        lists: np.ndarray = np.concatenate(
+            [
+                np.repeat(np.arange(self._nlist), np.diff(self._offsets)),
+                *self._tail_lists,
+            ]
+        )
+        order: np.ndarray = np.argsort(lists, kind="stable")
+        self._codes = np.concatenate([self._codes, *self._tail_codes])[order]
+        self._ids = np.concatenate([self._ids, *self._tail_ids])[order]
+        self._offsets = np.concatenate(
+            [[0], np.cumsum(np.bincount(lists, minlength=self._nlist))]
+        )
+        self._tail_codes, self._tail_lists, self._tail_ids = [], [], []
+
+    def search(
+        self,
+        queries: Sequence[Sequence[float]] | np.ndarray,
+        k: int = 10,
+        nprobe: Optional[int] = None,
+        store: Optional[EmbeddingStore] = None,
+        rescore: int = 4,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Finds the approximate k most cosine-similar vectors of each query.
+
+        Parameters:
+        - queries (Sequence[Sequence[float]] | np.ndarray): The (q, dim)
+            query vectors, or a single (dim,) vector.
+        - k (int, optional): The number of results per query. Defaults to 10.
+        - nprobe (Optional[int]): The number of lists searched. Defaults to
+            the index's nprobe.
+        - store (Optional[EmbeddingStore]): A store holding the same ids, used
+            to rescore the `k * rescore` best candidates exactly.
+        - rescore (int, optional): The candidate oversampling factor used with
+            a store. Defaults to 4.
+
+        Returns:
+        - tuple[np.ndarray, np.ndarray]: The (q, k) ids and (estimated)
+            cosine similarities, best first; missing results have an empty id
+            and a similarity of -inf.
+
+        Raises:
+        - RuntimeError: If the index is not trained.
+        """
+        if self._centroids is None or self._codebooks is None:
+            raise RuntimeError("The index must be trained before searching")
+
+        matrix: np.ndarray = normalize(np.atleast_2d(np.asarray(queries)))
+        candidates: int = k * rescore if store is not None else k
+        probes: int = min(nprobe or self.nprobe, self._nlist)
+        tail_codes: np.ndarray = np.concatenate(
+            [np.empty((0, self._m), dtype=np.uint8), *self._tail_codes]
+        )
+        tail_lists: np.ndarray = np.concatenate(
+            [np.empty(0, dtype=np.int64), *self._tail_lists]
+        )
+        tail_ids: np.ndarray = np.concatenate([np.empty(0, dtype=str), *self._tail_ids])
+
+        coarse: np.ndarray = matrix @ self._centroids.T
+        probed, _ = top_k(coarse, probes)
+        # (q, m, 256): the similarity of each query slice to each code.
+        tables: np.ndarray = np.einsum(
+            "qmd,mkd->qmk", matrix.reshape(len(matrix), self._m, -1), self._codebooks
+        )
+        columns: np.ndarray = np.arange(self._m)
+
+        ids: np.ndarray = np.full(
+            (len(matrix), k), "", dtype=np.result_type(self._ids, tail_ids)
+        )
+        scores: np.ndarray = np.full((len(matrix), k), -np.inf, dtype=np.float32)
+        for i, lists in enumerate(probed):
+            spans: list[np.ndarray] = [
+                np.arange(self._offsets[j], self._offsets[j + 1]) for j in lists
+            ]
+            rows: np.ndarray = np.concatenate([np.empty(0, dtype=np.int64), *spans])
+            row_lists: np.ndarray = np.repeat(
+                lists, np.diff(self._offsets)[lists]
+            ).astype(np.int64)
+            tail: np.ndarray = np.flatnonzero(np.isin(tail_lists, lists))
+
+            found: np.ndarray = np.concatenate([self._ids[rows], tail_ids[tail]])
+            estimate: np.ndarray = np.concatenate(
+                [
+                    tables[i][columns, self._codes[rows]].sum(axis=1),
+                    tables[i][columns, tail_codes[tail]].sum(axis=1),
+                ]
+            ) + coarse[i, np.concatenate([row_lists, tail_lists[tail]])]
+
+            best, best_scores = top_k(estimate[None, :], candidates)
+            found, estimate = found[best[0]], best_scores[0]
+            if store is not None and len(found):
+                exact: np.ndarray = store.vectors(
+                    np.array([store.index[id] for id in found])
+                ) @ matrix[i]
+                best, best_scores = top_k(exact[None, :], k)
+                found, estimate = found[best[0]], best_scores[0]
+            ids[i, : len(found)] = found
+            scores[i, : len(found)] = estimate
+
+        return ids, scores
+
+    def save(self, path: str) -> None:
+        """
+        Saves the index to a directory, merging inserted vectors first.
+
+        Parameters:
+        - path (str): The directory, created if needed.
+
+        Raises:
+        - RuntimeError: If the index is not trained.
+        """
+        if self._centroids is None or self._codebooks is None:
+            raise RuntimeError("Only a trained index can be saved")
+        self.compact()
+
+        os.makedirs(path, exist_ok=True)
+        arrays: dict[str, np.ndarray] = {
+            "centroids": self._centroids,
+            "codebooks": self._codebooks,
+            "codes": self._codes,
+            "offsets": self._offsets,
+            "ids": self._ids,
+        }
+        for name in _ARRAYS:
+            np.save(os.path.join(path, f"{name}.npy"), arrays[name])
+        with open(os.path.join(path, _META), "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "dim": self._dim,
+                    "nlist": self._nlist,
+                    "m": self._m,
+                    "nprobe": self.nprobe,
+                },
+                f,
+                indent=4,
+            )
+
+    @staticmethod
+    def load(path: str, mmap: bool = True) -> "IVFPQIndex":
+        """
+        Loads an index saved with `save`.
+
+        Parameters:
+        - path (str): The directory of the index.
+        - mmap (bool, optional): Whether to memory-map the codes and ids
+            instead of reading them; inserting still works, as merging copies
+            them. Defaults to True.
+
+        Returns:
+        - IVFPQIndex: The index.
+        """
+        with open(os.path.join(path, _META), "r", encoding="utf-8") as f:
+            meta: dict = json.load(f)
+
+        index: IVFPQIndex = IVFPQIndex(
+            meta["dim"], meta["nlist"], meta["m"], meta["nprobe"]
+        )
+        arrays: dict[str, np.ndarray] = {
+            name: np.load(
+                os.path.join(path, f"{name}.npy"),
+                mmap_mode="r" if mmap and name in ("codes", "ids") else None,
+            )
+            for name in _ARRAYS
+        }
+        index._centroids = arrays["centroids"]
+        index._codebooks = arrays["codebooks"]
+        index._codes = arrays["codes"]
+        index._offsets = arrays["offsets"]
+        index._ids = arrays["ids"]
+        return index
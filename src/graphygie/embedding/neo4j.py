@@ -0,0 +1,93 @@
+"""
+This module defines the export_embeddings function, which copies the node
+embeddings of a Neo4j database into a local EmbeddingStore.
+"""
+
+from typing import Optional, cast
+
+from neo4j import Driver, Query
+
+from .store import EmbeddingStore, EmbeddingStoreWriter, Precision
+
+
+def export_embeddings(
+    driver: Driver,
+    database: str,
+    path: str,
+    precision: Precision = "int8",
+    keep_float32: bool = False,
+    label: str = "CUI",
+    key: str = "id",
+    property: str = "embedding",
+    batch_size: int = 10000,
+    model: Optional[str] = None,
+) -> EmbeddingStore:
+    """
+    Exports the embeddings of a label to a local store.
+
+    Nodes are read in pages on their (indexed) key, and each page is quantized
+    and written to the memory-mapped store before the next one is read, so
+    memory stays bounded by the page size.
+
+    Labels and property names are interpolated in the queries and must come
+    from trusted configuration.
+
+    Parameters:
+    - driver (Driver): The Neo4j driver.
+    - database (str): The name of the Neo4j database.
+    - path (str): The directory of the store.
+    - precision (Precision, optional): How vectors are stored. Defaults to
+        "int8".
+    - keep_float32 (bool, optional): Whether to keep the float32 vectors for
+        rescoring. Defaults to False.
+    - label (str, optional): The label of the nodes. Defaults to "CUI".
+    - key (str, optional): The unique, ordered property used as id. Defaults to
+        "id".
+    - property (str, optional): The property holding the embedding. Defaults
+        to "embedding".
+    - batch_size (int, optional): The number of nodes per page. Defaults to
+        10000.
+    - model (Optional[str]): The embedding model, recorded as metadata.
+
+    Returns:
+    - EmbeddingStore: The opened store.
+    """
+    with driver.session(database=database) as session:
+        count: int = session.run(
+            cast(
+                Query,
+                f"MATCH (n:{label}) WHERE n.{property} IS NOT NULL "
+                "RETURN count(n) AS count",
+            )
+        ).single(strict=True)["count"]
+        first = session.run(
+            cast(
+                Query,
+                f"MATCH (n:{label}) WHERE n.{property} IS NOT NULL "
+                f"RETURN size(n.{property}) AS dim LIMIT 1",
+            )
+        ).single()
+        dim: int = first["dim"] if first is not None else 0
+
+        with EmbeddingStoreWriter(
+            path, dim, count, precision, keep_float32, model
+        ) as writer:
+            cursor: str = ""
+            while True:
+                page = session.run(
+                    cast(
+                        Query,
+                        f"MATCH (n:{label}) "
+                        f"WHERE n.{key} > $cursor AND n.{property} IS NOT NULL "
+                        f"RETURN n.{key} AS key, n.{property} AS embedding "
+                        f"ORDER BY n.{key} LIMIT $limit",
+                    ),
+                    cursor=cursor,
+                    limit=min(batch_size, count - len(writer)),
+                ).values()
+                if not page:
+                    break
+                writer.add([row[0] for row in page], [row[1] for row in page])
+                cursor = page[-1][0]
+
+    return EmbeddingStore(path)
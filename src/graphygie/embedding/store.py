@@ -0,0 +1,424 @@
+"""
+This module defines the EmbeddingStore class, a local, memory-mapped and
+optionally quantized matrix of embeddings with an id-to-row index, and the
+EmbeddingStoreWriter class that builds one incrementally.
+"""
+
+import json
+import os
+from typing import Literal, Optional, Sequence
+
+import numpy as np
+
+
+Precision = Literal["float32", "float16", "int8"]
+
+# Rows scored at once; bounds the temporary memory of a search.
+CHUNK_ROWS: int = 65536
+
+_META: str = "meta.json"
+_IDS: str = "ids.npy"
+_VECTORS: str = "vectors.npy"
+_SCALES: str = "scales.npy"
+_FULL: str = "full.npy"
+
+
+def normalize(vectors: np.ndarray) -> np.ndarray:
+    """
+    Scales each row to unit L2 norm, so a dot product is a cosine similarity.
+
+    Parameters:
+    - vectors (np.ndarray): The (n, dim) vectors.
+
+    Returns:
+    - np.ndarray: The float32 unit vectors; zero rows stay zero.
+    """
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms: np.ndarray = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.where(norms == 0, 1, norms)
+
+
+def quantize(vectors: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Quantizes unit vectors to int8 with one symmetric scale per row.
+
+    Parameters:
+    - vectors (np.ndarray): The (n, dim) float32 vectors.
+
+    Returns:
+    - tuple[np.ndarray, np.ndarray]: The (n, dim) int8 codes and the (n,)
+        float32 scales, such that `codes * scales[:, None]` approximates the
+        vectors.
+    """
+    scales: np.ndarray = np.abs(vectors).max(axis=1) / 127
+    scales[scales == 0] = 1
+    codes: np.ndarray = np.rint(vectors / scales[:, None]).astype(np.int8)
+    return codes, scales.astype(np.float32)
+
+
+def top_k(scores: np.ndarray, k: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Selects the k best scores of each row, in descending order.
+
+    Parameters:
+    - scores (np.ndarray): The (q, n) scores.
+    - k (int): The number of scores to keep.
+
+    Returns:
+    - tuple[np.ndarray, np.ndarray]: The (q, k) column indices and scores.
+    """
+    k = min(k, scores.shape[1])
+    if k == 0:
+        empty: np.ndarray = np.empty((scores.shape[0], 0))
+        return empty.astype(np.int64), empty.astype(np.float32)
+    part: np.ndarray = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    part_scores: np.ndarray = np.take_along_axis(scores, part, axis=1)
+    order: np.ndarray = np.argsort(-part_scores, axis=1, kind="stable")
+    return (
+        np.take_along_axis(part, order, axis=1),
+        np.take_along_axis(part_scores, order, axis=1),
+    )
+
+
+class EmbeddingStoreWriter:
+    """
+    Writes an embedding store batch by batch, straight into memory-mapped
+    files, so exporting never holds the whole matrix in memory.
+
+    Attributes:
+    - _path (str): The directory of the store.
+    - _count (int): The number of rows written so far.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        dim: int,
+        capacity: int,
+        precision: Precision = "int8",
+        keep_float32: bool = False,
+        model: Optional[str] = None,
+    ) -> None:
+        """
+        Creates the store files.
+
+        Parameters:
+        - path (str): The directory of the store, created if needed.
+        - dim (int): The dimension of the embeddings.
+        - capacity (int): The maximum number of rows.
+        - precision (Precision, optional): How vectors are stored. Defaults to
+            "int8".
+        - keep_float32 (bool, optional): Whether to also store the float32
+            vectors, used to rescore the candidates of a quantized search.
+            Defaults to False.
+        - model (Optional[str]): The embedding model, recorded as metadata.
+        """
+        os.makedirs(path, exist_ok=True)
+        self._path: str = path
+        self._dim: int = dim
+        self._capacity: int = capacity
+        self._precision: Precision = precision
+        self._model: Optional[str] = model
+        self._count: int = 0
+        self._ids: list[str] = []
+
+        self._vectors: np.memmap = np.lib.format.open_memmap(
+            os.path.join(path, _VECTORS),
+            mode="w+",
+            dtype=np.dtype(precision),
+            shape=(capacity, dim),
+        )
+        self._scales: Optional[np.memmap] = (
+            np.lib.format.open_memmap(
+                os.path.join(path, _SCALES),
+                mode="w+",
+                dtype=np.float32,
+                shape=(capacity,),
+            )
+            if precision == "int8"
+            else None
+        )
+        self._full: Optional[np.memmap] = (
+            np.lib.format.open_memmap(
+                os.path.join(path, _FULL),
+                mode="w+",
+                dtype=np.float32,
+                shape=(capacity, dim),
+            )
+            if keep_float32 and precision != "float32"
+            else None
+        )
+
+    def __len__(self) -> int:
+        return self._count
+
+    def add(self, ids: Sequence[str], vectors: Sequence[Sequence[float]]) -> None:
+        """
+        Appends a batch of embeddings.
+
+        Parameters:
+        - ids (Sequence[str]): The ids of the embeddings.
+        - vectors (Sequence[Sequence[float]]): The embeddings.
+
+        Raises:
+        - ValueError: If the batch does not fit the store.
+        """
+        if len(ids) == 0:
+            return
+        unit: np.ndarray = normalize(np.asarray(vectors))
+        if len(ids) != unit.shape[0] or unit.shape[1] != self._dim:
+            raise ValueError(f"Expected {len(ids)} vectors of dimension {self._dim}")
+        end: int = self._count + len(ids)
+        if end > self._capacity:
+            raise ValueError(f"The store is full ({self._capacity} rows)")
+
+        rows: slice = slice(self._count, end)
+        if self._scales is not None:
+            self._vectors[rows], self._scales[rows] = quantize(unit)
+        else:
+            self._vectors[rows] = unit
+        if self._full is not None:
+            self._full[rows] = unit
+        self._ids.extend(ids)
+        self._count = end
+
+    def close(self) -> None:
+        """
+        Flushes the matrices and writes the ids and metadata, which make the
+        store readable.
+        """
+        for matrix in (self._vectors, self._scales, self._full):
+            if matrix is not None:
+                matrix.flush()
+        np.save(os.path.join(self._path, _IDS), np.array(self._ids, dtype=str))
+        with open(os.path.join(self._path, _META), "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "count": self._count,
+                    "dim": self._dim,
+                    "precision": self._precision,
+                    "float32": self._full is not None,
+                    "model": self._model,
+                },
+                f,
+                indent=4,
+            )
+
+    def __enter__(self) -> "EmbeddingStoreWriter":
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+
+class EmbeddingStore:
+    """
+    A read-only, memory-mapped embedding store.
+
+    Vectors are unit-normalized before being stored, so cosine similarity is a
+    dot product. Quantized stores are searched on their codes, and, when the
+    float32 vectors were kept, the best candidates are rescored exactly.
+
+    Attributes:
+    - _path (str): The directory of the store.
+    - _ids (np.ndarray): The id of each row.
+    """
+
+    def __init__(self, path: str) -> None:
+        """
+        Opens a store; the matrices are memory-mapped, not read.
+
+        Parameters:
+        - path (str): The directory of the store.
+        """
+        with open(os.path.join(path, _META), "r", encoding="utf-8") as f:
+            meta: dict = json.load(f)
+
+        count: int = meta["count"]
+        self._path: str = path
+        self._precision: Precision = meta["precision"]
+        self._model: Optional[str] = meta.get("model")
+        self._ids: np.ndarray = np.load(os.path.join(path, _IDS))
+        self._vectors: np.ndarray = np.load(
+            os.path.join(path, _VECTORS), mmap_mode="r"
+        )[:count]
+        self._scales: Optional[np.ndarray] = (
+            np.load(os.path.join(path, _SCALES), mmap_mode="r")[:count]
+            if self._precision == "int8"
+            else None
+        )
+        self._full: Optional[np.ndarray] = (
+            np.load(os.path.join(path, _FULL), mmap_mode="r")[:count]
+            if meta.get("float32")
+            else None
+        )
+        self._index: Optional[dict[str, int]] = None
+
+    @staticmethod
+    def build(
+        path: str,
+        ids: Sequence[str],
+        vectors: Sequence[Sequence[float]],
+        precision: Precision = "int8",
+        keep_float32: bool = False,
+        model: Optional[str] = None,
+    ) -> "EmbeddingStore":
+        """
+        Writes in-memory embeddings as a store, then opens it.
+
+        Parameters:
+        - path (str): The directory of the store.
+        - ids (Sequence[str]): The ids of the embeddings.
+        - vectors (Sequence[Sequence[float]]): The embeddings.
+        - precision (Precision, optional): How vectors are stored. Defaults to
+            "int8".
+        - keep_float32 (bool, optional): Whether to keep the float32 vectors
+            for rescoring. Defaults to False.
+        - model (Optional[str]): The embedding model, recorded as metadata.
+
+        Returns:
+        - EmbeddingStore: The opened store.
+        """
+        matrix: np.ndarray = np.asarray(vectors, dtype=np.float32)
+        with EmbeddingStoreWriter(
+            path, matrix.shape[1], len(ids), precision, keep_float32, model
+        ) as writer:
+            for start in range(0, len(ids), CHUNK_ROWS):
+                writer.add(
+                    ids[start : start + CHUNK_ROWS],
+                    matrix[start : start + CHUNK_ROWS],
+                )
+        return EmbeddingStore(path)
+
+    @property
+    def ids(self) -> np.ndarray:
+        """Gets the id of each row"""
+        return self._ids
+
+    @property
+    def dim(self) -> int:
+        """Gets the dimension of the embeddings"""
+        return self._vectors.shape[1]
+
+    @property
+    def precision(self) -> Precision:
+        """Gets how the vectors are stored"""
+        return self._precision
+
+    @property
+    def model(self) -> Optional[str]:
+        """Gets the embedding model, if recorded"""
+        return self._model
+
+    @property
+    def nbytes(self) -> int:
+        """Gets the size of the searched matrices (codes and scales)"""
+        return self._vectors.nbytes + (
+            self._scales.nbytes if self._scales is not None else 0
+        )
+
+    def __len__(self) -> int:
+        return self._vectors.shape[0]
+
+    def __contains__(self, id: str) -> bool:
+        return id in self.index
+
+    @property
+    def index(self) -> dict[str, int]:
+        """Gets the row of each id, built on first use"""
+        if self._index is None:
+            self._index = {id: row for row, id in enumerate(self._ids.tolist())}
+        return self._index
+
+    def vectors(self, rows: np.ndarray | slice) -> np.ndarray:
+        """
+        Decodes rows to float32 unit vectors.
+
+        Parameters:
+        - rows (np.ndarray | slice): The rows to decode.
+
+        Returns:
+        - np.ndarray: The (len(rows), dim) vectors.
+        """
+        vectors: np.ndarray = np.asarray(self._vectors[rows], dtype=np.float32)
+        if self._scales is not None:
+            vectors *= self._scales[rows][..., None]
+        return vectors
+
+    def get(self, id: str) -> np.ndarray:
+        """
+        Returns the unit vector of an id.
+
+        Parameters:
+        - id (str): The id.
+
+        Returns:
+        - np.ndarray: The (dim,) float32 vector.
+
+        Raises:
+        - KeyError: If the id is not in the store.
+        """
+        return self.vectors(np.array([self.index[id]]))[0]
+
+    def search(
+        self, queries: Sequence[Sequence[float]], k: int = 10, rescore: int = 4
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Finds the k most cosine-similar rows of each query.
+
+        The matrix is scored in chunks of CHUNK_ROWS rows, each chunk keeping
+        only its candidates, so memory stays bounded whatever the store size.
+        If the store is quantized and kept its float32 vectors, the
+        `k * rescore` best candidates are rescored exactly.
+
+        Parameters:
+        - queries (Sequence[Sequence[float]]): The (q, dim) query vectors, or
+            a single (dim,) vector.
+        - k (int, optional): The number of results per query. Defaults to 10.
+        - rescore (int, optional): The candidate oversampling factor used for
+            rescoring. Defaults to 4.
+
+        Returns:
+        - tuple[np.ndarray, np.ndarray]: The (q, k) rows and cosine
+            similarities, best first; use `ids[rows]` for the ids.
+        """
+        matrix: np.ndarray = normalize(np.atleast_2d(np.asarray(queries)))
+        exact: bool = self._full is None or rescore <= 1
+        candidates: int = k if exact else k * rescore
+
+        best_rows: np.ndarray = np.empty((matrix.shape[0], 0), dtype=np.int64)
+        best_scores: np.ndarray = np.empty((matrix.shape[0], 0), dtype=np.float32)
+        for start in range(0, len(self), CHUNK_ROWS):
+            chunk: slice = slice(start, min(start + CHUNK_ROWS, len(self)))
+            scores: np.ndarray = matrix @ np.asarray(
+                self._vectors[chunk], dtype=np.float32
+            ).T
+            if self._scales is not None:
+                scores *= self._scales[chunk]
+            rows, scores = top_k(scores, candidates)
+            best_rows, best_scores = self._merge(
+                best_rows, best_scores, rows + start, scores, candidates
+            )
+
+        if not exact and self._full is not None:
+            full: np.ndarray = np.asarray(self._full[best_rows.ravel()]).reshape(
+                *best_rows.shape, -1
+            )
+            exact_scores: np.ndarray = np.einsum("qd,qcd->qc", matrix, full)
+            order, best_scores = top_k(exact_scores, k)
+            best_rows = np.take_along_axis(best_rows, order, axis=1)
+
+        return best_rows, best_scores
+
+    @staticmethod
+    def _merge(
+        rows: np.ndarray,
+        scores: np.ndarray,
+        new_rows: np.ndarray,
+        new_scores: np.ndarray,
+        k: int,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        rows = np.concatenate([rows, new_rows], axis=1)
+        scores = np.concatenate([scores, new_scores], axis=1)
+        order, scores = top_k(scores, k)
+        return np.take_along_axis(rows, order, axis=1), scores
@@ -5,9 +5,15 @@ pipeline.
 """
 
 import logging
+import time
 from graphygie.llm import LLM
 from graphygie.llm.chat import Chat
-from typing import Callable
+from graphygie.result import Result
+from typing import TYPE_CHECKING, Callable, Optional, Sequence
+
+if TYPE_CHECKING:
+    # Only annotated here; importing it would import numpy.
+    from graphygie.retrieval.packer import Packer
 
 
 class BasicGenerator(LLM):
@@ -23,6 +29,7 @@ class BasicGenerator(LLM):
         generator: LLM,
         chat: Chat,
         maker: Callable[[Chat, str], Chat],
+        packer: Optional["Packer"] = None,
     ) -> None:
         """
         Initializes the BasicGenerator pipeline.
@@ -34,18 +41,63 @@ class BasicGenerator(LLM):
         - maker (Callable[[Chat, str], Chat]): A function that merges the
             existing chat
           with the retrieved result to build the input for the generator.
+        - packer (Optional[Packer]): A packer keeping only the retrieved lines
+            most relevant to the user messages within its token budget. If
+            None, the retrieved result is used verbatim.
         """
         self._retriever = retriever
         self._generator = generator
         self._chat = chat
         self._maker = maker
+        self._packer = packer
 
     def chat(self, chat: Chat = list()) -> str:
+        return self.respond(chat).text
+
+    def choose(self, chat: Chat, choices: Sequence[str]) -> dict[str, float]:
+        return dict(self.respond(chat, choices).stats["generation_probabilities"])
+
+    def respond(
+        self, chat: Chat = list(), choices: Optional[Sequence[str]] = None
+    ) -> Result:
+        """
+        Retrieves the context of a chat, then generates the answer from it.
+
+        Parameters:
+        - chat (Chat, optional): The list of chat messages used as input.
+            Defaults to an empty list.
+        - choices (Optional[Sequence[str]]): If given, the allowed choice
+            keys the generator chooses from (see `LLM.choose`).
+
+        Returns:
+        - Result: The answer, with the retrieved context (after packing), the
+            statistics of the retriever, those of the generator (prefixed
+            with `generation_`) and the `generation_time` in seconds.
+        """
         logger: logging.Logger = logging.getLogger(__name__)
 
-        result: str = self._retriever.chat(chat)
-        chat = self._maker(self._chat, result) + chat
+        retrieved: Result = self._retriever.respond(chat)
+        context: str = retrieved.text
+        if self._packer is not None:
+            question: str = "\n".join(
+                message.content for message in chat if message.role == "user"
+            )
+            context = self._packer.pack(question, context)
+
+        logger.info(context)
 
-        logger.info(result)
+        start: float = time.perf_counter()
+        generated: Result = self._generator.respond(
+            self._maker(self._chat, context) + chat, choices
+        )
+        generation_time: float = time.perf_counter() - start
 
-        return self._generator.chat(chat)
+        return Result(
+            generated.text,
+            context,
+            {
+                **retrieved.stats,
+                **{f"generation_{k}": v for k, v in generated.stats.items()},
+                "generation_time": generation_time,
+            },
+        )
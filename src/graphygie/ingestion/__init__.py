@@ -0,0 +1,36 @@
+"""
+This module exposes the public interface for the ingestion components,
+including:
+
+- EmbeddingPipeline: Streaming reader -> embedder -> writer pipeline with
+    bounded queues.
+- Checkpoint: Durable cursor an interrupted pipeline resumes from.
+- StageMetrics: Throughput and error counters of a pipeline stage.
+- Neo4jEmbeddings: Neo4j reader and writer of node embeddings.
+- export_rrf: Streaming, parallel conversion of a UMLS release into
+    `neo4j-admin database import` CSV files.
+- import_command: The `neo4j-admin database import` command loading them.
+"""
+
+from typing import TYPE_CHECKING
+
+from graphygie._lazy import lazy_exports
+from .checkpoint import Checkpoint
+from .metrics import StageMetrics
+from .pipeline import EmbeddingPipeline, Record
+from .umls import export_rrf, import_command
+
+if TYPE_CHECKING:
+    from .neo4j import Neo4jEmbeddings
+
+__getattr__, __dir__ = lazy_exports(__name__, {"Neo4jEmbeddings": ".neo4j"})
+
+__all__: list[str] = [
+    "EmbeddingPipeline",
+    "Record",
+    "Checkpoint",
+    "StageMetrics",
+    "Neo4jEmbeddings",
+    "export_rrf",
+    "import_command",
+]
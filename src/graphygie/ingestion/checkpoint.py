@@ -0,0 +1,72 @@
+"""
+This module defines the Checkpoint class, which durably stores the cursor up
+to which an ingestion run is complete.
+"""
+
+import json
+import os
+import tempfile
+from typing import Optional
+
+
+class Checkpoint:
+    """
+    A JSON file holding the cursor of the last ingested record.
+
+    Saving writes a temporary file, syncs it and renames it over the previous
+    checkpoint, so a crash leaves either the old or the new cursor, never a
+    partial file.
+
+    Attributes:
+    - _path (str): The path of the checkpoint file.
+    """
+
+    def __init__(self, path: str) -> None:
+        """
+        Initializes the checkpoint.
+
+        Parameters:
+        - path (str): The path of the checkpoint file.
+        """
+        self._path: str = path
+
+    def load(self) -> Optional[str]:
+        """
+        Loads the saved cursor.
+
+        Returns:
+        - Optional[str]: The cursor, or None if nothing was saved yet.
+        """
+        try:
+            with open(self._path, "r", encoding="utf-8") as f:
+                return json.load(f)["cursor"]
+        except FileNotFoundError:
+            return None
+
+    def save(self, cursor: str) -> None:
+        """
+        Durably replaces the saved cursor.
+
+        Parameters:
+        - cursor (str): The cursor of the last ingested record.
+        """
+        directory: str = os.path.dirname(os.path.abspath(self._path))
+        fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({"cursor": cursor}, f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self._path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+    def clear(self) -> None:
+        """
+        Removes the checkpoint, so the next run starts from the beginning.
+        """
+        try:
+            os.remove(self._path)
+        except FileNotFoundError:
+            pass
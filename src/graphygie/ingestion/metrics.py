@@ -0,0 +1,72 @@
+"""
+This module defines the StageMetrics class, the thread-safe counters of one
+stage of an ingestion pipeline.
+"""
+
+import threading
+
+
+class StageMetrics:
+    """
+    Counts the items, batches, errors and busy time of a pipeline stage.
+
+    Attributes:
+    - _name (str): The name of the stage.
+    """
+
+    def __init__(self, name: str) -> None:
+        """
+        Initializes the counters.
+
+        Parameters:
+        - name (str): The name of the stage (e.g., "reader").
+        """
+        self._name: str = name
+        self._lock: threading.Lock = threading.Lock()
+        self._items: int = 0
+        self._batches: int = 0
+        self._errors: int = 0
+        self._busy: float = 0.0
+
+    @property
+    def name(self) -> str:
+        """Gets the name of the stage."""
+        return self._name
+
+    def record(self, items: int, seconds: float, error: bool = False) -> None:
+        """
+        Records one processed (or failed) batch.
+
+        Parameters:
+        - items (int): The number of items of the batch.
+        - seconds (float): The time spent processing it.
+        - error (bool, optional): Whether processing failed. Defaults to False.
+        """
+        with self._lock:
+            self._busy += seconds
+            if error:
+                self._errors += 1
+            else:
+                self._items += items
+                self._batches += 1
+
+    def snapshot(self, elapsed: float) -> dict[str, float]:
+        """
+        Returns the current counters.
+
+        Parameters:
+        - elapsed (float): The wall-clock time since the pipeline started.
+
+        Returns:
+        - dict[str, float]: The items, batches and errors, the busy time
+            summed over workers (seconds) and the throughput (items per
+            wall-clock second).
+        """
+        with self._lock:
+            return {
+                "items": self._items,
+                "batches": self._batches,
+                "errors": self._errors,
+                "busy": self._busy,
+                "items_per_s": self._items / elapsed if elapsed > 0 else 0.0,
+            }
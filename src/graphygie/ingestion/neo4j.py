@@ -0,0 +1,142 @@
+"""
+This module defines the Neo4jEmbeddings class, the Neo4j reader and writer of
+an EmbeddingPipeline.
+"""
+
+from typing import Optional, Sequence, cast
+
+from neo4j import Driver, ManagedTransaction, Query
+
+from .pipeline import Record
+
+
+class Neo4jEmbeddings:
+    """
+    Reads the nodes of a label that have no embedding yet, paginating on an
+    indexed key, and writes their embeddings back.
+
+    Labels and property names cannot be query parameters, so they are
+    interpolated in the queries and must come from trusted configuration.
+
+    Attributes:
+    - _driver (Driver): The driver, shared by the reader and every writer.
+    - _database (str): The name of the Neo4j database.
+    """
+
+    def __init__(
+        self,
+        driver: Driver,
+        database: str,
+        label: str = "CUI",
+        key: str = "id",
+        text: str = "name",
+        property: str = "embedding",
+    ) -> None:
+        """
+        Initializes the reader and writer.
+
+        Parameters:
+        - driver (Driver): The driver; its connection pool should allow one
+            connection per writer, plus one for the reader.
+        - database (str): The name of the Neo4j database.
+        - label (str, optional): The label of the nodes to embed. Defaults to
+            "CUI".
+        - key (str, optional): The unique, ordered property to paginate on.
+            Defaults to "id".
+        - text (str, optional): The property holding the text to embed.
+            Defaults to "name".
+        - property (str, optional): The property the embedding is written to.
+            Defaults to "embedding".
+        """
+        self._driver: Driver = driver
+        self._database: str = database
+        self._label: str = label
+        self._key: str = key
+        self._text: str = text
+        self._property: str = property
+
+    def ensure_index(self) -> None:
+        """
+        Creates the range index on the key used to paginate, and waits until it
+        is online.
+        """
+        with self._driver.session(database=self._database) as session:
+            session.run(
+                cast(
+                    Query,
+                    f"CREATE INDEX {self._label.lower()}_{self._key} IF NOT EXISTS "
+                    f"FOR (n:{self._label}) ON (n.{self._key})",
+                )
+            ).consume()
+            session.run("CALL db.awaitIndexes()").consume()
+
+    def count_missing(self) -> int:
+        """
+        Counts the nodes without embedding.
+
+        Returns:
+        - int: The number of nodes left to embed.
+        """
+        with self._driver.session(database=self._database) as session:
+            result = session.run(
+                cast(
+                    Query,
+                    f"MATCH (n:{self._label}) WHERE n.{self._property} IS NULL "
+                    "RETURN count(n) AS count",
+                )
+            )
+            return cast(int, result.single(strict=True)["count"])
+
+    def read(self, cursor: Optional[str], limit: int) -> list[Record]:
+        """
+        Retrieves the next nodes without embedding whose key is after the
+        cursor.
+
+        Paginating on the indexed key instead of SKIP keeps each page
+        O(limit), and nodes embedded meanwhile do not shift the next pages.
+
+        Parameters:
+        - cursor (Optional[str]): The key of the last node read, or None to
+            start from the first node.
+        - limit (int): The maximum number of nodes to return.
+
+        Returns:
+        - list[Record]: The (key, text) pairs, in key order.
+        """
+        with self._driver.session(database=self._database) as session:
+            result = session.run(
+                cast(
+                    Query,
+                    f"MATCH (n:{self._label}) "
+                    f"WHERE n.{self._key} > $cursor AND n.{self._property} IS NULL "
+                    f"RETURN n.{self._key} AS key, n.{self._text} AS text "
+                    f"ORDER BY n.{self._key} LIMIT $limit",
+                ),
+                cursor=cursor or "",
+                limit=limit,
+            )
+            return [(r["key"], r["text"] or "") for r in result]
+
+    def write(self, rows: list[tuple[str, Sequence[float]]]) -> None:
+        """
+        Sets the embeddings of a whole batch in a single transaction.
+
+        Parameters:
+        - rows (list[tuple[str, Sequence[float]]]): The (key, embedding) pairs.
+        """
+        with self._driver.session(database=self._database) as session:
+            session.execute_write(
+                self._write,
+                [{"key": key, "embedding": list(vector)} for key, vector in rows],
+            )
+
+    def _write(self, tx: ManagedTransaction, rows: list[dict]) -> None:
+        tx.run(
+            cast(
+                Query,
+                "UNWIND $rows AS row "
+                f"MATCH (n:{self._label} {{{self._key}: row.key}}) "
+                f"SET n.{self._property} = row.embedding",
+            ),
+            rows=rows,
+        ).consume()
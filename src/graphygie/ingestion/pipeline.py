@@ -0,0 +1,353 @@
+"""
+This module defines the EmbeddingPipeline class, a streaming
+reader -> embedder -> writer pipeline connected by bounded queues, with
+durable checkpoints and per-stage metrics.
+"""
+
+import logging
+import queue
+import threading
+import time
+from typing import Any, Callable, Optional, Sequence
+
+from .checkpoint import Checkpoint
+from .metrics import StageMetrics
+
+
+# A record to embed: its key (also used as the pagination cursor) and text.
+Record = tuple[str, str]
+
+# Marks the end of a queue; one is sent per consumer thread.
+_DONE: Any = object()
+
+# Seconds a blocked queue operation waits before checking whether the run
+# stopped.
+_POLL: float = 0.1
+
+
+class _Watermark:
+    """
+    Tracks the written batches and checkpoints the cursor of the longest
+    prefix of batches that are all written, so a resumed run never skips a
+    record, even though batches complete out of order.
+
+    Once a batch is dropped, the prefix can no longer grow past it: the
+    batches after it are not kept.
+    """
+
+    def __init__(self, checkpoint: Optional[Checkpoint], interval: float) -> None:
+        self._checkpoint: Optional[Checkpoint] = checkpoint
+        self._interval: float = interval
+        self._lock: threading.Lock = threading.Lock()
+        self._completed: dict[int, str] = {}
+        self._next: int = 0
+        self._dropped: Optional[int] = None
+        self._cursor: Optional[str] = None
+        self._saved: Optional[str] = None
+        self._last_save: float = time.monotonic()
+
+    def complete(self, sequence: int, cursor: str) -> None:
+        with self._lock:
+            if self._dropped is not None and sequence > self._dropped:
+                return
+            self._completed[sequence] = cursor
+            while self._next in self._completed:
+                self._cursor = self._completed.pop(self._next)
+                self._next += 1
+            if time.monotonic() - self._last_save >= self._interval:
+                self._save()
+
+    def drop(self, sequence: int) -> None:
+        with self._lock:
+            if self._dropped is None or sequence < self._dropped:
+                self._dropped = sequence
+                self._completed = {
+                    other: cursor
+                    for other, cursor in self._completed.items()
+                    if other < sequence
+                }
+
+    def flush(self) -> None:
+        with self._lock:
+            self._save()
+
+    def _save(self) -> None:
+        if self._checkpoint is not None and self._cursor != self._saved:
+            self._checkpoint.save(self._cursor or "")
+            self._saved = self._cursor
+        self._last_save = time.monotonic()
+
+
+class EmbeddingPipeline:
+    """
+    A three-stage ingestion pipeline:
+
+    - the reader pages through the records to embed, resuming from the
+        checkpoint (a single thread, as pages are read by key in order);
+    - embedder threads turn each page into embeddings;
+    - writer threads persist them.
+
+    Stages are connected by bounded queues, so a slow stage blocks the one
+    feeding it instead of letting batches pile up in memory. An unexpected
+    error in an embedder or writer (e.g., the checkpoint cannot be saved)
+    stops every stage, instead of leaving the others blocked on its queue.
+
+    Attributes:
+    - _read (Callable[[Optional[str], int], list[Record]]): Returns up to
+        `limit` records whose key is after the cursor, in key order.
+    - _embed (Callable[[list[str]], Sequence[Sequence[float]]]): Embeds a batch
+        of texts.
+    - _write (Callable[[list[tuple[str, Sequence[float]]]], None]): Persists a
+        batch of (key, embedding) pairs.
+    - _stop (threading.Event): Set when a stage failed, stopping the run.
+    - _error (Optional[Exception]): The first error of an embedder or
+        writer, raised by `run`.
+    """
+
+    def __init__(
+        self,
+        read: Callable[[Optional[str], int], list[Record]],
+        embed: Callable[[list[str]], Sequence[Sequence[float]]],
+        write: Callable[[list[tuple[str, Sequence[float]]]], None],
+        checkpoint: Optional[Checkpoint] = None,
+        batch_size: int = 256,
+        embedders: int = 4,
+        writers: int = 2,
+        queue_size: int = 8,
+        retries: int = 2,
+        checkpoint_interval: float = 5.0,
+    ) -> None:
+        """
+        Initializes the pipeline.
+
+        Parameters:
+        - read (Callable[[Optional[str], int], list[Record]]): The reader; the
+            cursor is None on the first call, and an empty page ends the run.
+        - embed (Callable[[list[str]], Sequence[Sequence[float]]]): The
+            embedder, returning one embedding per text.
+        - write (Callable[[list[tuple[str, Sequence[float]]]], None]): The
+            writer.
+        - checkpoint (Optional[Checkpoint]): Where progress is saved and
+            resumed from. If None, every run starts from the beginning.
+        - batch_size (int, optional): The number of records per page.
+            Defaults to 256.
+        - embedders (int, optional): The number of embedder threads. Defaults
+            to 4.
+        - writers (int, optional): The number of writer threads. Defaults
+            to 2.
+        - queue_size (int, optional): The capacity, in batches, of each queue.
+            Defaults to 8.
+        - retries (int, optional): The number of retries of a failed embed or
+            write before the batch is dropped. Defaults to 2.
+        - checkpoint_interval (float, optional): The minimum number of seconds
+            between two checkpoint saves. Defaults to 5.
+        """
+        self._read = read
+        self._embed = embed
+        self._write = write
+        self._checkpoint: Optional[Checkpoint] = checkpoint
+        self._batch_size: int = batch_size
+        self._embedders: int = embedders
+        self._writers: int = writers
+        self._queue_size: int = queue_size
+        self._retries: int = retries
+        self._checkpoint_interval: float = checkpoint_interval
+
+        self._stages: dict[str, StageMetrics] = {
+            name: StageMetrics(name) for name in ("reader", "embedder", "writer")
+        }
+        self._start: Optional[float] = None
+        self._stop: threading.Event = threading.Event()
+        self._error: Optional[Exception] = None
+        self._error_lock: threading.Lock = threading.Lock()
+
+    @property
+    def metrics(self) -> dict[str, dict[str, float]]:
+        """Returns the current metrics of each stage"""
+        elapsed: float = (
+            time.perf_counter() - self._start if self._start is not None else 0.0
+        )
+        return {name: stage.snapshot(elapsed) for name, stage in self._stages.items()}
+
+    def run(self) -> dict[str, dict[str, float]]:
+        """
+        Runs the pipeline until the reader is exhausted.
+
+        Returns:
+        - dict[str, dict[str, float]]: The final metrics of each stage.
+
+        Raises:
+        - Exception: Any error raised by the reader, after the batches already
+            read are written and checkpointed, or the first unexpected error
+            of an embedder or writer, once every stage stopped.
+        """
+        self._start = time.perf_counter()
+        self._stop.clear()
+        self._error = None
+        embed_queue: queue.Queue = queue.Queue(self._queue_size)
+        write_queue: queue.Queue = queue.Queue(self._queue_size)
+        watermark: _Watermark = _Watermark(
+            self._checkpoint, self._checkpoint_interval
+        )
+
+        embedders: list[threading.Thread] = [
+            threading.Thread(
+                target=self._embed_loop,
+                args=(embed_queue, write_queue, watermark),
+                daemon=True,
+            )
+            for _ in range(self._embedders)
+        ]
+        writers: list[threading.Thread] = [
+            threading.Thread(
+                target=self._write_loop, args=(write_queue, watermark), daemon=True
+            )
+            for _ in range(self._writers)
+        ]
+        for thread in embedders + writers:
+            thread.start()
+
+        try:
+            self._read_loop(embed_queue)
+        finally:
+            for _ in embedders:
+                self._put(embed_queue, _DONE)
+            for thread in embedders:
+                thread.join()
+            for _ in writers:
+                self._put(write_queue, _DONE)
+            for thread in writers:
+                thread.join()
+            if self._error is not None:
+                raise self._error
+            watermark.flush()
+
+        return self.metrics
+
+    def _read_loop(self, embed_queue: queue.Queue) -> None:
+        cursor: Optional[str] = (
+            self._checkpoint.load() if self._checkpoint is not None else None
+        )
+        sequence: int = 0
+        stage: StageMetrics = self._stages["reader"]
+
+        while True:
+            start: float = time.perf_counter()
+            try:
+                records: list[Record] = self._read(cursor, self._batch_size)
+            except Exception:
+                stage.record(0, time.perf_counter() - start, error=True)
+                raise
+            stage.record(len(records), time.perf_counter() - start)
+
+            if not records:
+                return
+            cursor = records[-1][0]
+            # Blocks while the embedders are behind (backpressure).
+            if not self._put(embed_queue, (sequence, cursor, records)):
+                return
+            sequence += 1
+
+    def _embed_loop(
+        self, embed_queue: queue.Queue, write_queue: queue.Queue, watermark: _Watermark
+    ) -> None:
+        stage: StageMetrics = self._stages["embedder"]
+
+        try:
+            while (item := self._get(embed_queue)) is not _DONE:
+                sequence, cursor, records = item
+                embeddings = self._attempt(
+                    stage, len(records), self._embed_all, [text for _, text in records]
+                )
+                if embeddings is None:
+                    watermark.drop(sequence)
+                    continue
+                rows = [(key, vector) for (key, _), vector in zip(records, embeddings)]
+                if not self._put(write_queue, (sequence, cursor, rows)):
+                    return
+        except Exception as e:
+            self._fail(e)
+
+    def _embed_all(self, texts: list[str]) -> Sequence[Sequence[float]]:
+        """
+        Embeds a batch, failing the attempt unless there is one vector per
+        text, so a short batch is retried instead of checkpointed.
+        """
+        embeddings: Sequence[Sequence[float]] = self._embed(texts)
+        if len(embeddings) != len(texts):
+            raise ValueError(
+                f"Expected {len(texts)} embeddings, got {len(embeddings)}."
+            )
+        return embeddings
+
+    def _write_loop(self, write_queue: queue.Queue, watermark: _Watermark) -> None:
+        stage: StageMetrics = self._stages["writer"]
+
+        try:
+            while (item := self._get(write_queue)) is not _DONE:
+                sequence, cursor, rows = item
+                if self._attempt(stage, len(rows), self._write, rows, result=True):
+                    watermark.complete(sequence, cursor)
+                else:
+                    watermark.drop(sequence)
+        except Exception as e:
+            self._fail(e)
+
+    def _fail(self, error: Exception) -> None:
+        """Records the first unexpected error of a stage and stops the run"""
+        logging.getLogger(__name__).error(f"Stopping the pipeline: {error}")
+        with self._error_lock:
+            if self._error is None:
+                self._error = error
+        self._stop.set()
+
+    def _put(self, channel: queue.Queue, item: Any) -> bool:
+        """Puts an item in a queue, unless the run stops first"""
+        while not self._stop.is_set():
+            try:
+                channel.put(item, timeout=_POLL)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _get(self, channel: queue.Queue) -> Any:
+        """Gets an item from a queue, or _DONE once the run stops"""
+        while not self._stop.is_set():
+            try:
+                return channel.get(timeout=_POLL)
+            except queue.Empty:
+                continue
+        return _DONE
+
+    def _attempt(
+        self,
+        stage: StageMetrics,
+        items: int,
+        func: Callable[[Any], Any],
+        argument: Any,
+        result: Any = None,
+    ) -> Any:
+        """
+        Calls a stage function with retries, recording its metrics.
+
+        Returns the function's result (or `result` if given) on success, and
+        None once every attempt failed; a dropped batch is never
+        checkpointed, so the next run retries it.
+        """
+        logger: logging.Logger = logging.getLogger(__name__)
+
+        for attempt in range(self._retries + 1):
+            start: float = time.perf_counter()
+            try:
+                value: Any = func(argument)
+            except Exception as e:
+                stage.record(items, time.perf_counter() - start, error=True)
+                logger.warning(
+                    f"{stage.name} failed (attempt {attempt + 1}/"
+                    f"{self._retries + 1}): {e}"
+                )
+                continue
+            stage.record(items, time.perf_counter() - start)
+            return value if result is None else result
+        return None
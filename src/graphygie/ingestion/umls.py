@@ -0,0 +1,435 @@
+"""
+This module defines the export_rrf function, which streams the MRCONSO, MRREL
+and MRSTY files of a UMLS release into the CSV files of
+`neo4j-admin database import`, in parallel chunks, and the import_command
+function building the matching command line.
+"""
+
+import csv
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Iterator, Optional
+
+
+# The columns of the RRF files used (see the UMLS Reference Manual).
+# MRCONSO: CUI|LAT|TS|LUI|STT|SUI|ISPREF|AUI|SAUI|SCUI|SDUI|SAB|TTY|CODE|STR|
+#   SRL|SUPPRESS|CVF
+_CONSO_CUI, _CONSO_LAT, _CONSO_TS, _CONSO_STT = 0, 1, 2, 4
+_CONSO_ISPREF, _CONSO_AUI, _CONSO_STR, _CONSO_SUPPRESS = 6, 7, 14, 16
+# MRREL: CUI1|AUI1|STYPE1|REL|CUI2|AUI2|STYPE2|RELA|RUI|SRUI|SAB|SL|RG|DIR|
+#   SUPPRESS|CVF
+_REL_CUI1, _REL_AUI1, _REL_REL = 0, 1, 3
+_REL_CUI2, _REL_AUI2, _REL_SUPPRESS = 4, 5, 14
+# MRSTY: CUI|TUI|STN|STY|ATUI|CVF
+_STY_CUI, _STY_TUI, _STY_STN, _STY_STY = 0, 1, 2, 3
+# SRDEF: RT|UI|STY/RL|STN/RTN|DEF|EX|UN|NH|ABR|RIN
+_DEF_RT, _DEF_UI, _DEF_DEF, _DEF_ABR = 0, 1, 4, 8
+
+# The relationships imported between concepts and between atoms.
+CUI_RELATIONSHIPS: frozenset[str] = frozenset({"PAR", "CHD", "SY", "RO"})
+AUI_RELATIONSHIPS: frozenset[str] = frozenset(
+    {"PAR", "CHD", "SY", "RB", "RN", "RQ", "RO"}
+)
+
+# The header of each kind of CSV file, in the `neo4j-admin` format.
+HEADERS: dict[str, list[str]] = {
+    "cui": ["id:ID(CUI)", "name", "CUI"],
+    "aui": ["id:ID(AUI)", "name", "CUI", "AUI"],
+    "semantic_type": ["id:ID(SemanticType)", "ABR", "DEF", "name", "STY"],
+    "cui_rel": [":START_ID(CUI)", ":END_ID(CUI)", ":TYPE"],
+    "aui_rel": [":START_ID(AUI)", ":END_ID(AUI)", ":TYPE"],
+    "sty_rel": [":START_ID(CUI)", ":END_ID(SemanticType)"],
+}
+
+
+def rrf_rows(
+    path: str, start: int = 0, end: Optional[int] = None
+) -> Iterator[list[str]]:
+    """
+    Streams the rows of an RRF file, or of a byte range of it.
+
+    Parameters:
+    - path (str): The path of the RRF file.
+    - start (int, optional): The offset of the first row. Defaults to 0.
+    - end (Optional[int]): The offset after the last row. If None, rows are
+        read to the end of the file.
+
+    Yields:
+    - list[str]: The fields of each row.
+    """
+    with open(path, "rb") as file:
+        file.seek(start)
+        position: int = start
+        for line in file:
+            if end is not None and position >= end:
+                return
+            position += len(line)
+            # Each row ends with a trailing "|".
+            yield line.decode("utf-8").rstrip("\r\n").split("|")[:-1]
+
+
+def chunk_bounds(path: str, chunks: int) -> list[tuple[int, int]]:
+    """
+    Splits an RRF file sorted on its first column into byte ranges, cut at
+    line boundaries where the first column changes, so that all the rows of a
+    concept fall in one range.
+
+    Parameters:
+    - path (str): The path of the RRF file.
+    - chunks (int): The target number of ranges.
+
+    Returns:
+    - list[tuple[int, int]]: The (start, end) offsets of the non-empty ranges.
+    """
+    size: int = os.path.getsize(path)
+    cuts: list[int] = [0]
+    with open(path, "rb") as file:
+        for i in range(1, chunks):
+            target: int = max(size * i // chunks, cuts[-1])
+            file.seek(target)
+            if target > 0:
+                file.readline()  # Skips to the next line start.
+            first: bytes = file.readline()
+            key: bytes = first.split(b"|", 1)[0]
+            cut: int = file.tell() if first else size
+            while first:
+                cut = file.tell()
+                line: bytes = file.readline()
+                if not line or line.split(b"|", 1)[0] != key:
+                    break
+            cuts.append(max(cut, cuts[-1]))
+    cuts.append(size)
+    return [(start, end) for start, end in zip(cuts, cuts[1:]) if end > start]
+
+
+def _groups(
+    path: str, start: int, end: int
+) -> Iterator[tuple[str, list[list[str]]]]:
+    # Consecutive rows sharing their first column (the concept).
+    key: Optional[str] = None
+    group: list[list[str]] = []
+    for row in rrf_rows(path, start, end):
+        if row[0] != key:
+            if group:
+                yield key or "", group
+            key, group = row[0], []
+        group.append(row)
+    if group:
+        yield key or "", group
+
+
+def _writer(path: str) -> tuple[Any, Any]:
+    file = open(path, "w", encoding="utf-8", newline="")
+    return file, csv.writer(file)
+
+
+def _concepts(
+    path: str,
+    start: int,
+    end: int,
+    output: str,
+    chunk: int,
+    languages: frozenset[str],
+    suppressed: bool,
+) -> dict[str, int]:
+    # One CUI per group, named after its preferred atom; one AUI per row.
+    counts: dict[str, int] = {"rows": 0, "cui": 0, "aui": 0, "duplicates": 0}
+    cui_file, cuis = _writer(os.path.join(output, f"cui-{chunk:04d}.csv"))
+    aui_file, auis = _writer(os.path.join(output, f"aui-{chunk:04d}.csv"))
+    with cui_file, aui_file:
+        for cui, rows in _groups(path, start, end):
+            counts["rows"] += len(rows)
+            name: Optional[str] = None
+            preferred: bool = False
+            seen: set[str] = set()
+            for row in rows:
+                if row[_CONSO_LAT] not in languages:
+                    continue
+                if not suppressed and row[_CONSO_SUPPRESS] not in ("", "N"):
+                    continue
+                aui: str = row[_CONSO_AUI]
+                if aui in seen:
+                    counts["duplicates"] += 1
+                    continue
+                seen.add(aui)
+                auis.writerow([aui, row[_CONSO_STR], cui, aui])
+                if not preferred and (
+                    row[_CONSO_TS] == "P"
+                    and row[_CONSO_STT] == "PF"
+                    and row[_CONSO_ISPREF] == "Y"
+                ):
+                    name, preferred = row[_CONSO_STR], True
+                elif name is None:
+                    name = row[_CONSO_STR]
+            counts["aui"] += len(seen)
+            if name is not None:
+                cuis.writerow([cui, name, cui])
+                counts["cui"] += 1
+    return counts
+
+
+def _relationships(
+    path: str,
+    start: int,
+    end: int,
+    output: str,
+    chunk: int,
+    cui_relationships: frozenset[str],
+    aui_relationships: frozenset[str],
+    suppressed: bool,
+) -> dict[str, int]:
+    # Rows are deduplicated within the group of their first concept, which is
+    # where all the duplicates of a relationship are in a release.
+    counts: dict[str, int] = {
+        "rows": 0,
+        "cui_rel": 0,
+        "aui_rel": 0,
+        "duplicates": 0,
+    }
+    cui_file, cui_rels = _writer(os.path.join(output, f"cui_rel-{chunk:04d}.csv"))
+    aui_file, aui_rels = _writer(os.path.join(output, f"aui_rel-{chunk:04d}.csv"))
+    with cui_file, aui_file:
+        for cui, rows in _groups(path, start, end):
+            counts["rows"] += len(rows)
+            seen_cui: set[tuple[str, str]] = set()
+            seen_aui: set[tuple[str, str, str]] = set()
+            for row in rows:
+                if not suppressed and row[_REL_SUPPRESS] not in ("", "N"):
+                    continue
+                rel: str = row[_REL_REL]
+                other: str = row[_REL_CUI2]
+                if rel in cui_relationships and other and other != cui:
+                    if (rel, other) in seen_cui:
+                        counts["duplicates"] += 1
+                    else:
+                        seen_cui.add((rel, other))
+                        cui_rels.writerow([cui, other, rel])
+                aui1, aui2 = row[_REL_AUI1], row[_REL_AUI2]
+                if rel in aui_relationships and aui1 and aui2 and aui1 != aui2:
+                    if (aui1, rel, aui2) in seen_aui:
+                        counts["duplicates"] += 1
+                    else:
+                        seen_aui.add((aui1, rel, aui2))
+                        aui_rels.writerow([aui1, aui2, rel])
+            counts["cui_rel"] += len(seen_cui)
+            counts["aui_rel"] += len(seen_aui)
+    return counts
+
+
+def _semantic_types(
+    path: str, start: int, end: int, output: str, chunk: int
+) -> tuple[dict[str, int], dict[str, tuple[str, str]]]:
+    # The (few) semantic types seen are returned, to be written once.
+    counts: dict[str, int] = {"rows": 0, "sty_rel": 0, "duplicates": 0}
+    types: dict[str, tuple[str, str]] = {}
+    file, rels = _writer(os.path.join(output, f"sty_rel-{chunk:04d}.csv"))
+    with file:
+        for cui, rows in _groups(path, start, end):
+            counts["rows"] += len(rows)
+            seen: set[str] = set()
+            for row in rows:
+                tui: str = row[_STY_TUI]
+                types.setdefault(tui, (row[_STY_STY], row[_STY_STN]))
+                if tui in seen:
+                    counts["duplicates"] += 1
+                    continue
+                seen.add(tui)
+                rels.writerow([cui, tui])
+            counts["sty_rel"] += len(seen)
+    return counts, types
+
+
+def _definitions(path: Optional[str]) -> dict[str, tuple[str, str]]:
+    # The abbreviation and definition of each semantic type, from SRDEF.
+    if path is None:
+        return {}
+    return {
+        row[_DEF_UI]: (row[_DEF_ABR], row[_DEF_DEF])
+        for row in rrf_rows(path)
+        if row[_DEF_RT] == "STY"
+    }
+
+
+def export_rrf(
+    source: str,
+    output: str,
+    workers: Optional[int] = None,
+    languages: tuple[str, ...] = ("ENG",),
+    cui_relationships: frozenset[str] = CUI_RELATIONSHIPS,
+    aui_relationships: frozenset[str] = AUI_RELATIONSHIPS,
+    suppressed: bool = False,
+    srdef: Optional[str] = None,
+) -> dict[str, dict[str, float]]:
+    """
+    Converts a UMLS release into `neo4j-admin database import` CSV files.
+
+    Each RRF file is split into byte ranges at concept boundaries (RRF files
+    are sorted on their first CUI) and every range is streamed by its own
+    process into its own CSV file, holding only the rows of one concept at a
+    time: memory does not grow with the release. Concepts, atoms and
+    relationships are deduplicated as they stream.
+
+    The nodes and relationships follow the schema of the graph:
+    - CUI(id, name, CUI), named after the preferred atom of the concept.
+    - AUI(id, name, CUI, AUI), one per atom in the requested languages.
+    - SemanticType(id, ABR, DEF, name, STY), identified by their TUI.
+    - (CUI1)-[REL]->(CUI2) and (AUI1)-[REL]->(AUI2) from MRREL, read as
+        "CUI1 has the REL CUI2" (e.g., PAR: CUI2 is a parent of CUI1), and
+        (CUI)-[STY]->(SemanticType) from MRSTY.
+
+    Relationships may point to concepts without atom in the requested
+    languages: import with `--skip-bad-relationships` (see `import_command`).
+
+    Parameters:
+    - source (str): The directory holding MRCONSO.RRF, MRREL.RRF and
+        MRSTY.RRF (the META directory of a release).
+    - output (str): The directory of the CSV files, created if needed. The
+        CSV files of a previous export are replaced.
+    - workers (Optional[int]): The number of processes. If None, one per
+        core.
+    - languages (tuple[str, ...], optional): The languages (LAT) of the atoms
+        imported. Defaults to ("ENG",).
+    - cui_relationships (frozenset[str], optional): The relationships
+        imported between concepts. Defaults to CUI_RELATIONSHIPS.
+    - aui_relationships (frozenset[str], optional): The relationships
+        imported between atoms. Defaults to AUI_RELATIONSHIPS.
+    - suppressed (bool, optional): Whether to import suppressed atoms and
+        relationships. Defaults to False.
+    - srdef (Optional[str]): The path of the SRDEF file of the Semantic
+        Network, providing the ABR and DEF of the semantic types. If None,
+        they are left empty.
+
+    Returns:
+    - dict[str, dict[str, float]]: For each RRF file, the rows read, the
+        nodes or relationships written, the duplicates dropped, the elapsed
+        seconds and the rows per second.
+    """
+    os.makedirs(output, exist_ok=True)
+    # Parts of a previous export (e.g., with more workers) would be imported.
+    for name in os.listdir(output):
+        if name.endswith(".csv") and name.split("-")[0] in HEADERS:
+            os.remove(os.path.join(output, name))
+    for kind, header in HEADERS.items():
+        file, writer = _writer(os.path.join(output, f"{kind}-header.csv"))
+        with file:
+            writer.writerow(header)
+
+    workers = workers or os.cpu_count() or 1
+    stats: dict[str, dict[str, float]] = {}
+    with ProcessPoolExecutor(workers) as executor:
+        for name in ("MRCONSO", "MRREL", "MRSTY"):
+            path: str = os.path.join(source, f"{name}.RRF")
+            start: float = time.perf_counter()
+            futures = []
+            for chunk, (begin, end) in enumerate(chunk_bounds(path, workers)):
+                if name == "MRCONSO":
+                    futures.append(
+                        executor.submit(
+                            _concepts,
+                            path,
+                            begin,
+                            end,
+                            output,
+                            chunk,
+                            frozenset(languages),
+                            suppressed,
+                        )
+                    )
+                elif name == "MRREL":
+                    futures.append(
+                        executor.submit(
+                            _relationships,
+                            path,
+                            begin,
+                            end,
+                            output,
+                            chunk,
+                            cui_relationships,
+                            aui_relationships,
+                            suppressed,
+                        )
+                    )
+                else:
+                    futures.append(
+                        executor.submit(
+                            _semantic_types, path, begin, end, output, chunk
+                        )
+                    )
+
+            totals: dict[str, float] = {}
+            types: dict[str, tuple[str, str]] = {}
+            for future in futures:
+                counts = future.result()
+                if name == "MRSTY":
+                    counts, found = counts
+                    for tui, value in found.items():
+                        types.setdefault(tui, value)
+                for key, value in counts.items():
+                    totals[key] = totals.get(key, 0) + value
+
+            if name == "MRSTY":
+                definitions: dict[str, tuple[str, str]] = _definitions(srdef)
+                file, writer = _writer(
+                    os.path.join(output, "semantic_type-0000.csv")
+                )
+                with file:
+                    for tui, (sty, _) in sorted(types.items()):
+                        abr, definition = definitions.get(tui, ("", ""))
+                        writer.writerow([tui, abr, definition, sty, sty])
+                totals["semantic_type"] = len(types)
+
+            elapsed: float = time.perf_counter() - start
+            totals["seconds"] = elapsed
+            totals["rows_per_s"] = totals["rows"] / elapsed if elapsed > 0 else 0.0
+            stats[name] = totals
+
+    return stats
+
+
+def import_command(
+    output: str, database: str = "neo4j", mount: Optional[str] = None
+) -> list[str]:
+    """
+    Builds the `neo4j-admin database import` command loading the CSV files
+    written by `export_rrf`.
+
+    Parameters:
+    - output (str): The directory of the CSV files.
+    - database (str, optional): The name of the database. Defaults to
+        "neo4j".
+    - mount (Optional[str]): The same directory as seen by neo4j-admin
+        (e.g., "/import" in a container). If None, output is used.
+
+    Returns:
+    - list[str]: The command line arguments.
+    """
+    names: list[str] = sorted(os.listdir(output))
+    root: str = mount if mount is not None else output
+
+    def files(kind: str) -> str:
+        parts: list[str] = [
+            name
+            for name in names
+            if name.startswith(f"{kind}-") and name != f"{kind}-header.csv"
+        ]
+        return ",".join(
+            os.path.join(root, name) for name in [f"{kind}-header.csv", *parts]
+        )
+
+    return [
+        "neo4j-admin",
+        "database",
+        "import",
+        "full",
+        database,
+        "--overwrite-destination=true",
+        "--skip-bad-relationships=true",
+        "--skip-duplicate-nodes=true",
+        f"--nodes=CUI={files('cui')}",
+        f"--nodes=AUI={files('aui')}",
+        f"--nodes=SemanticType={files('semantic_type')}",
+        f"--relationships={files('cui_rel')}",
+        f"--relationships={files('aui_rel')}",
+        f"--relationships=STY={files('sty_rel')}",
+    ]
@@ -7,12 +7,23 @@ This module exposes the public interface for the LLM components, including:
 - Ollama: Concrete implementation of LLM using the Ollama API.
 - OpenAI: Concrete implementation of LLM using the OpenAI API.
 
+The backends (and their client libraries) are imported on first access, so
+using one backend never pays for importing the other.
 """
 
+from typing import TYPE_CHECKING
+
+from graphygie._lazy import lazy_exports
 from .chat import Message, Chat
 from .llm import LLM
-from .ollama import Ollama
-from .openai import OpenAI
 
+if TYPE_CHECKING:
+    from .ollama import Ollama
+    from .openai import OpenAI
+
+
+__getattr__, __dir__ = lazy_exports(
+    __name__, {"Ollama": ".ollama", "OpenAI": ".openai"}
+)
 
 __all__: list[str] = ["Message", "Chat", "LLM", "Ollama", "OpenAI"]
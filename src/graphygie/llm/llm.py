@@ -3,10 +3,108 @@ This module defines the abstract interface for a Language Model (LLM)
 that can generate responses or queries based on a chat history.
 """
 
+import json
+import re
 from abc import ABC, abstractmethod
+from typing import Any, Optional, Sequence
+from graphygie.result import Result
 from .chat import Chat
 
 
+def match_choice(text: str, choices: Sequence[str]) -> Optional[str]:
+    """
+    Finds the choice a free-form answer selects.
+
+    Parameters:
+    - text (str): The answer (e.g., "B", "B)", "**B**", "Answer: B").
+    - choices (Sequence[str]): The allowed choice keys.
+
+    Returns:
+    - Optional[str]: The exact choice if the answer is one, else the first
+        choice found as a word in it, else None.
+    """
+    answer: str = text.strip()
+    if answer in choices:
+        return answer
+    found: dict[int, str] = {}
+    for choice in choices:
+        match = re.search(rf"(?<!\w){re.escape(choice)}(?!\w)", answer)
+        if match is not None:
+            found.setdefault(match.start(), choice)
+    return found[min(found)] if found else None
+
+
+def choice_schema(choices: Sequence[str]) -> dict[str, Any]:
+    """
+    Gets the JSON schema of an answer restricted to a few choices, for the
+    structured outputs of a backend.
+
+    Parameters:
+    - choices (Sequence[str]): The allowed choice keys.
+
+    Returns:
+    - dict[str, Any]: The schema of an object whose `answer` is one of the
+        choices.
+    """
+    return {
+        "type": "object",
+        "properties": {"answer": {"type": "string", "enum": list(choices)}},
+        "required": ["answer"],
+        "additionalProperties": False,
+    }
+
+
+def parse_choice(text: str, choices: Sequence[str]) -> Optional[str]:
+    """
+    Finds the choice of an answer following `choice_schema`.
+
+    Parameters:
+    - text (str): The answer.
+    - choices (Sequence[str]): The allowed choice keys.
+
+    Returns:
+    - Optional[str]: The `answer` of the JSON object if it is a choice, else
+        the choice found by `match_choice`.
+    """
+    try:
+        answer: Any = json.loads(text).get("answer")
+    except (ValueError, AttributeError):
+        answer = None
+    if isinstance(answer, str) and answer in choices:
+        return answer
+    return match_choice(text, choices)
+
+
+def one_hot(choice: Optional[str], choices: Sequence[str]) -> dict[str, float]:
+    """
+    Gets the probabilities of a certain choice.
+
+    Parameters:
+    - choice (Optional[str]): The choice, if any.
+    - choices (Sequence[str]): The allowed choice keys.
+
+    Returns:
+    - dict[str, float]: 1.0 for the choice and 0.0 for the others (all of
+        them if no choice was made).
+    """
+    return {key: float(key == choice) for key in choices}
+
+
+def best_choice(probabilities: dict[str, float]) -> str:
+    """
+    Gets the most probable choice.
+
+    Parameters:
+    - probabilities (dict[str, float]): The probability of each choice.
+
+    Returns:
+    - str: The most probable choice, or "" if none was made.
+    """
+    if not any(probabilities.values()):
+        return ""
+    return max(probabilities, key=probabilities.__getitem__)
+
+
 class LLM(ABC):
     """
     Abstract base class for language models that can handle chat interactions.
@@ -26,3 +124,49 @@ class LLM(ABC):
         - str: The result of the query executed on the database.
         """
         ...
+
+    def choose(self, chat: Chat, choices: Sequence[str]) -> dict[str, float]:
+        """
+        Answers a chat with one of a few choices (e.g., the option letters of
+        a multiple-choice question), instead of free text.
+
+        Backends override it to constrain the generation to the choices and
+        score them. By default, the chat is answered freely and the first
+        choice found in the answer is taken.
+
+        Parameters:
+        - chat (Chat): The list of chat messages used as input.
+        - choices (Sequence[str]): The allowed choice keys.
+
+        Returns:
+        - dict[str, float]: The probability of each choice, all 0.0 if the
+            answer selects none.
+        """
+        return one_hot(match_choice(self.chat(chat), choices), choices)
+
+    def respond(
+        self, chat: Chat = list(), choices: Optional[Sequence[str]] = None
+    ) -> Result:
+        """
+        Answers a chat with the statistics of this request only, leaving the
+        instance unchanged, so it can serve concurrent requests.
+
+        Backends and pipelines override it to report their statistics (e.g.,
+        token usage, stage timings). By default, there are none.
+
+        Parameters:
+        - chat (Chat, optional): The list of chat messages used as input.
+            Defaults to an empty list.
+        - choices (Optional[Sequence[str]]): If given, the allowed choice
+            keys (see `choose`): the text is the most probable one, and the
+            `probabilities` statistic holds the probability of each.
+
+        Returns:
+        - Result: The answer and its statistics.
+        """
+        if choices is None:
+            return Result(self.chat(chat))
+        probabilities: dict[str, float] = self.choose(chat, choices)
+        return Result(
+            best_choice(probabilities), stats={"probabilities": probabilities}
+        )
@@ -1,15 +1,63 @@
 """
 This module defines the Ollama class, a concrete implementation of the LLM
 interface, which uses the Ollama API to generate responses from a chat
-history.
+history, sizing the context window of the model to the prompt.
 """
 
-from typing import Any, Optional, Callable
+import logging
+import threading
+import time
+from typing import Any, Optional, Callable, Sequence
 from ollama import Client, ChatResponse
-from .llm import LLM
+from graphygie.result import Result
+from .llm import LLM, best_choice, choice_schema, one_hot, parse_choice
 from .chat import Chat
 
 
+# The context windows (tokens) the model is loaded with. The server reloads
+# the model whenever `num_ctx` changes, so only a few sizes are used.
+CONTEXT_BUCKETS: tuple[int, ...] = (2048, 4096, 8192, 16384, 32768)
+
+# A conservative number of characters per token: the biomedical terms of the
+# retrieved contexts split into more tokens than common English.
+CHARS_PER_TOKEN: float = 3.0
+
+# The tokens reserved for the answer when `num_predict` is not set.
+ANSWER_TOKENS: int = 512
+
+
+def estimate_tokens(chat: Chat) -> int:
+    """
+    Estimates the number of prompt tokens of a chat, without tokenizing it.
+
+    Parameters:
+    - chat (Chat): The messages.
+
+    Returns:
+    - int: The estimated number of tokens, with the overhead of the chat
+        template of each message.
+    """
+    return sum(int(len(message.content) / CHARS_PER_TOKEN) + 4 for message in chat)
+
+
+def context_bucket(tokens: int, buckets: Sequence[int]) -> int:
+    """
+    Picks the smallest context window holding a number of tokens.
+
+    Parameters:
+    - tokens (int): The tokens of the prompt and the answer.
+    - buckets (Sequence[int]): The context windows, in increasing order.
+
+    Returns:
+    - int: The smallest window of at least `tokens` tokens, or the largest
+        window if none is.
+    """
+    for bucket in buckets:
+        if bucket >= tokens:
+            return bucket
+    return buckets[-1]
+
+
 class Ollama(LLM):
     """
     An implementation of the LLM interface using the Ollama API.
@@ -17,6 +65,13 @@ class Ollama(LLM):
     This class manages an ongoing chat session with a specified model,
     and optionally allows post-processing of the response using a cleaner
     function.
+
+    Unless `num_ctx` is set in the model parameters, the context window is
+    the smallest bucket holding the estimated prompt and answer. It only
+    grows, under a lock shared by concurrent requests, so the model is
+    reloaded at most once per bucket, and long prompts are not silently
+    truncated to the server default. Each result reports the `num_ctx` of
+    its request.
     """
 
     def __init__(
@@ -25,6 +80,10 @@ class Ollama(LLM):
         chat: Chat = list(),
         host: Optional[str] = None,
         cleaner: Optional[Callable[[str], str]] = None,
+        keep_alive: Optional[float | str] = None,
+        model_params: Optional[dict[str, Any]] = None,
+        context_buckets: Optional[Sequence[int]] = CONTEXT_BUCKETS,
+        cleaner_stop: bool = False,
         **kwargs: Any,
     ) -> None:
         """
@@ -38,6 +97,21 @@ class Ollama(LLM):
             defaults are used.
         - cleaner (Optional[Callable[[str], str]]): A function to post-process
             the model's response.
+        - keep_alive (Optional[float | str]): How long the server keeps the
+            model loaded after each request (e.g., "30m", or seconds; -1
+            keeps it loaded). If None, the server default is used.
+        - model_params (Optional[dict[str, Any]]): The model options of each
+            request (e.g., {"temperature": 0, "num_predict": 256}). A
+            `num_ctx` disables the context sizing.
+        - context_buckets (Optional[Sequence[int]], optional): The context
+            windows (tokens) the model is loaded with, in increasing order.
+            Defaults to CONTEXT_BUCKETS. If None, the server default is used.
+        - cleaner_stop (bool, optional): Whether the stop sequences the
+            cleaner declares (its `stop` attribute, e.g., a double newline)
+            end the generation, unless the model parameters set their own.
+            They only keep the cleaned response unchanged when the prompt
+            makes the model answer as the cleaner expects (e.g., with the
+            code fence first). Defaults to False.
         - **kwargs: Additional keyword arguments passed to the Ollama client.
         """
 
@@ -45,14 +119,165 @@ class Ollama(LLM):
         self._model: str = model
         self._chat: Chat = chat
         self._cleaner: Optional[Callable[[str], str]] = cleaner
+        self._keep_alive: Optional[float | str] = keep_alive
+        self._model_params: dict[str, Any] = dict(model_params or {})
+        self._context_buckets: Optional[tuple[int, ...]] = (
+            None
+            if context_buckets is None or "num_ctx" in self._model_params
+            else tuple(sorted(context_buckets))
+        )
+        self._num_ctx: Optional[int] = (
+            None if self._context_buckets is None else self._context_buckets[0]
+        )
+        self._num_ctx_lock: threading.Lock = threading.Lock()
+        self._stop: list[str] = (
+            list(getattr(cleaner, "stop", ()))
+            if cleaner_stop and "stop" not in self._model_params
+            else []
+        )
+
+    def _options(self, chat: Chat) -> dict[str, Any]:
+        """
+        Gets the model options of a request, sizing its context window.
+
+        Parameters:
+        - chat (Chat): The complete list of messages, history included.
+
+        Returns:
+        - dict[str, Any]: The model parameters, with the `num_ctx` of the
+            chat when sized.
+        """
+        if self._context_buckets is None or self._num_ctx is None:
+            return self._model_params
+        answer: int = self._model_params.get("num_predict", ANSWER_TOKENS)
+        if answer < 0:
+            answer = ANSWER_TOKENS
+        tokens: int = estimate_tokens(chat) + answer
+        if tokens > self._context_buckets[-1]:
+            logging.getLogger(__name__).warning(
+                f"~{tokens} tokens exceed the largest context window "
+                f"({self._context_buckets[-1]}): the prompt may be truncated"
+            )
+        needed: int = context_bucket(tokens, self._context_buckets)
+        with self._num_ctx_lock:
+            self._num_ctx = max(self._num_ctx, needed)
+            num_ctx: int = self._num_ctx
+        return {**self._model_params, "num_ctx": num_ctx}
 
     def chat(self, chat: Chat = list()) -> str:
+        return self.respond(chat).text
+
+    def choose(self, chat: Chat, choices: Sequence[str]) -> dict[str, float]:
+        """
+        Answers a chat with one of a few choices, constraining the generation
+        to a JSON object whose only field is one of the choice keys.
+
+        Parameters:
+        - chat (Chat): The list of chat messages used as input.
+        - choices (Sequence[str]): The allowed choice keys.
+
+        Returns:
+        - dict[str, float]: 1.0 for the chosen key and 0.0 for the others
+            (all of them if the answer is not valid).
+        """
+        return dict(self.respond(chat, choices).stats["probabilities"])
+
+    def respond(
+        self, chat: Chat = list(), choices: Optional[Sequence[str]] = None
+    ) -> Result:
+        """
+        Answers a chat (or chooses, see `choose`) with the token counts
+        reported by the server.
+
+        Parameters:
+        - chat (Chat, optional): The list of chat messages used as input.
+            Defaults to an empty list.
+        - choices (Optional[Sequence[str]]): If given, the allowed choice
+            keys: the text is the chosen one, and the `probabilities`
+            statistic holds the probability of each.
+
+        Returns:
+        - Result: The answer, with its `prompt_tokens`, `completion_tokens`
+            and the `num_ctx` it was generated with.
+        """
         chat = self._chat + chat
+        options: dict[str, Any] = self._options(chat)
+        schema: Optional[dict[str, Any]] = None
+        if choices is not None:
+            schema = choice_schema(choices)
+            # The object, its field name and the longest key, with some slack.
+            options = {
+                **options,
+                "num_predict": 16 + max(len(choice) for choice in choices),
+            }
+        elif self._stop:
+            options = {**options, "stop": self._stop}
         response: ChatResponse = self._client.chat(
-            model=self._model, messages=[message.to_dict() for message in chat]
+            model=self._model,
+            messages=[message.to_dict() for message in chat],
+            format=schema,
+            options=options,
+            keep_alive=self._keep_alive,
         )
-        if response.message.content is None:
-            return ""
-        if self._cleaner is not None:
-            return self._cleaner(response.message.content)
-        return response.message.content
+
+        stats: dict[str, Any] = {
+            "prompt_tokens": response.prompt_eval_count or 0,
+            "completion_tokens": response.eval_count or 0,
+            "num_ctx": options.get("num_ctx"),
+        }
+        content: str = response.message.content or ""
+        if choices is not None:
+            probabilities: dict[str, float] = one_hot(
+                parse_choice(content, choices), choices
+            )
+            stats["probabilities"] = probabilities
+            return Result(best_choice(probabilities), stats=stats)
+        if self._cleaner is not None and content:
+            content = self._cleaner(content)
+        return Result(content, stats=stats)
+
+    def warm_up(self) -> dict[str, Any]:
+        """
+        Loads the model into the server's memory, for `keep_alive`, so the
+        first chat does not wait for it.
+
+        An empty prompt loads the model without generating anything. It is
+        loaded with the context window sized for the system prompt, so the
+        chats fitting it do not reload the model.
+
+        Returns:
+        - dict[str, Any]: Whether the model is ready, the time to warm in
+            seconds, whether the server lists it as loaded, its context
+            window, expiry and memory, and, if not ready, the error.
+        """
+        start: float = time.perf_counter()
+        options: dict[str, Any] = self._options(self._chat)
+        try:
+            self._client.generate(
+                model=self._model,
+                prompt="",
+                options=options,
+                keep_alive=self._keep_alive,
+            )
+        except Exception as e:
+            return {
+                "ready": False,
+                "seconds": time.perf_counter() - start,
+                "error": str(e),
+            }
+        report: dict[str, Any] = {
+            "ready": True,
+            "seconds": time.perf_counter() - start,
+            "resident": False,
+            "num_ctx": options.get("num_ctx"),
+        }
+        try:
+            for model in self._client.ps().models:
+                if self._model in (model.model, model.name):
+                    report["resident"] = True
+                    report["expires_at"] = str(model.expires_at)
+                    report["size_vram"] = model.size_vram
+        except Exception:
+            # Listing the loaded models is informative only.
+            pass
+        return report
@@ -4,13 +4,20 @@ interface, which uses the OpenAI API to generate responses from a chat
 history.
 """
 
-from typing import Any, Optional, Callable, cast
+import math
+from typing import Any, Optional, Callable, Sequence, cast
 from openai.types.chat import ChatCompletion, ChatCompletionMessageParam
 import openai
-from .llm import LLM
+from graphygie.result import Result
+from .llm import LLM, best_choice, choice_schema, one_hot, parse_choice
 from .chat import Chat
 
 
+# The most likely first tokens requested when scoring choices (the maximum
+# of the OpenAI API).
+TOP_LOGPROBS: int = 20
+
+
 class OpenAI(LLM):
     """
     An implementation of the LLM interface using the OpenAI API.
@@ -28,6 +35,8 @@ class OpenAI(LLM):
         host: Optional[str] = None,
         cleaner: Optional[Callable[[str], str]] = None,
         model_params: Optional[dict[str, Any]] = None,
+        choice_params: Optional[dict[str, Any]] = None,
+        cleaner_stop: bool = False,
         **kwargs,
     ) -> None:
         """
@@ -43,6 +52,19 @@ class OpenAI(LLM):
             defaults are used.
         - cleaner (Optional[Callable[[str], str]]): A function to post-process
             the model's response.
+        - model_params (Optional[dict[str, Any]]): The parameters of each
+            completion (e.g., {"temperature": 0}).
+        - choice_params (Optional[dict[str, Any]]): The parameters added to
+            the completions choosing (see `choose`), e.g., to disable the
+            reasoning of a thinking model so the first token is the answer
+            (`{"extra_body": {"reasoning": {"enabled": False}}}` on
+            OpenRouter).
+        - cleaner_stop (bool, optional): Whether the stop sequences the
+            cleaner declares (its `stop` attribute, e.g., a double newline)
+            end the generation, unless the model parameters set their own.
+            They only keep the cleaned response unchanged when the prompt
+            makes the model answer as the cleaner expects (e.g., with the
+            code fence first). Defaults to False.
         """
 
         self._client: openai.OpenAI = openai.OpenAI(
@@ -52,18 +74,169 @@ class OpenAI(LLM):
         self._chat: Chat = chat
         self._cleaner: Optional[Callable[[str], str]] = cleaner
         self._model_params: Optional[dict[str, Any]] = model_params
+        self._choice_params: dict[str, Any] = dict(choice_params or {})
+        self._stop: list[str] = (
+            list(getattr(cleaner, "stop", ()))
+            if cleaner_stop and "stop" not in (model_params or {})
+            else []
+        )
 
     def chat(self, chat: Chat = list()) -> str:
-        chat = self._chat + chat
-        response: ChatCompletion = self._client.chat.completions.create(
+        return self.respond(chat).text
+
+    def choose(self, chat: Chat, choices: Sequence[str]) -> dict[str, float]:
+        """
+        Answers a chat with one of a few choices, scored by the probabilities
+        of the first generated token.
+
+        The probabilities of the keys among the most likely first tokens are
+        normalized over the choices (a single token is generated if every
+        key is one character, e.g., option letters). If the server returns no
+        log probabilities, or none of these tokens is a key, the chat is
+        answered again with a JSON schema restricting the answer to the
+        choices, which is then certain.
+
+        Parameters:
+        - chat (Chat): The list of chat messages used as input.
+        - choices (Sequence[str]): The allowed choice keys.
+
+        Returns:
+        - dict[str, float]: The probability of each choice, all 0.0 if the
+            answer selects none.
+        """
+        return dict(self.respond(chat, choices).stats["probabilities"])
+
+    def respond(
+        self, chat: Chat = list(), choices: Optional[Sequence[str]] = None
+    ) -> Result:
+        """
+        Answers a chat (or chooses, see `choose`) with the token usage
+        reported by the server.
+
+        Parameters:
+        - chat (Chat, optional): The list of chat messages used as input.
+            Defaults to an empty list.
+        - choices (Optional[Sequence[str]]): If given, the allowed choice
+            keys: the text is the most probable one, and the
+            `probabilities` statistic holds the probability of each.
+
+        Returns:
+        - Result: The answer, with its `prompt_tokens` and
+            `completion_tokens`.
+        """
+        if choices is not None:
+            return self._choose(self._chat + chat, choices)
+
+        params: dict[str, Any] = {"stop": self._stop} if self._stop else {}
+        response: ChatCompletion = self._create(self._chat + chat, **params)
+
+        stats: dict[str, Any] = _usage(response)
+        content: str = response.choices[0].message.content or ""
+        if self._cleaner is not None and content:
+            content = self._cleaner(content)
+        return Result(content, stats=stats)
+
+    def _choose(self, chat: Chat, choices: Sequence[str]) -> Result:
+        """
+        Chooses by the log probabilities of the first token, or else with a
+        JSON schema (see `choose`).
+
+        Parameters:
+        - chat (Chat): The complete list of messages, history included.
+        - choices (Sequence[str]): The allowed choice keys.
+
+        Returns:
+        - Result: The most probable choice, with the token usage of every
+            completion and the `probabilities` of the choices.
+        """
+        params: dict[str, Any] = {
+            **self._choice_params,
+            "logprobs": True,
+            "top_logprobs": TOP_LOGPROBS,
+        }
+        if all(len(choice) == 1 for choice in choices):
+            params["max_tokens"] = 1
+        response: ChatCompletion = self._create(chat, **params)
+        stats: dict[str, Any] = _usage(response)
+
+        probabilities: Optional[dict[str, float]] = _probabilities(
+            response, choices
+        )
+        if probabilities is None:
+            response = self._create(
+                chat,
+                **self._choice_params,
+                response_format={
+                    "type": "json_schema",
+                    "json_schema": {
+                        "name": "choice",
+                        "strict": True,
+                        "schema": choice_schema(choices),
+                    },
+                },
+            )
+            for key, value in _usage(response).items():
+                stats[key] += value
+            content: str = response.choices[0].message.content or ""
+            probabilities = one_hot(parse_choice(content, choices), choices)
+
+        stats["probabilities"] = probabilities
+        return Result(best_choice(probabilities), stats=stats)
+
+    def _create(self, chat: Chat, **params: Any) -> ChatCompletion:
+        """
+        Sends the full chat to the chat completions endpoint.
+
+        Parameters:
+        - chat (Chat): The complete list of messages, history included.
+        - **params: Parameters of this completion, overriding the model
+            parameters.
+
+        Returns:
+        - ChatCompletion: The raw completion returned by the server.
+        """
+        return self._client.chat.completions.create(
             model=self._model,
             messages=[
                 cast(ChatCompletionMessageParam, message.to_dict()) for message in chat
             ],
-            **(self._model_params or {}),
+            **{**(self._model_params or {}), **params},
         )
-        if response.choices[0].message.content is None:
-            return ""
-        if self._cleaner is not None:
-            return self._cleaner(response.choices[0].message.content)
-        return response.choices[0].message.content
+
+
+def _usage(response: ChatCompletion) -> dict[str, int]:
+    """Gets the token usage of a completion"""
+    usage = response.usage
+    return {
+        "prompt_tokens": usage.prompt_tokens if usage else 0,
+        "completion_tokens": usage.completion_tokens if usage else 0,
+    }
+
+
+def _probabilities(
+    response: ChatCompletion, choices: Sequence[str]
+) -> Optional[dict[str, float]]:
+    """
+    Scores the choices of a completion by the log probabilities of its first
+    token.
+
+    Parameters:
+    - response (ChatCompletion): The completion.
+    - choices (Sequence[str]): The allowed choice keys.
+
+    Returns:
+    - Optional[dict[str, float]]: The probability of each choice, or None if
+        there are no log probabilities or none of the top tokens is a key.
+    """
+    logprobs = response.choices[0].logprobs
+    if logprobs is not None and logprobs.content:
+        probabilities: dict[str, float] = {choice: 0.0 for choice in choices}
+        for top in logprobs.content[0].top_logprobs:
+            token: str = top.token.strip()
+            if token in probabilities:
+                # Variants of a key (e.g., "B" and " B") add up.
+                probabilities[token] += math.exp(top.logprob)
+        total: float = sum(probabilities.values())
+        if total > 0.0:
+            return {choice: p / total for choice, p in probabilities.items()}
+    return None
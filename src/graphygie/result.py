@@ -0,0 +1,67 @@
+"""
+This module defines the Result class, the immutable response of a pipeline
+stage (an LLM, a retriever, a generator or a database) to one request.
+"""
+
+from types import MappingProxyType
+from typing import Any, Mapping, Optional
+
+
+class Result:
+    """
+    The response to one request, with what it was produced from and the
+    statistics of its production.
+
+    Results are immutable and belong to their request, so one pipeline can
+    serve concurrent requests.
+
+    Attributes:
+    - _text (str): The response.
+    - _context (str): What the response was produced from: the generated
+        query of a retriever, the retrieved context of a generator.
+    - _stats (Mapping[str, Any]): The statistics (e.g., token usage, nodes,
+        stage timings in seconds).
+    """
+
+    __slots__ = ("_text", "_context", "_stats")
+
+    def __init__(
+        self,
+        text: str,
+        context: str = "",
+        stats: Optional[Mapping[str, Any]] = None,
+    ) -> None:
+        """
+        Initializes a result.
+
+        Parameters:
+        - text (str): The response.
+        - context (str, optional): What the response was produced from.
+            Defaults to "".
+        - stats (Optional[Mapping[str, Any]]): The statistics, copied.
+            Defaults to none.
+        """
+        self._text: str = text
+        self._context: str = context
+        self._stats: Mapping[str, Any] = MappingProxyType(dict(stats or {}))
+
+    @property
+    def text(self) -> str:
+        """Gets the response."""
+        return self._text
+
+    @property
+    def context(self) -> str:
+        """Gets what the response was produced from."""
+        return self._context
+
+    @property
+    def stats(self) -> Mapping[str, Any]:
+        """Gets the read-only statistics."""
+        return self._stats
+
+    def __repr__(self) -> str:
+        return (
+            f"Result(text={self._text!r}, context={self._context!r}, "
+            f"stats={dict(self._stats)!r})"
+        )
@@ -3,9 +3,42 @@ This module exposes the public interface for the database layer, including:
 
 - Database: Abstract base class defining the database interface.
 - Neo4j: Concrete implementation of the Database interface using Neo4j.
+- compute_centrality: Offline job writing a Graph Data Science centrality to
+    the concept nodes, ranking the relationships formatted by Neo4j.
+- IndexAdvisor: Index and constraint advisor driven by a query log.
+- QueryProfiler: Profiles a sample of the queries of Neo4j and aggregates
+    their result summary counters (e.g., the queries with the most db hits).
+
+Neo4j, compute_centrality, IndexAdvisor and QueryProfiler (and the neo4j
+driver) are imported on first access.
 """
 
+from typing import TYPE_CHECKING
+
+from graphygie._lazy import lazy_exports
 from .database import Database
-from .neo4j import Neo4j
 
-__all__: list[str] = ["Database", "Neo4j"]
+if TYPE_CHECKING:
+    from .neo4j import Neo4j
+    from .centrality import compute_centrality
+    from .indexes import IndexAdvisor
+    from .profiler import QueryProfiler
+
+
+__getattr__, __dir__ = lazy_exports(
+    __name__,
+    {
+        "Neo4j": ".neo4j",
+        "compute_centrality": ".centrality",
+        "IndexAdvisor": ".indexes",
+        "QueryProfiler": ".profiler",
+    },
+)
+
+__all__: list[str] = [
+    "Database",
+    "Neo4j",
+    "compute_centrality",
+    "IndexAdvisor",
+    "QueryProfiler",
+]
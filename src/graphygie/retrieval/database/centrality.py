@@ -0,0 +1,111 @@
+"""
+This module defines the compute_centrality function, an offline job writing a
+Graph Data Science centrality score to the concept nodes of a Neo4j database,
+used to rank retrieved relationships.
+"""
+
+from typing import Any, Literal, cast
+
+from neo4j import Driver, Query
+
+
+# The node property holding the centrality.
+CENTRALITY: str = "centrality"
+
+# The relationships between concepts the centrality is computed on.
+RELATIONSHIPS: tuple[str, ...] = ("PAR", "CHD", "SY", "RO")
+
+Algorithm = Literal["pagerank", "degree"]
+
+_WRITE_QUERIES: dict[Algorithm, str] = {
+    "pagerank": """
+        CALL gds.pageRank.write($graph, {
+            writeProperty: $property,
+            maxIterations: $iterations,
+            dampingFactor: 0.85
+        })
+        YIELD nodePropertiesWritten, ranIterations, didConverge
+        RETURN nodePropertiesWritten AS written, ranIterations AS iterations,
+            didConverge AS converged
+        """,
+    "degree": """
+        CALL gds.degree.write($graph, {writeProperty: $property})
+        YIELD nodePropertiesWritten
+        RETURN nodePropertiesWritten AS written
+        """,
+}
+
+
+def compute_centrality(
+    driver: Driver,
+    database: str,
+    algorithm: Algorithm = "pagerank",
+    property: str = CENTRALITY,
+    relationships: tuple[str, ...] = RELATIONSHIPS,
+    iterations: int = 20,
+    graph: str = "graphygie-centrality",
+) -> dict[str, Any]:
+    """
+    Computes the centrality of every concept with the Graph Data Science
+    plugin and writes it to the concept nodes.
+
+    The concepts and their relationships are projected in memory, scored,
+    and the projection is dropped. Scores only change with the graph, so the
+    job runs offline (e.g., after each import), and reading them back costs
+    nothing at query time: they come with the retrieved nodes.
+
+    Parameters:
+    - driver (Driver): The Neo4j driver.
+    - database (str): The name of the Neo4j database.
+    - algorithm (Algorithm, optional): "pagerank", or "degree" (faster, the
+        number of outgoing relationships). Defaults to "pagerank".
+    - property (str, optional): The node property written. Defaults to
+        CENTRALITY.
+    - relationships (tuple[str, ...], optional): The relationship types
+        projected. Defaults to RELATIONSHIPS.
+    - iterations (int, optional): The maximum number of PageRank iterations.
+        Defaults to 20.
+    - graph (str, optional): The name of the temporary in-memory projection.
+        Defaults to "graphygie-centrality".
+
+    Returns:
+    - dict[str, Any]: The projected nodes and relationships, the properties
+        written and, for PageRank, the iterations run and whether they
+        converged.
+
+    Raises:
+    - ValueError: If the algorithm is unknown.
+    """
+    if algorithm not in _WRITE_QUERIES:
+        raise ValueError(f"Unknown centrality algorithm '{algorithm}'.")
+
+    with driver.session(database=database) as session:
+        # A projection left over by an interrupted run would fail the new one.
+        session.run(
+            cast(Query, "CALL gds.graph.drop($graph, false) YIELD graphName"),
+            graph=graph,
+        ).consume()
+        projected = session.run(
+            cast(
+                Query,
+                "CALL gds.graph.project($graph, 'CUI', $relationships) "
+                "YIELD nodeCount, relationshipCount "
+                "RETURN nodeCount AS nodes, relationshipCount AS relationships",
+            ),
+            graph=graph,
+            relationships={type: {"orientation": "NATURAL"} for type in relationships},
+        ).single(strict=True)
+        try:
+            written = session.run(
+                cast(Query, _WRITE_QUERIES[algorithm]),
+                graph=graph,
+                property=property,
+                iterations=iterations,
+            ).single(strict=True)
+        finally:
+            session.run(
+                cast(Query, "CALL gds.graph.drop($graph, false) YIELD graphName"),
+                graph=graph,
+            ).consume()
+
+    return {"algorithm": algorithm, **projected.data(), **written.data()}
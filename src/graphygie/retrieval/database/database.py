@@ -3,6 +3,7 @@ This module defines the abstract interface for a Database.
 """
 
 from abc import ABC, abstractmethod
+from graphygie.result import Result
 
 
 class Database(ABC):
@@ -22,3 +23,19 @@ class Database(ABC):
         - str: The result of the query.
         """
         ...
+
+    def run(self, query: str) -> Result:
+        """
+        Executes a query with the statistics of this execution only, leaving
+        the instance unchanged, so it can serve concurrent queries.
+
+        Databases override it to report their statistics (e.g., the nodes
+        and edges retrieved). By default, there are none.
+
+        Parameters:
+        - query (str): The query to execute.
+
+        Returns:
+        - Result: The result of the query, with the query as context.
+        """
+        return Result(self.query(query), query)
@@ -0,0 +1,436 @@
+"""
+This module defines the index advisor of a Neo4j database: it finds the
+node properties the queries of a log filter on, proposes the range, text and
+vector indexes and uniqueness constraints they need, creates them, and
+compares the query plans before and after.
+"""
+
+import re
+from collections import Counter
+from typing import Any, Iterable, Literal, Optional, cast
+
+from neo4j import Driver, Query
+
+
+IndexKind = Literal["UNIQUE", "RANGE", "TEXT", "FULLTEXT", "VECTOR"]
+
+# How a property is filtered on, as found in a query.
+Usage = Literal["equality", "range", "prefix", "text", "function"]
+
+# The unique key of each label of the UMLS graph, proposed as a constraint
+# whether or not the queries use it.
+KEYS: dict[str, str] = {"CUI": "id", "AUI": "id", "SemanticType": "id"}
+
+# The index kinds serving each usage, best first. No index serves a function
+# of a property or a regular expression: a full-text index only helps once the
+# query is rewritten to call `db.index.fulltext.queryNodes`.
+_SERVES: dict[Usage, tuple[IndexKind, ...]] = {
+    "equality": ("UNIQUE", "RANGE", "TEXT"),
+    "range": ("UNIQUE", "RANGE"),
+    "prefix": ("UNIQUE", "RANGE", "TEXT"),
+    "text": ("TEXT",),
+    "function": (),
+}
+
+# The keywords that may precede a parenthesized predicate, not functions.
+_KEYWORDS: tuple[str, ...] = ("WHERE", "AND", "OR", "NOT", "XOR", "WITH")
+
+_NODE_RE = re.compile(r"\(\s*(\w+)\s*:\s*`?(\w+)`?[^)]*?(?:\{([^}]*)\})?\s*\)")
+_MAP_KEY_RE = re.compile(r"(\w+)\s*:")
+_PREDICATE_RE = re.compile(
+    rf"(?:\b(?!(?:{'|'.join(_KEYWORDS)})\b)(\w+)\s*\(\s*)?\b(\w+)\.(\w+)\s*\)?\s*"
+    r"(=~|<>|<=|>=|=|<|>|\bIN\b|\bCONTAINS\b|\bSTARTS\s+WITH\b|\bENDS\s+WITH\b)",
+    re.IGNORECASE,
+)
+_INDEX_DETAILS_RE = re.compile(
+    r"(RANGE|TEXT|POINT|VECTOR) INDEX \w+:(\w+)\(([\w, ]+)\)"
+)
+
+# The plan operators reading every node (of a label).
+SCANS: frozenset[str] = frozenset({"AllNodesScan", "NodeByLabelScan"})
+
+
+def _usage(operator: str, function: Optional[str]) -> Optional[Usage]:
+    operator = " ".join(operator.upper().split())
+    if operator == "<>":
+        return None
+    if function is not None or operator == "=~":
+        # E.g., toLower(n.name) = $x: no index can serve it.
+        return "function"
+    if operator in ("=", "IN"):
+        return "equality"
+    if operator == "STARTS WITH":
+        return "prefix"
+    if operator in ("CONTAINS", "ENDS WITH"):
+        return "text"
+    return "range"
+
+
+def property_usage(queries: Iterable[str]) -> Counter[tuple[str, str, Usage]]:
+    """
+    Counts how the queries filter on node properties.
+
+    Variables are resolved to the first label they are given in the query
+    (e.g., `(c:CUI)`); predicates on variables without label are ignored.
+
+    Parameters:
+    - queries (Iterable[str]): The Cypher queries.
+
+    Returns:
+    - Counter[tuple[str, str, Usage]]: The number of queries filtering on each
+        (label, property, usage).
+    """
+    usage: Counter[tuple[str, str, Usage]] = Counter()
+    for query in queries:
+        labels: dict[str, str] = {}
+        found: set[tuple[str, str, Usage]] = set()
+        for variable, label, properties in _NODE_RE.findall(query):
+            labels.setdefault(variable, label)
+            for property in _MAP_KEY_RE.findall(properties):
+                found.add((label, property, "equality"))
+        for function, variable, property, operator in _PREDICATE_RE.findall(query):
+            kind: Optional[Usage] = _usage(operator, function or None)
+            if variable in labels and kind is not None:
+                found.add((labels[variable], property, kind))
+        usage.update(found)
+    return usage
+
+
+class IndexSpec:
+    """
+    An index or uniqueness constraint on node properties.
+
+    Attributes:
+    - kind (IndexKind): The kind of index.
+    - label (str): The label of the nodes.
+    - properties (tuple[str, ...]): The indexed properties.
+    - reason (str): Why it is proposed.
+    - options (dict[str, Any]): The index options (e.g., of a vector index).
+    """
+
+    def __init__(
+        self,
+        kind: IndexKind,
+        label: str,
+        properties: tuple[str, ...],
+        reason: str = "",
+        options: Optional[dict[str, Any]] = None,
+    ) -> None:
+        self.kind: IndexKind = kind
+        self.label: str = label
+        self.properties: tuple[str, ...] = properties
+        self.reason: str = reason
+        self.options: dict[str, Any] = options or {}
+
+    @property
+    def name(self) -> str:
+        """Gets the name of the index (e.g., "cui_name_text")"""
+        return "_".join([self.label, *self.properties, self.kind]).lower()
+
+    def covers(self, kind: IndexKind, label: str, property: str) -> bool:
+        """
+        Checks whether this index serves the lookups of another kind of index.
+
+        Parameters:
+        - kind (IndexKind): The kind of the other index.
+        - label (str): Its label.
+        - property (str): Its (first) property.
+
+        Returns:
+        - bool: Whether this index makes the other one redundant.
+        """
+        if label != self.label or property != self.properties[0]:
+            return False
+        if kind == "FULLTEXT":
+            return self.kind == "FULLTEXT" and property in self.properties
+        if kind == "RANGE":
+            return self.kind in ("RANGE", "UNIQUE")
+        return self.kind == kind
+
+    def cypher(self) -> str:
+        """
+        Builds the statement creating the index, idempotently.
+
+        Labels and property names are interpolated and must come from the
+        schema or trusted configuration.
+
+        Returns:
+        - str: The Cypher statement.
+        """
+        on: str = ", ".join(f"n.{property}" for property in self.properties)
+        if self.kind == "UNIQUE":
+            return (
+                f"CREATE CONSTRAINT {self.name} IF NOT EXISTS "
+                f"FOR (n:{self.label}) REQUIRE ({on}) IS UNIQUE"
+            )
+        if self.kind == "FULLTEXT":
+            return (
+                f"CREATE FULLTEXT INDEX {self.name} IF NOT EXISTS "
+                f"FOR (n:{self.label}) ON EACH [{on}]"
+            )
+        statement: str = (
+            f"CREATE {self.kind} INDEX {self.name} IF NOT EXISTS "
+            f"FOR (n:{self.label}) ON ({on})"
+        )
+        if self.kind == "VECTOR":
+            config: str = ", ".join(
+                f"`{key}`: {value!r}" for key, value in self.options.items()
+            )
+            statement += f" OPTIONS {{indexConfig: {{{config}}}}}"
+        return statement
+
+
+def advise(
+    usage: Counter[tuple[str, str, Usage]],
+    existing: list[IndexSpec],
+    keys: Optional[dict[str, str]] = None,
+) -> list[IndexSpec]:
+    """
+    Proposes the indexes serving the filters of a query log that no existing
+    index serves.
+
+    Filters no index can serve are not proposed an index (see
+    `unindexable`).
+
+    Parameters:
+    - usage (Counter[tuple[str, str, Usage]]): The filters of the queries
+        (see `property_usage`).
+    - existing (list[IndexSpec]): The indexes and constraints of the database.
+    - keys (Optional[dict[str, str]]): The unique key of each label, proposed
+        as a uniqueness constraint. Defaults to KEYS.
+
+    Returns:
+    - list[IndexSpec]: The proposed indexes, most used first.
+    """
+    keys = KEYS if keys is None else keys
+    proposals: list[IndexSpec] = []
+
+    def covered(kind: IndexKind, label: str, property: str) -> bool:
+        return any(
+            index.covers(kind, label, property) for index in existing + proposals
+        )
+
+    for label, key in keys.items():
+        if not covered("UNIQUE", label, key) and not covered("RANGE", label, key):
+            proposals.append(IndexSpec("UNIQUE", label, (key,), "unique key"))
+
+    for (label, property, kind), count in usage.most_common():
+        if not _SERVES[kind]:
+            continue
+        best: IndexKind = _SERVES[kind][0]
+        if best == "UNIQUE" and keys.get(label) != property:
+            best = "RANGE"
+        if any(covered(serving, label, property) for serving in _SERVES[kind]):
+            continue
+        proposals.append(
+            IndexSpec(best, label, (property,), f"{kind} filter in {count} queries")
+        )
+    return proposals
+
+
+def unindexable(
+    usage: Counter[tuple[str, str, Usage]],
+) -> Counter[tuple[str, str]]:
+    """
+    Counts the filters no index can serve: functions of a property (e.g.,
+    `toLower(n.name) = $x`) and regular expressions. The queries must be
+    rewritten (e.g., to call `db.index.fulltext.queryNodes` on a full-text
+    index) to stop scanning the nodes of the label.
+
+    Parameters:
+    - usage (Counter[tuple[str, str, Usage]]): The filters of the queries
+        (see `property_usage`).
+
+    Returns:
+    - Counter[tuple[str, str]]: The number of queries filtering on each
+        (label, property) without an index.
+    """
+    return Counter(
+        {
+            (label, property): count
+            for (label, property, kind), count in usage.items()
+            if not _SERVES[kind]
+        }
+    )
+
+
+def plan_summary(plan: Optional[dict[str, Any]]) -> dict[str, Any]:
+    """
+    Summarizes a query plan.
+
+    Parameters:
+    - plan (Optional[dict[str, Any]]): The plan of an EXPLAIN or PROFILE
+        result summary.
+
+    Returns:
+    - dict[str, Any]: The operators (depth first), the indexes used as
+        (kind, label, properties) triples, the number of scans of all the
+        nodes of a label, and the estimated rows of the root.
+    """
+    operators: list[str] = []
+    indexes: list[tuple[str, str, tuple[str, ...]]] = []
+    stack: list[dict[str, Any]] = [plan] if plan else []
+    while stack:
+        node: dict[str, Any] = stack.pop()
+        operator: str = node.get("operatorType", "").split("@")[0]
+        operators.append(operator)
+        details: str = str(node.get("args", {}).get("Details", ""))
+        for kind, label, properties in _INDEX_DETAILS_RE.findall(details):
+            indexes.append(
+                (kind, label, tuple(p.strip() for p in properties.split(",")))
+            )
+        if "Fulltext" in operator or "fulltext" in details:
+            indexes.append(("FULLTEXT", "", ()))
+        stack.extend(reversed(node.get("children", [])))
+    return {
+        "operators": operators,
+        "indexes": indexes,
+        "scans": sum(operator in SCANS for operator in operators),
+        "rows": float((plan or {}).get("args", {}).get("EstimatedRows", 0.0)),
+    }
+
+
+class IndexAdvisor:
+    """
+    Inspects and bootstraps the indexes of a Neo4j database from a query log.
+
+    Attributes:
+    - _driver (Driver): The Neo4j driver.
+    - _database (str): The name of the Neo4j database.
+    """
+
+    def __init__(self, driver: Driver, database: str) -> None:
+        """
+        Initializes the advisor.
+
+        Parameters:
+        - driver (Driver): The Neo4j driver.
+        - database (str): The name of the Neo4j database.
+        """
+        self._driver: Driver = driver
+        self._database: str = database
+
+    def existing(self) -> list[IndexSpec]:
+        """
+        Lists the node indexes and uniqueness constraints of the database.
+
+        Returns:
+        - list[IndexSpec]: The indexes, named as in the database.
+        """
+        specs: list[IndexSpec] = []
+        with self._driver.session(database=self._database) as session:
+            for record in session.run(
+                "SHOW INDEXES YIELD name, type, entityType, labelsOrTypes, "
+                "properties, owningConstraint "
+                "WHERE entityType = 'NODE' AND labelsOrTypes IS NOT NULL"
+            ):
+                kind: str = (
+                    "UNIQUE" if record["owningConstraint"] else record["type"]
+                )
+                if kind not in ("UNIQUE", "RANGE", "TEXT", "FULLTEXT", "VECTOR"):
+                    continue
+                for label in record["labelsOrTypes"]:
+                    specs.append(
+                        IndexSpec(
+                            cast(IndexKind, kind),
+                            label,
+                            tuple(record["properties"]),
+                            record["name"],
+                        )
+                    )
+        return specs
+
+    def read_counts(self) -> dict[str, int]:
+        """
+        Gets the number of reads of each index since the database started.
+
+        Returns:
+        - dict[str, int]: The read count of each index, by name.
+        """
+        with self._driver.session(database=self._database) as session:
+            return {
+                record["name"]: record["readCount"] or 0
+                for record in session.run("SHOW INDEXES YIELD name, readCount")
+            }
+
+    def vector(
+        self, label: str = "CUI", property: str = "embedding"
+    ) -> Optional[IndexSpec]:
+        """
+        Proposes a cosine vector index if the nodes of a label hold
+        embeddings.
+
+        Parameters:
+        - label (str, optional): The label of the nodes. Defaults to "CUI".
+        - property (str, optional): The property holding the embedding.
+            Defaults to "embedding".
+
+        Returns:
+        - Optional[IndexSpec]: The vector index, or None if no node of the
+            label has an embedding.
+        """
+        with self._driver.session(database=self._database) as session:
+            record = session.run(
+                cast(
+                    Query,
+                    f"MATCH (n:{label}) WHERE n.{property} IS NOT NULL "
+                    f"RETURN size(n.{property}) AS dim LIMIT 1",
+                )
+            ).single()
+        if record is None:
+            return None
+        return IndexSpec(
+            "VECTOR",
+            label,
+            (property,),
+            "embeddings",
+            {
+                "vector.dimensions": record["dim"],
+                "vector.similarity_function": "cosine",
+            },
+        )
+
+    def explain(self, query: str) -> dict[str, Any]:
+        """
+        Plans a query without running it.
+
+        Parameters:
+        - query (str): The Cypher query.
+
+        Returns:
+        - dict[str, Any]: The summary of its plan (see `plan_summary`), or the
+            error if it cannot be planned.
+        """
+        try:
+            with self._driver.session(database=self._database) as session:
+                summary = session.run(cast(Query, f"EXPLAIN {query}")).consume()
+            return plan_summary(summary.plan)
+        except Exception as e:
+            return {"error": str(e)}
+
+    def create(self, specs: Iterable[IndexSpec], timeout: int = 3600) -> list[str]:
+        """
+        Creates indexes and constraints, then waits until they are online.
+
+        A constraint violated by the data is reported, not raised, so the
+        other indexes are still created.
+
+        Parameters:
+        - specs (Iterable[IndexSpec]): The indexes.
+        - timeout (int, optional): The maximum wait, in seconds. Defaults to
+            3600.
+
+        Returns:
+        - list[str]: The errors, one per index that could not be created.
+        """
+        errors: list[str] = []
+        with self._driver.session(database=self._database) as session:
+            for spec in specs:
+                try:
+                    session.run(cast(Query, spec.cypher())).consume()
+                except Exception as e:
+                    errors.append(f"{spec.name}: {e}")
+            session.run(
+                cast(Query, "CALL db.awaitIndexes($timeout)"), timeout=timeout
+            ).consume()
+        return errors
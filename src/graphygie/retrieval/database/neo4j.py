@@ -4,10 +4,188 @@ interface that connects to a Neo4j graph database and formats query results as
 readable text.
 """
 
+from .centrality import CENTRALITY
 from .database import Database
-from neo4j import Driver, GraphDatabase, Query, Result
+from .profiler import QueryProfiler, profile_query
+from graphygie.result import Result
+from neo4j import Driver, GraphDatabase, Query, Result as Records
+from neo4j.exceptions import Neo4jError
 from neo4j.graph import Graph
-from typing import cast
+from typing import Any, Optional, Sequence, cast
+import time
+
+
+# The relationships formatted by default, the most central ones: fewer than
+# the rows the generated queries are limited to (e.g., `LIMIT 250`), so the
+# centrality prunes the context instead of only reordering it.
+MAX_RELATIONSHIPS: int = 100
+
+
+def format_graph(
+    graph: Graph, score: Optional[str] = None, limit: Optional[int] = None
+) -> str:
+    """
+    Formats the relationships of a result graph as one
+    `<start> -[<type>]-> <end>.` line each.
+
+    Nodes are named after their `name` property, then their `title` property,
+    then their internal id.
+
+    Parameters:
+    - graph (Graph): The graph of a query result.
+    - score (Optional[str]): The node property holding a precomputed
+        centrality (see `compute_centrality`). If given, relationships are
+        ordered by the summed score of their nodes, highest first (nodes
+        without score count as 0, ties keep the result order). If None,
+        relationships keep the result order.
+    - limit (Optional[int]): The maximum number of relationships formatted,
+        after ordering. If None, all of them are.
+
+    Returns:
+    - str: The textual relationships, separated by newlines.
+    """
+    node_labels: dict[int, str] = {}
+    node_scores: dict[int, float] = {}
+    for node in graph.nodes:
+        name = node.get("name") or node.get("title") or f"Node_{node.id}"
+        node_labels[node.id] = name
+        if score is not None:
+            node_scores[node.id] = node.get(score) or 0.0
+
+    relationships = list(graph.relationships)
+    if score is not None:
+
+        def rank(rel) -> float:
+            start, end = rel.start_node, rel.end_node
+            return -(
+                (node_scores[start.id] if start is not None else 0.0)
+                + (node_scores[end.id] if end is not None else 0.0)
+            )
+
+        relationships.sort(key=rank)
+    if limit is not None:
+        relationships = relationships[:limit]
+
+    textual_rels: list[str] = []
+    for rel in relationships:
+        if rel.start_node is None:
+            start = "<empty>"
+        else:
+            start = node_labels[rel.start_node.id]
+        if rel.end_node is None:
+            end = "<empty>"
+        else:
+            end = node_labels[rel.end_node.id]
+        rel_type = rel.type
+        textual_rels.append(f"{start} -[{rel_type}]-> {end}.")
+
+    return "\n".join(textual_rels)
+
+
+def graph_data(graph: Graph) -> dict[str, Any]:
+    """
+    Converts a result graph to JSON-serializable data, formatted again by
+    `format_graph_data` (e.g., when a cassette replays it).
+
+    List properties (e.g., embeddings) are left out, as no formatting uses
+    them.
+
+    Parameters:
+    - graph (Graph): The graph of a query result.
+
+    Returns:
+    - dict[str, Any]: The `nodes`, as their id and scalar properties, and
+        the `relationships`, as [start id, type, end id] triples (ids are
+        None for missing nodes), in the result order.
+    """
+    return {
+        "nodes": [
+            {
+                "id": node.id,
+                "properties": {
+                    key: value
+                    for key, value in node.items()
+                    if not isinstance(value, list)
+                },
+            }
+            for node in graph.nodes
+        ],
+        "relationships": [
+            [
+                rel.start_node.id if rel.start_node is not None else None,
+                rel.type,
+                rel.end_node.id if rel.end_node is not None else None,
+            ]
+            for rel in graph.relationships
+        ],
+    }
+
+
+def format_graph_data(
+    data: dict[str, Any], score: Optional[str] = None, limit: Optional[int] = None
+) -> str:
+    """
+    Formats the relationships of a graph converted by `graph_data`, exactly
+    as `format_graph` formats the graph.
+
+    Parameters:
+    - data (dict[str, Any]): The converted graph.
+    - score (Optional[str]): The node property ordering the relationships
+        (see `format_graph`).
+    - limit (Optional[int]): The maximum number of relationships formatted
+        (see `format_graph`).
+
+    Returns:
+    - str: The textual relationships, separated by newlines.
+    """
+    nodes: dict[int, _RecordedNode] = {
+        node["id"]: _RecordedNode(node["id"], node["properties"])
+        for node in data["nodes"]
+    }
+    relationships: list[_RecordedRelationship] = [
+        _RecordedRelationship(nodes.get(start), type, nodes.get(end))
+        for start, type, end in data["relationships"]
+    ]
+    return format_graph(
+        cast(Graph, _RecordedGraph(list(nodes.values()), relationships)),
+        score,
+        limit,
+    )
+
+
+class _RecordedNode:
+    """A node of a converted graph, with the members used by the formatter."""
+
+    def __init__(self, id: int, properties: dict[str, Any]) -> None:
+        self.id: int = id
+        self._properties: dict[str, Any] = properties
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self._properties.get(key, default)
+
+
+class _RecordedRelationship:
+    """A relationship of a converted graph."""
+
+    def __init__(
+        self,
+        start_node: Optional[_RecordedNode],
+        type: str,
+        end_node: Optional[_RecordedNode],
+    ) -> None:
+        self.start_node: Optional[_RecordedNode] = start_node
+        self.type: str = type
+        self.end_node: Optional[_RecordedNode] = end_node
+
+
+class _RecordedGraph:
+    """A converted graph, with its `nodes` and `relationships`."""
+
+    def __init__(
+        self, nodes: list[_RecordedNode], relationships: list[_RecordedRelationship]
+    ) -> None:
+        self.nodes: list[_RecordedNode] = nodes
+        self.relationships: list[_RecordedRelationship] = relationships
 
 
 class Neo4j(Database):
@@ -15,10 +193,20 @@ class Neo4j(Database):
     A Neo4j database implementation of the Database interface.
 
     Connects to a Neo4j instance and runs Cypher queries,
-    returning the results in a human-readable format.
+    returning the results in a human-readable format, most central
+    relationships first when the nodes hold a precomputed centrality.
     """
 
-    def __init__(self, uri: str, username: str, password: str, database: str) -> None:
+    def __init__(
+        self,
+        uri: str,
+        username: str,
+        password: str,
+        database: str,
+        score: Optional[str] = CENTRALITY,
+        max_relationships: Optional[int] = MAX_RELATIONSHIPS,
+        profiler: Optional[QueryProfiler] = None,
+    ) -> None:
         """
         Initializes the Neo4j driver.
 
@@ -28,37 +216,177 @@ class Neo4j(Database):
         - username (str): Username for authentication.
         - password (str): Password for authentication.
         - database (str): The name of the Neo4j database to connect to.
+        - score (Optional[str], optional): The node property ordering the
+            formatted relationships. Defaults to CENTRALITY, written by
+            `compute_centrality`. If None, the result order is kept.
+        - max_relationships (Optional[int], optional): The maximum number of
+            relationships formatted, the most central ones (the first ones of
+            the result without score). Defaults to MAX_RELATIONSHIPS. If None,
+            all of them are.
+        - profiler (Optional[QueryProfiler]): The profiler of a sample of the
+            queries, which may be shared between databases. If None, no query
+            is profiled.
         """
 
         self.driver: Driver = GraphDatabase.driver(uri, auth=(username, password))
         self.database: str = database
+        self.score: Optional[str] = score
+        self.max_relationships: Optional[int] = max_relationships
+        self.profiler: Optional[QueryProfiler] = profiler
 
     def query(self, query: str) -> str:
+        return self.run(query).text
+
+    def run(self, query: str) -> Result:
+        """
+        Executes a query with its statistics.
+
+        Parameters:
+        - query (str): The Cypher query.
+
+        Returns:
+        - Result: The formatted relationships, with the query as context, and
+            the statistics of `fetch`.
+        """
+        data, stats = self.fetch(query)
+        return Result(self.format(data), query, stats)
+
+    def format(self, data: dict[str, Any]) -> str:
+        """
+        Formats a result graph with the settings of this database.
+
+        Parameters:
+        - data (dict[str, Any]): The graph converted by `graph_data`.
+
+        Returns:
+        - str: The formatted relationships (see `format_graph`).
+        """
+        return format_graph_data(data, self.score, self.max_relationships)
+
+    def fetch(self, query: str) -> tuple[dict[str, Any], dict[str, Any]]:
+        """
+        Executes a query without formatting its result, so it can be
+        recorded and formatted later (see `format`).
+
+        Parameters:
+        - query (str): The Cypher query.
+
+        Returns:
+        - tuple[dict[str, Any], dict[str, Any]]: The result graph converted
+            by `graph_data`, and its statistics: the `nodes` and `edges` of
+            the graph, the milliseconds until the first record was
+            `available_after` and the last one `consumed_after` and, if the
+            query was profiled, its `db_hits`, `page_cache_hits` and
+            `page_cache_misses`.
+        """
+        # Sampled queries run with PROFILE; the others run unchanged.
+        profiler: Optional[QueryProfiler] = (
+            self.profiler
+            if self.profiler is not None and self.profiler.sample()
+            else None
+        )
         self.driver.verify_connectivity()
         with self.driver.session(database=self.database) as session:
-            result: Result = session.run(cast(Query, query))
-
-            graph: Graph = result.graph()
-
-            node_labels: dict[int, str] = {}
-            for node in graph.nodes:
-                name = node.get("name") or node.get("title") or f"Node_{node.id}"
-                node_labels[node.id] = name
-
-            textual_rels: list[str] = []
-            for rel in graph.relationships:
-                if rel.start_node is None:
-                    start = "<empty>"
-                else:
-                    start = node_labels[rel.start_node.id]
-                if rel.end_node is None:
-                    end = "<empty>"
-                else:
-                    end = node_labels[rel.end_node.id]
-                rel_type = rel.type
-                textual_rels.append(f"{start} -[{rel_type}]-> {end}.")
-
-            return "\n".join(textual_rels)
+            records: Records = session.run(
+                cast(Query, query if profiler is None else profile_query(query))
+            )
+
+            graph: Graph = records.graph()
+            data: dict[str, Any] = graph_data(graph)
+            summary = records.consume()
+
+        stats: dict[str, Any] = {
+            "nodes": len(graph.nodes),
+            "edges": len(graph.relationships),
+            "available_after": summary.result_available_after or 0,
+            "consumed_after": summary.result_consumed_after or 0,
+        }
+        if profiler is not None:
+            profile: dict[str, Any] = profiler.record(query, summary)
+            for key in ("db_hits", "page_cache_hits", "page_cache_misses"):
+                stats[key] = profile[key]
+        return (data, stats)
+
+    def warm_up(
+        self,
+        labels: Sequence[str] = ("CUI", "SemanticType"),
+        queries: Sequence[str] = (),
+        apoc: bool = True,
+    ) -> dict[str, Any]:
+        """
+        Loads the graph into the page cache, so the first queries after a
+        start do not read it from disk.
+
+        The store is warmed with `apoc.warmup.run` when APOC provides it;
+        otherwise every node of the labels, with its properties and outgoing
+        relationships, is read once. The representative queries are then run
+        (e.g., recorded generated queries), which also warms the indexes they
+        use and the query plan cache.
+
+        Parameters:
+        - labels (Sequence[str], optional): The labels read without APOC.
+            Defaults to ("CUI", "SemanticType").
+        - queries (Sequence[str], optional): Representative queries to run.
+            Defaults to none.
+        - apoc (bool, optional): Whether to try `apoc.warmup.run` first.
+            Defaults to True.
+
+        Returns:
+        - dict[str, Any]: Whether the database is ready, the time to warm in
+            seconds, the method used ("apoc" or "queries"), the seconds of
+            each step and, if not ready, the error.
+        """
+        start: float = time.perf_counter()
+        steps: dict[str, float] = {}
+        method: str = "queries"
+        try:
+            self.driver.verify_connectivity()
+            with self.driver.session(database=self.database) as session:
+                if apoc:
+                    step: float = time.perf_counter()
+                    try:
+                        session.run("CALL apoc.warmup.run(true, true, true)").consume()
+                        method = "apoc"
+                        steps["apoc.warmup.run"] = time.perf_counter() - step
+                    except Neo4jError:
+                        # APOC is not installed, or does not provide it.
+                        pass
+                if method == "queries":
+                    for label in labels:
+                        step = time.perf_counter()
+                        session.run(
+                            cast(
+                                Query,
+                                f"MATCH (n:{label}) "
+                                "RETURN sum(size(keys(properties(n)))) AS properties",
+                            )
+                        ).consume()
+                        session.run(
+                            cast(
+                                Query,
+                                f"MATCH (:{label})-[r]->() "
+                                "RETURN count(DISTINCT type(r)) AS types",
+                            )
+                        ).consume()
+                        steps[label] = time.perf_counter() - step
+                for i, query in enumerate(queries):
+                    step = time.perf_counter()
+                    session.run(cast(Query, query)).consume()
+                    steps[f"query {i}"] = time.perf_counter() - step
+        except Exception as e:
+            return {
+                "ready": False,
+                "seconds": time.perf_counter() - start,
+                "method": method,
+                "steps": steps,
+                "error": str(e),
+            }
+        return {
+            "ready": True,
+            "seconds": time.perf_counter() - start,
+            "method": method,
+            "steps": steps,
+        }
 
     def __del__(self) -> None:
         """
@@ -0,0 +1,203 @@
+"""
+This module defines the QueryProfiler class, which samples a fraction of the
+queries run by a Neo4j database, runs them with `PROFILE`, and aggregates the
+counters of their result summaries (server timings, db hits, page cache use
+and plan), keeping the most expensive queries.
+"""
+
+import random
+import threading
+from typing import Any, Literal, Optional
+
+from .indexes import plan_summary
+
+
+# The rankings of the most expensive queries.
+Ranking = Literal["db_hits", "time"]
+
+_PREFIXES: tuple[str, ...] = ("PROFILE", "EXPLAIN")
+
+
+def profile_query(query: str) -> str:
+    """
+    Prefixes a query with `PROFILE`, unless it is already profiled or
+    explained.
+
+    Parameters:
+    - query (str): The Cypher query.
+
+    Returns:
+    - str: The profiled query.
+    """
+    head: str = query.lstrip()[:7].upper()
+    if any(head.startswith(prefix) for prefix in _PREFIXES):
+        return query
+    return f"PROFILE {query}"
+
+
+def profile_summary(query: str, summary: Any) -> dict[str, Any]:
+    """
+    Extracts the counters of a result summary.
+
+    Parameters:
+    - query (str): The query, without the `PROFILE` prefix.
+    - summary (Any): The `ResultSummary` of the consumed result.
+
+    Returns:
+    - dict[str, Any]: The query, the milliseconds until the first record was
+        available and until the last one was consumed, the db hits and page
+        cache hits and misses summed over the profiled plan (0 if the query
+        was not profiled), and the plan summary (see `plan_summary`).
+    """
+    profile: Optional[dict[str, Any]] = summary.profile
+    counters: dict[str, int] = {
+        "db_hits": 0,
+        "page_cache_hits": 0,
+        "page_cache_misses": 0,
+    }
+    stack: list[dict[str, Any]] = [profile] if profile else []
+    while stack:
+        node: dict[str, Any] = stack.pop()
+        counters["db_hits"] += node.get("dbHits", 0)
+        counters["page_cache_hits"] += node.get("pageCacheHits", 0)
+        counters["page_cache_misses"] += node.get("pageCacheMisses", 0)
+        stack.extend(node.get("children", []))
+    return {
+        "query": query,
+        "available_after": summary.result_available_after or 0,
+        "consumed_after": summary.result_consumed_after or 0,
+        **counters,
+        **plan_summary(profile or summary.plan),
+    }
+
+
+class QueryProfiler:
+    """
+    Profiles a sample of the queries of one or more databases, from any
+    number of threads.
+
+    Unsampled queries run unchanged: the only cost is drawing the sample.
+
+    Attributes:
+    - sample_rate (float): The fraction of the queries profiled.
+    - top (int): The number of most expensive queries kept per ranking.
+    - _random (random.Random): The sampling generator.
+    - _lock (threading.Lock): Guards the aggregates.
+    - _totals (dict[str, int]): The counters summed over the profiled
+        queries.
+    - _slowest (dict[Ranking, list[dict[str, Any]]]): The most expensive
+        distinct queries of each ranking, most expensive first.
+    """
+
+    def __init__(
+        self, sample_rate: float = 1.0, top: int = 10, seed: Optional[int] = None
+    ) -> None:
+        """
+        Initializes the profiler.
+
+        Parameters:
+        - sample_rate (float, optional): The fraction of the queries
+            profiled, between 0 and 1. Defaults to 1.0.
+        - top (int, optional): The number of most expensive queries kept per
+            ranking. Defaults to 10.
+        - seed (Optional[int], optional): The seed of the sampling. Defaults
+            to None.
+        """
+        if not 0.0 <= sample_rate <= 1.0:
+            raise ValueError(f"The sample rate must be in [0, 1]: {sample_rate}")
+        self.sample_rate: float = sample_rate
+        self.top: int = top
+        self._random: random.Random = random.Random(seed)
+        self._lock: threading.Lock = threading.Lock()
+        self._totals: dict[str, int] = {}
+        self._slowest: dict[Ranking, list[dict[str, Any]]] = {}
+        self.reset()
+
+    def sample(self) -> bool:
+        """Draws whether the next query is profiled"""
+        return self.sample_rate >= 1.0 or (
+            self.sample_rate > 0.0 and self._random.random() < self.sample_rate
+        )
+
+    def record(self, query: str, summary: Any) -> dict[str, Any]:
+        """
+        Aggregates the result summary of a profiled query.
+
+        Parameters:
+        - query (str): The query, without the `PROFILE` prefix.
+        - summary (Any): The `ResultSummary` of the consumed result.
+
+        Returns:
+        - dict[str, Any]: The profile of the query (see `profile_summary`).
+        """
+        profile: dict[str, Any] = profile_summary(query, summary)
+        with self._lock:
+            self._totals["queries"] += 1
+            for key in self._totals:
+                if key != "queries":
+                    self._totals[key] += profile[key]
+            for ranking, ranked in self._slowest.items():
+                self._rank(ranking, ranked, profile)
+        return profile
+
+    def _rank(
+        self, ranking: Ranking, ranked: list[dict[str, Any]], profile: dict[str, Any]
+    ) -> None:
+        """Inserts a profile in a ranking, keeping the worst run of a query"""
+        cost: int = _cost(ranking, profile)
+        for i, other in enumerate(ranked):
+            if other["query"] == profile["query"]:
+                if cost <= _cost(ranking, other):
+                    return
+                del ranked[i]
+                break
+        ranked.append(profile)
+        ranked.sort(key=lambda other: _cost(ranking, other), reverse=True)
+        del ranked[self.top :]
+
+    def slowest(self, by: Ranking = "db_hits") -> list[dict[str, Any]]:
+        """
+        Gets the most expensive distinct queries profiled.
+
+        Parameters:
+        - by (Ranking, optional): The ranking, "db_hits" or "time" (the
+            milliseconds until the result was consumed). Defaults to
+            "db_hits".
+
+        Returns:
+        - list[dict[str, Any]]: The profiles of the worst run of each query
+            (see `profile_summary`), most expensive first.
+        """
+        with self._lock:
+            return list(self._slowest[by])
+
+    @property
+    def info(self) -> dict[str, int | float]:
+        """Returns the number of profiled queries and their mean counters"""
+        with self._lock:
+            totals: dict[str, int] = dict(self._totals)
+        count: int = totals.pop("queries")
+        return {
+            "queries": count,
+            **{f"mean_{key}": value / max(count, 1) for key, value in totals.items()},
+        }
+
+    def reset(self) -> None:
+        """Clears the aggregates"""
+        with self._lock:
+            self._totals = {
+                "queries": 0,
+                "available_after": 0,
+                "consumed_after": 0,
+                "db_hits": 0,
+                "page_cache_hits": 0,
+                "page_cache_misses": 0,
+            }
+            self._slowest = {"db_hits": [], "time": []}
+
+
+def _cost(ranking: Ranking, profile: dict[str, Any]) -> int:
+    """Gets the cost of a profile in a ranking"""
+    if ranking == "db_hits":
+        return profile["db_hits"]
+    return profile["available_after"] + profile["consumed_after"]
@@ -8,8 +8,11 @@ database.
 
 from graphygie.llm import LLM
 from graphygie.llm.chat import Chat
+from graphygie.result import Result
 from .database import Database
+from typing import Optional, Sequence
 import logging
+import time
 
 
 class Graph(LLM):
@@ -34,12 +37,44 @@ class Graph(LLM):
         self._database: Database = database
 
     def chat(self, chat: Chat = list()) -> str:
+        return self.respond(chat).text
+
+    def respond(
+        self, chat: Chat = list(), choices: Optional[Sequence[str]] = None
+    ) -> Result:
+        """
+        Retrieves the result of the query generated from a chat.
+
+        Parameters:
+        - chat (Chat, optional): The list of chat messages used as input.
+            Defaults to an empty list.
+        - choices (Optional[Sequence[str]]): Ignored: a retriever does not
+            choose.
+
+        Returns:
+        - Result: The result of the query, with the query as context, the
+            statistics of the database and those of the LLM (prefixed with
+            `query_`), and the `query_time` and `database_time` in seconds.
+        """
         logger: logging.Logger = logging.getLogger(__name__)
 
-        query: str = self._llm.chat(chat)
+        start: float = time.perf_counter()
+        generated: Result = self._llm.respond(chat)
+        query_time: float = time.perf_counter() - start
 
-        logger.info(query)
+        logger.info(generated.text)
 
-        result: str = self._database.query(query)
+        start = time.perf_counter()
+        result: Result = self._database.run(generated.text)
+        database_time: float = time.perf_counter() - start
 
-        return result
+        return Result(
+            result.text,
+            generated.text,
+            {
+                **result.stats,
+                **{f"query_{k}": v for k, v in generated.stats.items()},
+                "query_time": query_time,
+                "database_time": database_time,
+            },
+        )
@@ -0,0 +1,16 @@
+"""
+This module exposes the public interface for the context packers, including:
+
+- Packer: Abstract base class selecting the most relevant context lines
+    within a token budget.
+- BM25Packer: Concrete implementation of Packer using BM25 lexical scoring.
+- EmbeddingPacker: Concrete implementation of Packer using embedding cosine
+    similarity.
+- estimate_tokens: Local estimate of the number of tokens of a text.
+"""
+
+from .packer import Packer, estimate_tokens
+from .bm25 import BM25Packer
+from .embedding import EmbeddingPacker
+
+__all__: list[str] = ["Packer", "BM25Packer", "EmbeddingPacker", "estimate_tokens"]
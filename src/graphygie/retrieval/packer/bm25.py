@@ -0,0 +1,78 @@
+"""
+This module defines the BM25Packer class, a concrete implementation of the
+Packer interface that ranks context lines with the Okapi BM25 lexical scorer.
+"""
+
+import re
+
+import numpy as np
+
+from .packer import Packer
+
+
+_WORD_RE = re.compile(r"\w+")
+
+
+def _terms(text: str) -> list[str]:
+    """Lower-cases and splits a text into word terms."""
+    return _WORD_RE.findall(text.lower())
+
+
+class BM25Packer(Packer):
+    """
+    A packer scoring each line with BM25, treating every line of the context
+    as a document and the question as the query.
+
+    Attributes:
+    - _k1 (float): The term frequency saturation parameter.
+    - _b (float): The length normalization parameter.
+    """
+
+    def __init__(self, budget: int, k1: float = 1.2, b: float = 0.75) -> None:
+        """
+        Initializes the BM25 packer.
+
+        Parameters:
+        - budget (int): The maximum number of tokens of the packed context.
+        - k1 (float, optional): The term frequency saturation parameter.
+            Defaults to 1.2.
+        - b (float, optional): The length normalization parameter. Defaults
+            to 0.75.
+        """
+        super().__init__(budget)
+        self._k1: float = k1
+        self._b: float = b
+
+    def score(self, question: str, lines: list[str]) -> np.ndarray:
+        vocabulary: dict[str, int] = {}
+        for term in _terms(question):
+            vocabulary.setdefault(term, len(vocabulary))
+        if not vocabulary:
+            return np.zeros(len(lines))
+
+        # Flat (line, term) coordinates of every query term occurrence, so the
+        # term frequency matrix is filled in a single vectorized call.
+        rows: list[int] = []
+        cols: list[int] = []
+        lengths: np.ndarray = np.empty(len(lines))
+        for row, line in enumerate(lines):
+            terms: list[str] = _terms(line)
+            lengths[row] = len(terms)
+            for term in terms:
+                col = vocabulary.get(term)
+                if col is not None:
+                    rows.append(row)
+                    cols.append(col)
+
+        tf: np.ndarray = np.zeros((len(lines), len(vocabulary)))
+        np.add.at(tf, (rows, cols), 1.0)
+
+        n: int = len(lines)
+        df: np.ndarray = np.count_nonzero(tf, axis=0)
+        idf: np.ndarray = np.log1p((n - df + 0.5) / (df + 0.5))
+
+        average: float = float(lengths.mean()) or 1.0
+        norm: np.ndarray = self._k1 * (1.0 - self._b + self._b * lengths / average)
+        weights: np.ndarray = tf * (self._k1 + 1.0) / (tf + norm[:, None])
+
+        return weights @ idf
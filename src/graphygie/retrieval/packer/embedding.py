@@ -0,0 +1,49 @@
+"""
+This module defines the EmbeddingPacker class, a concrete implementation of
+the Packer interface that ranks context lines by cosine similarity between
+their embeddings and the embedding of the question.
+"""
+
+from typing import Callable, Sequence
+
+import numpy as np
+
+from .packer import Packer
+
+
+class EmbeddingPacker(Packer):
+    """
+    A packer scoring each line by the cosine similarity of its embedding with
+    the question's embedding.
+
+    Attributes:
+    - _embed (Callable[[list[str]], Sequence[Sequence[float]]]): The function
+        embedding a batch of texts.
+    """
+
+    def __init__(
+        self,
+        budget: int,
+        embed: Callable[[list[str]], Sequence[Sequence[float]]],
+    ) -> None:
+        """
+        Initializes the embedding packer.
+
+        Parameters:
+        - budget (int): The maximum number of tokens of the packed context.
+        - embed (Callable[[list[str]], Sequence[Sequence[float]]]): A function
+            returning one embedding per input text (e.g. the
+            `embed_documents` method of a LangChain embedder).
+        """
+        super().__init__(budget)
+        self._embed: Callable[[list[str]], Sequence[Sequence[float]]] = embed
+
+    def score(self, question: str, lines: list[str]) -> np.ndarray:
+        # The question is embedded in the same batch as the lines to avoid a
+        # second round trip to the embedding backend.
+        vectors: np.ndarray = np.asarray(self._embed([question] + lines), dtype=float)
+        norms: np.ndarray = np.linalg.norm(vectors, axis=1)
+        norms[norms == 0.0] = 1.0
+        vectors /= norms[:, None]
+
+        return vectors[1:] @ vectors[0]
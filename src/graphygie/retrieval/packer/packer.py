@@ -0,0 +1,107 @@
+"""
+This module defines the abstract interface for a context Packer, which ranks
+the lines of a retrieved context against the user's question and keeps the
+most relevant ones within a token budget.
+"""
+
+from abc import ABC, abstractmethod
+import re
+
+import numpy as np
+
+
+# Splits text into word-like pieces and standalone punctuation, which is a
+# close local approximation of what BPE tokenizers produce.
+_TOKEN_RE = re.compile(r"\w+|[^\w\s]")
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimates the number of tokens of a text without a model tokenizer.
+
+    Parameters:
+    - text (str): The text to measure.
+
+    Returns:
+    - int: The larger of the word/punctuation count and a four characters per
+        token estimate.
+    """
+    return max(len(_TOKEN_RE.findall(text)), -(-len(text) // 4))
+
+
+class Packer(ABC):
+    """
+    Abstract base class for context packers.
+
+    Subclasses only need to score the lines of the context; the greedy
+    selection within the token budget is shared.
+
+    Attributes:
+    - _budget (int): The maximum number of tokens of the packed context.
+    """
+
+    def __init__(self, budget: int) -> None:
+        """
+        Initializes the packer.
+
+        Parameters:
+        - budget (int): The maximum number of tokens of the packed context.
+
+        Raises:
+        - ValueError: If the budget is not strictly positive.
+        """
+        if budget <= 0:
+            raise ValueError("Packer expected a strictly positive budget.")
+        self._budget: int = budget
+
+    @abstractmethod
+    def score(self, question: str, lines: list[str]) -> np.ndarray:
+        """
+        Scores each line of the context against the question.
+
+        Parameters:
+        - question (str): The user's question.
+        - lines (list[str]): The non-empty lines of the retrieved context.
+
+        Returns:
+        - np.ndarray: One relevance score per line, higher is better.
+        """
+        ...
+
+    def pack(self, question: str, context: str) -> str:
+        """
+        Keeps the most relevant lines of the context that fit in the budget.
+
+        Lines are taken greedily by decreasing score (ties keep their original
+        order); a line that does not fit is skipped so that shorter ones can
+        still fill the remaining budget.
+
+        Parameters:
+        - question (str): The user's question.
+        - context (str): The retrieved context, one fact per line.
+
+        Returns:
+        - str: The selected lines, most relevant first.
+        """
+        lines: list[str] = [line for line in context.splitlines() if line.strip()]
+        if not lines:
+            return ""
+
+        scores: np.ndarray = self.score(question, lines)
+        # Each line also costs the newline joining it to the next one.
+        costs: np.ndarray = np.fromiter(
+            (estimate_tokens(line) + 1 for line in lines),
+            dtype=np.int64,
+            count=len(lines),
+        )
+
+        selected: list[str] = []
+        remaining: int = self._budget
+        for index in np.argsort(-scores, kind="stable"):
+            if costs[index] <= remaining:
+                selected.append(lines[index])
+                remaining -= int(costs[index])
+                if remaining <= 0:
+                    break
+
+        return "\n".join(selected)
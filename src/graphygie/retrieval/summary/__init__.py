@@ -0,0 +1,35 @@
+"""
+This module exposes the public interface for the precomputed neighbourhood
+summaries, including:
+
+- SummaryStore: SQLite key-value store of rendered concept neighbourhoods.
+- Summary: A rendered neighbourhood.
+- Summaries: Retriever serving the neighbourhood of the concepts named in a
+    chat.
+- build_summaries: Offline job rendering neighbourhoods from Neo4j.
+- refresh_summaries: Incremental update after concepts changed in Neo4j.
+
+The Neo4j jobs (and the neo4j driver) are imported on first access.
+"""
+
+from typing import TYPE_CHECKING
+
+from graphygie._lazy import lazy_exports
+from .store import Summary, SummaryStore, normalize_name
+from .retriever import Summaries
+
+if TYPE_CHECKING:
+    from .neo4j import build_summaries, refresh_summaries
+
+__getattr__, __dir__ = lazy_exports(
+    __name__, {"build_summaries": ".neo4j", "refresh_summaries": ".neo4j"}
+)
+
+__all__: list[str] = [
+    "SummaryStore",
+    "Summary",
+    "normalize_name",
+    "Summaries",
+    "build_summaries",
+    "refresh_summaries",
+]
@@ -0,0 +1,254 @@
+"""
+This module defines the offline jobs that render the neighbourhood of the
+concepts of a Neo4j database into a SummaryStore, in full or incrementally.
+"""
+
+from typing import Any, Iterable, Optional, cast
+
+from neo4j import Driver, Query, Session
+
+from .store import Summary, SummaryStore
+
+
+# The relationships of a concept rendered in its summary.
+RELATIONSHIPS: tuple[str, ...] = ("PAR", "CHD", "SY", "RO", "STY")
+
+# An outgoing relationship: its type, the name and id of the other node, and
+# whether the other node is a concept.
+Edge = tuple[str, str, Optional[str], bool]
+
+_NEIGHBOURHOOD_QUERY: str = """
+UNWIND $ids AS id
+MATCH (c:CUI {id: id})
+CALL (c) {
+    MATCH (c)-[r]->(n)
+    WHERE type(r) IN $types
+    WITH r, n
+    ORDER BY coalesce(n.centrality, 0) DESC, type(r), n.id
+    LIMIT $limit
+    RETURN collect(
+        [type(r), coalesce(n.name, n.title, elementId(n)), n.id, n:CUI]
+    ) AS edges
+}
+RETURN c.id AS id, c.name AS name, edges
+"""
+
+_REFERRERS_QUERY: str = """
+UNWIND $ids AS id
+MATCH (n:CUI {id: id})<-[r]-(c:CUI)
+WHERE type(r) IN $types
+RETURN DISTINCT c.id AS id
+"""
+
+
+def _neighbourhoods(
+    session: Session, ids: list[str], types: tuple[str, ...], limit: int
+) -> dict[str, tuple[str, list[Edge]]]:
+    records = session.run(
+        cast(Query, _NEIGHBOURHOOD_QUERY),
+        ids=ids,
+        types=list(types),
+        limit=limit,
+    )
+    return {
+        record["id"]: (
+            record["name"] or record["id"],
+            [cast(Edge, tuple(edge)) for edge in record["edges"]],
+        )
+        for record in records
+    }
+
+
+def render(
+    name: str,
+    edges: list[Edge],
+    neighbours: Optional[dict[str, tuple[str, list[Edge]]]] = None,
+) -> str:
+    """
+    Renders a neighbourhood as one `<start> -[<type>]-> <end>.` line per
+    relationship, like the results of `Neo4j.query`.
+
+    Parameters:
+    - name (str): The name of the concept.
+    - edges (list[Edge]): Its outgoing relationships.
+    - neighbours (Optional[dict[str, tuple[str, list[Edge]]]]): The name and
+        outgoing relationships of its neighbouring concepts, by id, rendered
+        after its own, except those back to the concept. If None, only the
+        first hop is rendered.
+
+    Returns:
+    - str: The rendered neighbourhood.
+    """
+    lines: list[str] = [f"{name} -[{type}]-> {other}." for type, other, _, _ in edges]
+    if neighbours is not None:
+        for _, _, id, concept in edges:
+            if not concept or id not in neighbours:
+                continue
+            neighbour, second = neighbours[id]
+            # Relationships back to the concept repeat its own (e.g., CHD/PAR).
+            lines.extend(
+                f"{neighbour} -[{type}]-> {other}."
+                for type, other, _, _ in second
+                if other != name
+            )
+    # A relationship reached twice (e.g., a shared parent) is rendered once.
+    return "\n".join(dict.fromkeys(lines))
+
+
+def build_summaries(
+    driver: Driver,
+    database: str,
+    store: SummaryStore,
+    ids: Optional[Iterable[str]] = None,
+    hops: int = 1,
+    limit: int = 50,
+    second_limit: int = 5,
+    types: tuple[str, ...] = RELATIONSHIPS,
+    batch_size: int = 500,
+) -> int:
+    """
+    Renders the neighbourhood of concepts into a store.
+
+    Concepts are read in batches (paged on their indexed id when all of them
+    are rendered) and each batch is written in one transaction. Summaries
+    that did not change are not rewritten, and the requested concepts missing
+    from the graph are deleted from the store.
+
+    Parameters:
+    - driver (Driver): The Neo4j driver.
+    - database (str): The name of the Neo4j database.
+    - store (SummaryStore): The store.
+    - ids (Optional[Iterable[str]]): The ids of the concepts to render (e.g.,
+        `store.hot(n)`). If None, every concept is rendered.
+    - hops (int, optional): The depth of the neighbourhood, 1 or 2. Defaults
+        to 1.
+    - limit (int, optional): The maximum number of relationships of the
+        concept, to the most central neighbours (see `compute_centrality`).
+        Defaults to 50.
+    - second_limit (int, optional): The maximum number of relationships of
+        each neighbouring concept, when hops is 2. Defaults to 5.
+    - types (tuple[str, ...], optional): The relationship types rendered.
+        Defaults to RELATIONSHIPS.
+    - batch_size (int, optional): The number of concepts per batch. Defaults
+        to 500.
+
+    Returns:
+    - int: The number of summaries written.
+
+    Raises:
+    - ValueError: If hops is neither 1 nor 2.
+    """
+    if hops not in (1, 2):
+        raise ValueError(f"Unsupported neighbourhood depth {hops}.")
+
+    written: int = 0
+    with driver.session(database=database) as session:
+        for batch in _batches(session, ids, batch_size):
+            found: dict[str, tuple[str, list[Edge]]] = _neighbourhoods(
+                session, batch, types, limit
+            )
+
+            neighbours: Optional[dict[str, tuple[str, list[Edge]]]] = None
+            if hops == 2:
+                second: set[str] = {
+                    id
+                    for _, edges in found.values()
+                    for _, _, id, concept in edges
+                    if concept and id is not None
+                }
+                neighbours = _neighbourhoods(
+                    session, sorted(second), types, second_limit
+                )
+
+            written += store.put_many(
+                Summary(id, name, render(name, edges, neighbours))
+                for id, (name, edges) in found.items()
+            )
+            store.delete(id for id in batch if id not in found)
+
+    return written
+
+
+def refresh_summaries(
+    driver: Driver,
+    database: str,
+    store: SummaryStore,
+    changed: Iterable[str],
+    hops: int = 1,
+    types: tuple[str, ...] = RELATIONSHIPS,
+    **kwargs: Any,
+) -> int:
+    """
+    Updates the store after some concepts changed in the graph.
+
+    The changed concepts are re-rendered, along with the precomputed concepts
+    whose neighbourhood reaches them within `hops` relationships. The
+    referrers are found in the current graph: when a relationship is deleted,
+    both of its ends must be listed as changed.
+
+    Parameters:
+    - driver (Driver): The Neo4j driver.
+    - database (str): The name of the Neo4j database.
+    - store (SummaryStore): The store.
+    - changed (Iterable[str]): The ids of the concepts added, modified or
+        deleted, or whose relationships changed.
+    - hops (int, optional): The depth of the neighbourhood, as used to build
+        the store. Defaults to 1.
+    - types (tuple[str, ...], optional): The relationship types rendered.
+        Defaults to RELATIONSHIPS.
+    - **kwargs (Any): The other arguments of `build_summaries`.
+
+    Returns:
+    - int: The number of summaries written.
+    """
+    changed = set(changed)
+    affected: set[str] = set(changed)
+    frontier: list[str] = sorted(affected)
+    with driver.session(database=database) as session:
+        for _ in range(hops):
+            referrers: set[str] = {
+                record["id"]
+                for record in session.run(
+                    cast(Query, _REFERRERS_QUERY), ids=frontier, types=list(types)
+                )
+            }
+            frontier = sorted(referrers - affected)
+            affected |= referrers
+
+    # Referrers that were never precomputed (e.g., outside the top-N) stay so.
+    stored: set[str] = store.ids()
+    refreshed: list[str] = sorted(
+        id for id in affected if id in stored or id in changed
+    )
+    return build_summaries(
+        driver, database, store, refreshed, hops=hops, types=types, **kwargs
+    )
+
+
+def _batches(
+    session: Session, ids: Optional[Iterable[str]], batch_size: int
+) -> Iterable[list[str]]:
+    if ids is not None:
+        ids = list(ids)
+        for start in range(0, len(ids), batch_size):
+            yield ids[start : start + batch_size]
+        return
+
+    cursor: str = ""
+    while True:
+        batch: list[str] = [
+            record["id"]
+            for record in session.run(
+                cast(
+                    Query,
+                    "MATCH (c:CUI) WHERE c.id > $cursor "
+                    "RETURN c.id AS id ORDER BY c.id LIMIT $limit",
+                ),
+                cursor=cursor,
+                limit=batch_size,
+            )
+        ]
+        if not batch:
+            return
+        yield batch
+        cursor = batch[-1]
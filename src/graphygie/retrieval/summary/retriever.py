@@ -0,0 +1,136 @@
+"""
+This module defines the Summaries retriever class, which serves the
+precomputed neighbourhood of the concepts named in a chat.
+"""
+
+import logging
+from typing import Optional, Sequence
+
+from graphygie.llm import LLM
+from graphygie.llm.chat import Chat
+from graphygie.result import Result
+from .store import SummaryStore, normalize_name
+
+
+class Summaries(LLM):
+    """
+    A retriever serving the precomputed neighbourhood of the concepts named in
+    the user messages of a chat, without querying the graph.
+
+    Concepts are found by looking up every run of up to `max_words` words of
+    the messages in the name index of the store (in one batched lookup),
+    keeping the longest name at each position.
+
+    Attributes:
+    - _store (SummaryStore): The precomputed neighbourhoods.
+    - _fallback (Optional[LLM]): The retriever used when no concept is found.
+    """
+
+    def __init__(
+        self,
+        store: SummaryStore,
+        fallback: Optional[LLM] = None,
+        max_words: int = 6,
+        max_concepts: int = 8,
+        min_length: int = 3,
+    ) -> None:
+        """
+        Initializes the retriever.
+
+        Parameters:
+        - store (SummaryStore): The precomputed neighbourhoods.
+        - fallback (Optional[LLM]): The retriever used when no concept is
+            found (e.g., a Graph retriever). If None, nothing is retrieved.
+        - max_words (int, optional): The maximum number of words of a concept
+            name. Defaults to 6.
+        - max_concepts (int, optional): The maximum number of concepts served.
+            Defaults to 8.
+        - min_length (int, optional): The minimum length of a matched name, in
+            characters, so short words do not match abbreviations. Defaults
+            to 3.
+        """
+        self._store: SummaryStore = store
+        self._fallback: Optional[LLM] = fallback
+        self._max_words: int = max_words
+        self._max_concepts: int = max_concepts
+        self._min_length: int = min_length
+
+    def link(self, text: str) -> list[str]:
+        """
+        Finds the precomputed concepts named in a text.
+
+        Parameters:
+        - text (str): The text.
+
+        Returns:
+        - list[str]: The ids of the concepts, in order of appearance.
+        """
+        words: list[str] = normalize_name(text).split()
+        candidates: list[str] = [
+            " ".join(words[start : start + n])
+            for start in range(len(words))
+            for n in range(1, min(self._max_words, len(words) - start) + 1)
+        ]
+        found: dict[str, list[str]] = self._store.lookup(
+            candidate for candidate in candidates if len(candidate) >= self._min_length
+        )
+
+        ids: list[str] = []
+        start: int = 0
+        while start < len(words):
+            for n in range(min(self._max_words, len(words) - start), 0, -1):
+                matched: Optional[list[str]] = found.get(
+                    " ".join(words[start : start + n])
+                )
+                if matched:
+                    ids.extend(matched)
+                    start += n
+                    break
+            else:
+                start += 1
+        return list(dict.fromkeys(ids))
+
+    def context(self, ids: list[str]) -> str:
+        """
+        Gets the precomputed neighbourhood of concepts.
+
+        Parameters:
+        - ids (list[str]): The ids of the concepts.
+
+        Returns:
+        - str: The neighbourhoods found, in order, separated by newlines.
+        """
+        summaries = self._store.get_many(ids)
+        return "\n".join(summaries[id].text for id in ids if id in summaries)
+
+    def chat(self, chat: Chat = list()) -> str:
+        return self.respond(chat).text
+
+    def respond(
+        self, chat: Chat = list(), choices: Optional[Sequence[str]] = None
+    ) -> Result:
+        """
+        Retrieves the neighbourhoods of the concepts named in a chat, or the
+        result of the fallback if none is found.
+
+        Parameters:
+        - chat (Chat, optional): The list of chat messages used as input.
+            Defaults to an empty list.
+        - choices (Optional[Sequence[str]]): Ignored: a retriever does not
+            choose.
+
+        Returns:
+        - Result: The neighbourhoods, with the number of `concepts` found, or
+            the result of the fallback.
+        """
+        logger: logging.Logger = logging.getLogger(__name__)
+
+        question: str = "\n".join(
+            message.content for message in chat if message.role == "user"
+        )
+        ids: list[str] = self.link(question)[: self._max_concepts]
+        logger.info(f"Concepts: {ids}")
+
+        if not ids and self._fallback is not None:
+            return self._fallback.respond(chat)
+        return Result(self.context(ids), stats={"concepts": len(ids)})
@@ -0,0 +1,277 @@
+"""
+This module defines the SummaryStore class, a SQLite key-value store of
+pre-rendered concept neighbourhoods, keyed by concept id and indexed by
+concept name.
+"""
+
+import hashlib
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from collections import Counter
+from typing import Iterable, Optional
+
+
+# Maximum number of keys per SQLite lookup (below the host parameter limit).
+_LOOKUP_CHUNK: int = 500
+
+_SEPARATOR_RE = re.compile(r"[\W_]+")
+
+
+def normalize_name(name: str) -> str:
+    """
+    Normalizes a concept name for lookup: case-folded, with runs of
+    punctuation and whitespace collapsed to one space.
+
+    Parameters:
+    - name (str): The name.
+
+    Returns:
+    - str: The lookup key of the name.
+    """
+    return _SEPARATOR_RE.sub(" ", name.casefold()).strip()
+
+
+class Summary:
+    """
+    A pre-rendered neighbourhood.
+
+    Attributes:
+    - id (str): The id of the concept.
+    - name (str): The name of the concept.
+    - text (str): The rendered neighbourhood, one relationship per line.
+    """
+
+    def __init__(self, id: str, name: str, text: str) -> None:
+        self.id: str = id
+        self.name: str = name
+        self.text: str = text
+
+
+class SummaryStore:
+    """
+    Pre-rendered concept neighbourhoods in a SQLite file.
+
+    Each summary is one compressed row of a primary-key table, so serving it
+    costs one index lookup and a decompression, whatever the degree of the
+    concept in the graph. A second table maps normalized names to ids, so
+    entities can be looked up by name.
+
+    Lookups are counted per id, including misses, so the concepts worth
+    precomputing can be chosen by access frequency (see `hot`). Counts are
+    kept in memory and written on `flush` (and `close`).
+
+    Attributes:
+    - _connection (sqlite3.Connection): The connection to the store file.
+    """
+
+    def __init__(self, path: str) -> None:
+        """
+        Opens (or creates) a summary store.
+
+        Parameters:
+        - path (str): The path of the store file.
+        """
+        self._lock: threading.Lock = threading.Lock()
+        self._connection: sqlite3.Connection = sqlite3.connect(
+            path, check_same_thread=False
+        )
+        self._connection.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS summaries (
+                id TEXT PRIMARY KEY,
+                name TEXT NOT NULL,
+                digest BLOB NOT NULL,
+                text BLOB NOT NULL,
+                updated REAL NOT NULL
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS names (
+                name TEXT NOT NULL,
+                id TEXT NOT NULL,
+                PRIMARY KEY (name, id)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS names_id ON names (id);
+            CREATE TABLE IF NOT EXISTS hits (
+                id TEXT PRIMARY KEY,
+                count INTEGER NOT NULL
+            ) WITHOUT ROWID;
+            """
+        )
+        self._connection.commit()
+        self._hits: Counter[str] = Counter()
+
+    def get(self, id: str) -> Optional[Summary]:
+        """
+        Gets the summary of a concept.
+
+        Parameters:
+        - id (str): The id of the concept.
+
+        Returns:
+        - Optional[Summary]: The summary, or None if it was not precomputed.
+        """
+        return self.get_many([id]).get(id)
+
+    def get_many(self, ids: Iterable[str]) -> dict[str, Summary]:
+        """
+        Gets the summaries of several concepts.
+
+        Parameters:
+        - ids (Iterable[str]): The ids of the concepts.
+
+        Returns:
+        - dict[str, Summary]: The summary of each precomputed concept, by id.
+        """
+        ids = list(dict.fromkeys(ids))
+        summaries: dict[str, Summary] = {}
+        with self._lock:
+            self._hits.update(ids)
+            for start in range(0, len(ids), _LOOKUP_CHUNK):
+                chunk: list[str] = ids[start : start + _LOOKUP_CHUNK]
+                for id, name, text in self._connection.execute(
+                    "SELECT id, name, text FROM summaries "
+                    f"WHERE id IN ({','.join('?' * len(chunk))})",
+                    chunk,
+                ):
+                    summaries[id] = Summary(
+                        id, name, zlib.decompress(text).decode("utf-8")
+                    )
+        return summaries
+
+    def lookup(self, names: Iterable[str]) -> dict[str, list[str]]:
+        """
+        Gets the ids of the precomputed concepts with some names.
+
+        Parameters:
+        - names (Iterable[str]): The names, normalized before lookup.
+
+        Returns:
+        - dict[str, list[str]]: The ids (in id order) of each normalized name
+            found.
+        """
+        keys: list[str] = list(dict.fromkeys(normalize_name(name) for name in names))
+        found: dict[str, list[str]] = {}
+        with self._lock:
+            for start in range(0, len(keys), _LOOKUP_CHUNK):
+                chunk: list[str] = keys[start : start + _LOOKUP_CHUNK]
+                for name, id in self._connection.execute(
+                    "SELECT name, id FROM names "
+                    f"WHERE name IN ({','.join('?' * len(chunk))}) ORDER BY id",
+                    chunk,
+                ):
+                    found.setdefault(name, []).append(id)
+        return found
+
+    def put_many(self, summaries: Iterable[Summary]) -> int:
+        """
+        Writes summaries, in one transaction. Summaries whose text did not
+        change are left untouched.
+
+        Parameters:
+        - summaries (Iterable[Summary]): The summaries.
+
+        Returns:
+        - int: The number of summaries written.
+        """
+        now: float = time.time()
+        written: int = 0
+        with self._lock, self._connection:
+            for summary in summaries:
+                digest: bytes = hashlib.sha256(
+                    f"{summary.name}\0{summary.text}".encode("utf-8")
+                ).digest()
+                row = self._connection.execute(
+                    "SELECT digest FROM summaries WHERE id = ?", (summary.id,)
+                ).fetchone()
+                if row is not None and row[0] == digest:
+                    continue
+                self._connection.execute(
+                    "INSERT OR REPLACE INTO summaries VALUES (?, ?, ?, ?, ?)",
+                    (
+                        summary.id,
+                        summary.name,
+                        digest,
+                        zlib.compress(summary.text.encode("utf-8")),
+                        now,
+                    ),
+                )
+                self._connection.execute(
+                    "DELETE FROM names WHERE id = ?", (summary.id,)
+                )
+                self._connection.execute(
+                    "INSERT OR IGNORE INTO names VALUES (?, ?)",
+                    (normalize_name(summary.name), summary.id),
+                )
+                written += 1
+        return written
+
+    def delete(self, ids: Iterable[str]) -> None:
+        """
+        Deletes summaries, e.g. of concepts removed from the graph.
+
+        Parameters:
+        - ids (Iterable[str]): The ids of the concepts.
+        """
+        rows: list[tuple[str]] = [(id,) for id in ids]
+        with self._lock, self._connection:
+            self._connection.executemany("DELETE FROM summaries WHERE id = ?", rows)
+            self._connection.executemany("DELETE FROM names WHERE id = ?", rows)
+
+    def ids(self) -> set[str]:
+        """
+        Gets the ids of the precomputed concepts.
+
+        Returns:
+        - set[str]: The ids.
+        """
+        with self._lock:
+            return {
+                id for (id,) in self._connection.execute("SELECT id FROM summaries")
+            }
+
+    def hot(self, n: int) -> list[str]:
+        """
+        Gets the most looked-up concepts, precomputed or not.
+
+        Parameters:
+        - n (int): The number of concepts.
+
+        Returns:
+        - list[str]: The ids of the concepts, most looked-up first.
+        """
+        self.flush()
+        with self._lock:
+            return [
+                id
+                for (id,) in self._connection.execute(
+                    "SELECT id FROM hits ORDER BY count DESC, id LIMIT ?", (n,)
+                )
+            ]
+
+    def flush(self) -> None:
+        """
+        Writes the lookup counts kept in memory.
+        """
+        with self._lock, self._connection:
+            self._connection.executemany(
+                "INSERT INTO hits VALUES (?, ?) "
+                "ON CONFLICT (id) DO UPDATE SET count = count + excluded.count",
+                self._hits.items(),
+            )
+            self._hits.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            (count,) = self._connection.execute(
+                "SELECT count(*) FROM summaries"
+            ).fetchone()
+        return count
+
+    def close(self) -> None:
+        """
+        Writes the lookup counts and closes the store.
+        """
+        self.flush()
+        self._connection.close()
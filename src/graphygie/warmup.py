@@ -0,0 +1,85 @@
+"""
+This module defines the warm_up and keep_warm functions, which warm the
+services of a pipeline (e.g., the Neo4j page cache and the Ollama models)
+at start, or periodically, and report their readiness.
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Protocol
+
+
+class Warmable(Protocol):
+    """
+    A service that can be warmed (e.g., Neo4j, Ollama).
+    """
+
+    def warm_up(self) -> dict[str, Any]:
+        """
+        Warms the service.
+
+        Returns:
+        - dict[str, Any]: The report, with at least whether it is ready and
+            the seconds it took.
+        """
+        ...
+
+
+def warm_up(services: dict[str, Warmable]) -> dict[str, Any]:
+    """
+    Warms services concurrently.
+
+    Parameters:
+    - services (dict[str, Warmable]): The services, by name.
+
+    Returns:
+    - dict[str, Any]: Whether every service is ready, the time to warm them
+        all in seconds, and the report of each service, by name.
+    """
+    start: float = time.perf_counter()
+    with ThreadPoolExecutor(max(len(services), 1)) as executor:
+        futures = {
+            name: executor.submit(service.warm_up) for name, service in services.items()
+        }
+        reports: dict[str, dict[str, Any]] = {
+            name: future.result() for name, future in futures.items()
+        }
+    return {
+        "ready": all(report["ready"] for report in reports.values()),
+        "seconds": time.perf_counter() - start,
+        "services": reports,
+    }
+
+
+def keep_warm(services: dict[str, Warmable], interval: float) -> threading.Event:
+    """
+    Warms services now, then every interval, in a background thread (e.g., to
+    reload a model before its `keep_alive` expires).
+
+    Parameters:
+    - services (dict[str, Warmable]): The services, by name.
+    - interval (float): The seconds between two warm-ups.
+
+    Returns:
+    - threading.Event: The event stopping the thread when set.
+    """
+    logger: logging.Logger = logging.getLogger(__name__)
+    stop: threading.Event = threading.Event()
+
+    def run() -> None:
+        while True:
+            report: dict[str, Any] = warm_up(services)
+            logger.info(
+                f"Warm-up in {report['seconds']:.2f}s, ready: {report['ready']}"
+            )
+            if not report["ready"]:
+                for name, service in report["services"].items():
+                    if not service["ready"]:
+                        logger.warning(f"{name} not ready: {service.get('error')}")
+            if stop.wait(interval):
+                return
+
+    threading.Thread(target=run, name="keep-warm", daemon=True).start()
+    return stop
@@ -5,10 +5,17 @@ This module aggregates utility functions for file reading, string unwrapping,
 
 from .read_to_string import read_to_string
 from .unwrap import unwrap
-from .cleaner import strip_code_fences, strip_after_double_newline
+from .cleaner import (
+    Cleaner,
+    CleanerStream,
+    strip_code_fences,
+    strip_after_double_newline,
+    strip_think_tags,
+)
 from .compose import compose
 from .user_prompt import user_prompt
 from .generator_system_prompt import generator_system_prompt
+from .template import Template, TemplateRegistry, compile_template
 
 
 __all__: list[str] = [
@@ -18,5 +25,11 @@ __all__: list[str] = [
     "generator_system_prompt",
     "strip_code_fences",
     "strip_after_double_newline",
+    "strip_think_tags",
+    "Cleaner",
+    "CleanerStream",
     "compose",
+    "Template",
+    "TemplateRegistry",
+    "compile_template",
 ]
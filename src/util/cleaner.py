@@ -1,56 +1,304 @@
-import re
+"""
+This module defines the response cleaners: single-pass state machines that
+clean a whole response or, incrementally, a stream of tokens.
+"""
 
-# Matches an entire string wrapped in triple backticks, optionally with a
-# language tag.
-_CODE_FENCE_RE = re.compile(
-    r"[\s\S]*```(?:\S*)?\n(.*?)\n```[\s\S]*$",
-    re.DOTALL,
-)
+from abc import ABC, abstractmethod
 
 
-def strip_code_fences(text: str) -> str:
+class CleanerStream(ABC):
     """
-    If the input is wrapped in a triple-backtick code fence (optionally with a
-    language), return only the inner content. Otherwise, return the text
-    unchanged.
+    The incremental state of a cleaner over one response.
 
-    Parameters:
-        text (str): The input text, possibly fenced with ```.
+    Each chunk is scanned once; only the few characters that may start a
+    marker (e.g. the "`" of a closing fence) are held back until the next
+    chunk tells whether they do.
+    """
+
+    @abstractmethod
+    def feed(self, chunk: str) -> str:
+        """
+        Cleans the next chunk of the response.
+
+        Parameters:
+            chunk (str): The next characters of the response.
+
+        Returns:
+            str: The cleaned characters that are final so far.
+        """
+        pass
+
+    @abstractmethod
+    def flush(self) -> str:
+        """
+        Ends the response.
+
+        Returns:
+            str: The cleaned characters that were held back.
+        """
+        pass
+
+    @property
+    def done(self) -> bool:
+        """Whether the rest of the response can no longer change the output."""
+        return False
+
+
+class Cleaner(ABC):
+    """
+    A response cleaner, callable on a whole response and able to clean a
+    token stream through `stream`.
+
+    A cleaner may also declare the stop sequences it implies (see `stop`),
+    which the LLM backends can send to the server (with `cleaner_stop`) so
+    the model stops generating text that would be thrown away.
+    """
+
+    @property
+    def stop(self) -> tuple[str, ...]:
+        """
+        The sequences at which generation can stop without changing the
+        cleaned response: the cleaner drops them and everything after.
+        """
+        return ()
+
+    @abstractmethod
+    def stream(self) -> CleanerStream:
+        """
+        Starts cleaning a new response incrementally.
+
+        Returns:
+            CleanerStream: The state of the cleaner over the response.
+        """
+        pass
+
+    def __call__(self, text: str) -> str:
+        stream = self.stream()
+        return stream.feed(text) + stream.flush()
+
+
+def _held(text: str, marker: str) -> int:
+    """
+    Returns the length of the longest suffix of the text that is a proper
+    prefix of the marker, i.e. the characters that may start the marker.
+    """
+    for size in range(min(len(text), len(marker) - 1), 0, -1):
+        if marker.startswith(text[-size:]):
+            return size
+    return 0
+
+
+class _CodeFenceStream(CleanerStream):
+    def __init__(self) -> None:
+        # Everything read, in case the response has no fence at all.
+        self._chunks: list[str] = []
+        # Characters not scanned yet (a possible marker start).
+        self._pending: str = ""
+        self._inside: bool = False
+        self._done: bool = False
+
+    @property
+    def done(self) -> bool:
+        return self._done
+
+    def feed(self, chunk: str) -> str:
+        if self._done:
+            return ""
+        if not self._inside:
+            self._chunks.append(chunk)
+            text = self._pending + chunk
+            start = 0
+            while (start := text.find("```", start)) != -1:
+                # An opening fence is "```", an optional tag, then a newline.
+                end = start + 3
+                while end < len(text) and not text[end].isspace():
+                    end += 1
+                if end == len(text):
+                    self._pending = text[start:]
+                    return ""
+                if text[end] == "\n":
+                    self._inside = True
+                    self._chunks = []
+                    self._pending = ""
+                    return self._content(text[end + 1 :])
+                # Any "```" before `end` also runs into this whitespace.
+                start = end
+            held = _held(text, "```")
+            self._pending = text[len(text) - held :] if held else ""
+            return ""
+        return self._content(self._pending + chunk)
+
+    def _content(self, text: str) -> str:
+        end = text.find("\n```")
+        if end != -1:
+            self._done = True
+            self._pending = ""
+            return text[:end]
+        held = _held(text, "\n```")
+        self._pending = text[len(text) - held :] if held else ""
+        return text[: len(text) - held]
+
+    def flush(self) -> str:
+        if self._done:
+            return ""
+        if self._inside:
+            # An unclosed fence keeps its content up to the end.
+            self._done = True
+            return self._pending
+        return "".join(self._chunks)
+
+
+class CodeFenceCleaner(Cleaner):
+    """
+    Keeps only the content of the first triple-backtick code fence (optionally
+    with a language tag); a response without fence is returned unchanged, and
+    an unclosed fence keeps its content up to the end of the response.
 
-    Returns:
-        str: The unfenced inner content, or the original text if no full fence
-            matches.
+    Once the fence is open, its content streams as it arrives.
+
+    Its stop sequence is the closing fence. This only holds for responses
+    opening with their fence: a response with text before the fence (e.g.,
+    "Here is the query:") would stop at the opening one, so the backends only
+    send it when asked to.
 
     Examples:
         >>> strip_code_fences("```\\nprint('hi')\\n```")
         "print('hi')"
-        >>> strip_code_fences("```python\\nprint('hi')\\n```")
+        >>> strip_code_fences("Query:\\n```python\\nprint('hi')\\n```\\nDone.")
         "print('hi')"
         >>> strip_code_fences("no fences here")
         "no fences here"
     """
-    m = _CODE_FENCE_RE.fullmatch(text)
-    return m.group(1) if m else text
 
+    @property
+    def stop(self) -> tuple[str, ...]:
+        return ("\n```",)
 
-def strip_after_double_newline(text: str) -> str:
-    """
-    Remove everything after the first occurrence of two consecutive newlines.
+    def stream(self) -> CleanerStream:
+        return _CodeFenceStream()
+
+
+class _DoubleNewlineStream(CleanerStream):
+    def __init__(self) -> None:
+        self._pending: str = ""
+        self._done: bool = False
 
-    Parameters:
-        text (str): The input text.
+    @property
+    def done(self) -> bool:
+        return self._done
 
-    Returns:
-        str: The text up to (but not including) the first double newline,
-            or the original text if no double newline is found.
+    def feed(self, chunk: str) -> str:
+        if self._done:
+            return ""
+        text = self._pending + chunk
+        end = text.find("\n\n")
+        if end != -1:
+            self._done = True
+            self._pending = ""
+            return text[:end]
+        self._pending = "\n" if text.endswith("\n") else ""
+        return text[: len(text) - len(self._pending)]
+
+    def flush(self) -> str:
+        pending, self._pending = self._pending, ""
+        return pending
+
+
+class DoubleNewlineCleaner(Cleaner):
+    """
+    Removes everything from the first occurrence of two consecutive newlines.
 
     Examples:
         >>> strip_after_double_newline("first\\nsecond\\n\\nremove this")
-        "first line\\nsecond line"
+        "first\\nsecond"
         >>> strip_after_double_newline("no double newline here\\nsingle only")
         "no double newline here\\nsingle only"
         >>> strip_after_double_newline("start\\n\\nmiddle\\n\\nend")
         "start"
     """
-    parts = text.split("\n\n", 1)
-    return parts[0] if len(parts) > 1 else text
+
+    @property
+    def stop(self) -> tuple[str, ...]:
+        return ("\n\n",)
+
+    def stream(self) -> CleanerStream:
+        return _DoubleNewlineStream()
+
+
+class _ThinkTagStream(CleanerStream):
+    def __init__(self, open: str, close: str) -> None:
+        self._open: str = open
+        self._close: str = close
+        self._pending: str = ""
+        self._thinking: bool = False
+        self._trim: bool = False
+
+    def feed(self, chunk: str) -> str:
+        text = self._pending + chunk
+        self._pending = ""
+        output: list[str] = []
+
+        while text:
+            if self._thinking:
+                end = text.find(self._close)
+                if end == -1:
+                    held = _held(text, self._close)
+                    self._pending = text[len(text) - held :] if held else ""
+                    break
+                self._thinking, self._trim = False, True
+                text = text[end + len(self._close) :]
+                continue
+
+            if self._trim:
+                # The answer follows the reasoning after blank lines.
+                text = text.lstrip()
+                if not text:
+                    break
+                self._trim = False
+
+            start = text.find(self._open)
+            if start == -1:
+                held = _held(text, self._open)
+                self._pending = text[len(text) - held :] if held else ""
+                output.append(text[: len(text) - held])
+                break
+            output.append(text[:start])
+            self._thinking = True
+            text = text[start + len(self._open) :]
+
+        return "".join(output)
+
+    def flush(self) -> str:
+        pending, self._pending = self._pending, ""
+        return "" if self._thinking else pending
+
+
+class ThinkTagCleaner(Cleaner):
+    """
+    Removes the reasoning blocks of reasoning models (e.g. qwen3's
+    `<think>...</think>`) and the blank lines following them; an unclosed
+    block removes the rest of the response.
+
+    Examples:
+        >>> strip_think_tags("<think>\\nThe user wants...\\n</think>\\n\\nMATCH (n)")
+        "MATCH (n)"
+    """
+
+    def __init__(self, open: str = "<think>", close: str = "</think>") -> None:
+        """
+        Initializes the cleaner.
+
+        Parameters:
+            open (str, optional): The opening tag. Defaults to "<think>".
+            close (str, optional): The closing tag. Defaults to "</think>".
+        """
+        self._open: str = open
+        self._close: str = close
+
+    def stream(self) -> CleanerStream:
+        return _ThinkTagStream(self._open, self._close)
+
+
+strip_code_fences: Cleaner = CodeFenceCleaner()
+strip_after_double_newline: Cleaner = DoubleNewlineCleaner()
+strip_think_tags: Cleaner = ThinkTagCleaner()
@@ -1,16 +1,83 @@
 from typing import Callable
 
+from .cleaner import Cleaner, CleanerStream
+
+
+# Characters fed at once by a fused cleaner, so it can stop reading early.
+_CHUNK: int = 4096
+
+
+class _ComposedStream(CleanerStream):
+    def __init__(self, streams: list[CleanerStream]) -> None:
+        self._streams: list[CleanerStream] = streams
+
+    @property
+    def done(self) -> bool:
+        # Once a stage ignores its input, nothing before it matters anymore.
+        return any(stream.done for stream in self._streams)
+
+    def feed(self, chunk: str) -> str:
+        for stream in self._streams:
+            chunk = stream.feed(chunk)
+        return chunk
+
+    def flush(self) -> str:
+        text = ""
+        for stream in self._streams:
+            text = stream.feed(text) + stream.flush()
+        return text
+
+
+class ComposedCleaner(Cleaner):
+    """
+    Cleaners fused into one pass: each chunk of the response flows through
+    every cleaner in turn, and reading stops as soon as a cleaner has made
+    its decision (e.g. a double newline was cut).
+    """
+
+    def __init__(self, cleaners: tuple[Cleaner, ...]) -> None:
+        self._cleaners: tuple[Cleaner, ...] = cleaners
+
+    @property
+    def stop(self) -> tuple[str, ...]:
+        # A cleaner without stop sequences may remove any text (e.g. a
+        # reasoning block), in which the stops of the next ones could occur.
+        stop: list[str] = []
+        for cleaner in self._cleaners:
+            if not cleaner.stop:
+                break
+            stop.extend(cleaner.stop)
+        return tuple(dict.fromkeys(stop))
+
+    def stream(self) -> CleanerStream:
+        return _ComposedStream([cleaner.stream() for cleaner in self._cleaners])
+
+    def __call__(self, text: str) -> str:
+        stream = self.stream()
+        output: list[str] = []
+        for start in range(0, len(text), _CHUNK):
+            output.append(stream.feed(text[start : start + _CHUNK]))
+            if stream.done:
+                break
+        output.append(stream.flush())
+        return "".join(output)
+
 
 def compose(*functions: Callable[[str], str]) -> Callable[[str], str]:
     """
     Compose multiple functions into one (left to right execution).
 
+    Cleaners are fused into a single pass that can also clean a token stream;
+    other functions are applied one after the other.
+
     Parameters:
         *functions: Variable number of functions to compose.
 
     Returns:
         A new function that applies all functions in sequence.
     """
+    if all(isinstance(func, Cleaner) for func in functions):
+        return ComposedCleaner(tuple(functions))  # type: ignore[arg-type]
 
     def composed(text: str) -> str:
         for func in functions:
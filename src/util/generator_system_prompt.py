@@ -7,6 +7,8 @@ generator LLM.
 
 from graphygie.llm import Chat, Message
 
+from .template import compile_template
+
 
 def generator_system_prompt(chat: Chat, content: str) -> Chat:
     """
@@ -37,6 +39,8 @@ def generator_system_prompt(chat: Chat, content: str) -> Chat:
     return [
         Message(
             role=message.role,
-            content=message.content.replace("{{RETRIEVAL}}", content),
+            content=compile_template(message.content).render(
+                strict=False, RETRIEVAL=content
+            ),
         )
     ]
@@ -0,0 +1,229 @@
+"""
+This module defines the Template class, a prompt pre-parsed into literal and
+`{{PLACEHOLDER}}` slot segments, and the TemplateRegistry class, which loads,
+validates and (optionally) hot-reloads prompt files.
+"""
+
+import logging
+import os
+import re
+import threading
+from contextlib import suppress
+from functools import lru_cache
+from typing import Iterable, Optional
+
+
+_PLACEHOLDER_RE = re.compile(r"\{\{([A-Z][A-Z0-9_]*)\}\}")
+
+
+class Template:
+    """
+    A prompt template, parsed once into alternating literal and slot segments
+    so rendering is a single join, whatever the number of placeholders.
+
+    Values are inserted as-is: a value containing `{{...}}` is never expanded
+    again, unlike chained `str.replace` calls.
+
+    Attributes:
+    - name (str): The name of the template, used in error messages.
+    - slots (frozenset[str]): The names of its placeholders.
+    """
+
+    def __init__(self, text: str, name: str = "<string>") -> None:
+        """
+        Parses a template.
+
+        Parameters:
+        - text (str): The template text, with `{{NAME}}` placeholders.
+        - name (str, optional): The name of the template. Defaults to
+            "<string>".
+        """
+        self.name: str = name
+        self._text: str = text
+        # Even indices hold literals, odd indices slot names.
+        self._segments: list[str] = _PLACEHOLDER_RE.split(text)
+        self.slots: frozenset[str] = frozenset(self._segments[1::2])
+
+    @property
+    def text(self) -> str:
+        """Gets the source text of the template"""
+        return self._text
+
+    def validate(self, slots: Iterable[str]) -> None:
+        """
+        Checks that the template has exactly the expected placeholders.
+
+        Parameters:
+        - slots (Iterable[str]): The expected placeholder names.
+
+        Raises:
+        - ValueError: If a placeholder is missing or unexpected.
+        """
+        expected: frozenset[str] = frozenset(slots)
+        if self.slots != expected:
+            missing: list[str] = sorted(expected - self.slots)
+            unknown: list[str] = sorted(self.slots - expected)
+            raise ValueError(
+                f"Template '{self.name}': missing placeholders {missing}, "
+                f"unknown placeholders {unknown}."
+            )
+
+    def render(self, strict: bool = True, **values: str) -> str:
+        """
+        Renders the template.
+
+        Parameters:
+        - strict (bool, optional): Whether every placeholder must have a value;
+            otherwise placeholders without value are kept as-is. Defaults to
+            True.
+        - **values (str): The value of each placeholder.
+
+        Returns:
+        - str: The rendered text.
+
+        Raises:
+        - KeyError: If strict and a placeholder has no value.
+        """
+        segments: list[str] = self._segments.copy()
+        for i in range(1, len(segments), 2):
+            value: Optional[str] = values.get(segments[i])
+            if value is None:
+                if strict:
+                    raise KeyError(
+                        f"Template '{self.name}': no value for '{segments[i]}'."
+                    )
+                value = f"{{{{{segments[i]}}}}}"
+            segments[i] = value
+        return "".join(segments)
+
+
+@lru_cache(maxsize=256)
+def compile_template(text: str) -> Template:
+    """
+    Parses a template text, reusing the parse of recently seen texts.
+
+    Parameters:
+    - text (str): The template text.
+
+    Returns:
+    - Template: The parsed template.
+    """
+    return Template(text)
+
+
+class TemplateRegistry:
+    """
+    Prompt templates loaded from files once, validated against their expected
+    placeholders, and optionally reloaded when their file changes.
+
+    Attributes:
+    - _reload (bool): Whether `get` checks the files for changes.
+    """
+
+    def __init__(self, reload: bool = False) -> None:
+        """
+        Initializes an empty registry.
+
+        Parameters:
+        - reload (bool, optional): Whether to reload a template when its file
+            changes (checked on `get` with one `stat` call). Defaults to False.
+        """
+        self._reload: bool = reload
+        self._lock: threading.Lock = threading.Lock()
+        self._entries: dict[str, tuple[str, Optional[frozenset[str]]]] = {}
+        self._templates: dict[str, Template] = {}
+        self._mtimes: dict[str, int] = {}
+
+    def register(
+        self, name: str, path: str, slots: Optional[Iterable[str]] = None
+    ) -> Template:
+        """
+        Loads, parses and validates a template file.
+
+        Parameters:
+        - name (str): The name of the template in the registry.
+        - path (str): The path of the template file.
+        - slots (Optional[Iterable[str]]): The expected placeholder names. If
+            None, any placeholders are accepted.
+
+        Returns:
+        - Template: The template.
+
+        Raises:
+        - ValueError: If the placeholders differ from the expected ones.
+        """
+        expected: Optional[frozenset[str]] = (
+            frozenset(slots) if slots is not None else None
+        )
+        template, mtime = self._load(name, path, expected)
+        with self._lock:
+            self._entries[name] = (path, expected)
+            self._templates[name] = template
+            self._mtimes[name] = mtime
+        return template
+
+    def get(self, name: str) -> Template:
+        """
+        Gets a template, reloading it first if enabled and its file changed.
+
+        A reloaded template that fails validation is logged and ignored: the
+        previous version stays in use.
+
+        Parameters:
+        - name (str): The name of the template.
+
+        Returns:
+        - Template: The template.
+
+        Raises:
+        - KeyError: If no template has this name.
+        """
+        if self._reload:
+            path, expected = self._entries[name]
+            try:
+                changed: bool = os.stat(path).st_mtime_ns != self._mtimes[name]
+            except OSError:
+                changed = False
+            if changed:
+                try:
+                    template, mtime = self._load(name, path, expected)
+                    with self._lock:
+                        self._templates[name] = template
+                        self._mtimes[name] = mtime
+                except (OSError, ValueError) as e:
+                    logging.getLogger(__name__).warning(
+                        f"Keeping the previous template '{name}': {e}"
+                    )
+                    # Warn once per change, not on every call.
+                    with self._lock, suppress(OSError):
+                        self._mtimes[name] = os.stat(path).st_mtime_ns
+        return self._templates[name]
+
+    def render(self, name: str, strict: bool = True, **values: str) -> str:
+        """
+        Renders a template.
+
+        Parameters:
+        - name (str): The name of the template.
+        - strict (bool, optional): Whether every placeholder must have a value.
+            Defaults to True.
+        - **values (str): The value of each placeholder.
+
+        Returns:
+        - str: The rendered text.
+        """
+        return self.get(name).render(strict, **values)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._templates
+
+    @staticmethod
+    def _load(
+        name: str, path: str, expected: Optional[frozenset[str]]
+    ) -> tuple[Template, int]:
+        mtime: int = os.stat(path).st_mtime_ns
+        with open(path, "r", encoding="utf-8") as file:
+            template: Template = Template(file.read(), name)
+        if expected is not None:
+            template.validate(expected)
+        return template, mtime
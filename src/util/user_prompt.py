@@ -1,15 +1,19 @@
-def user_prompt(base: str, intent: str, request: str) -> str:
+from .template import Template, compile_template
+
+
+def user_prompt(base: str | Template, intent: str, request: str) -> str:
     """
     Replaces placeholders in the base string with the given intent and
     request.
 
     Parameters:
-    - base (str): The template string containing placeholders '{{INTENT}}' and
-        '{{REQUEST}}'.
+    - base (str | Template): The template containing placeholders
+        '{{INTENT}}' and '{{REQUEST}}'; strings are parsed once and cached.
     - intent (str): The intent to insert into the template.
     - request (str): The specific request to insert into the template.
 
     Returns:
     - str: The formatted string with placeholders replaced.
     """
-    return base.replace("{{INTENT}}", intent).replace("{{REQUEST}}", request)
+    template: Template = base if isinstance(base, Template) else compile_template(base)
+    return template.render(strict=False, INTENT=intent, REQUEST=request)